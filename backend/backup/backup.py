@@ -1,16 +1,36 @@
 """
 Standalone database backup script.
-Exports all tables from the database to CSV files.
+Streams every table out of the database with COPY ... TO STDOUT into a
+gzipped CSV, several tables at a time, all from one consistent snapshot,
+and bundles them into a zip with a manifest of checksums.
+With --incremental only the rows written since the previous backup of the
+chain are exported, see manifest.py and restore.py.
 Excludes 'alembic_version' table."""
 
-import csv
+import argparse
+import gzip
+import json
+
 import os
 import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import psycopg2
 from config_backup import Config_backup
+from manifest import (
+    FULL,
+    INCREMENTAL,
+    MANIFEST_NAME,
+    MAX_INCREMENTAL_XID_DISTANCE,
+    append_chain,
+    file_sha256,
+    load_chain,
+)
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
 
 # Get database URL from environment
 DATABASE_URL = Config_backup.DATABASE_URL_CONNECT
@@ -25,10 +45,27 @@ db_url = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
 # Get backup folder from config_backup
 BACKUP_FOLDER = Config_backup.BACKUP_FOLDER
 
+# Tables exported at the same time, each on its own connection
+DEFAULT_WORKERS = 4
+# Size of the chunks copied from the gzipped tables into the zip
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class CountingWriter:
+    """File wrapper counting the bytes COPY writes through it."""
+
+    def __init__(self, file):
+        self.file = file
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        return self.file.write(data)
+
 
-def create_backup_directory():
+def create_backup_directory(suffix=""):
     """Create a backup directory with timestamp in 'dd-mm-yyyy_hh-mm' format inside BACKUP_FOLDER."""
-    timestamp = datetime.now().strftime("%d-%m-%Y_%H-%M")
+    timestamp = datetime.now().strftime("%d-%m-%Y_%H-%M") + suffix
     backup_dir = Path(f"{BACKUP_FOLDER}/backups/backup_{timestamp}")
     backup_dir.mkdir(parents=True, exist_ok=True)
     return backup_dir, timestamp
@@ -39,9 +76,9 @@ def get_all_tables(cursor):
     exclude_tables = {"alembic_version"}
     cursor.execute(
         """
-        SELECT table_name 
-        FROM information_schema.tables 
-        WHERE table_schema = 'public' 
+        SELECT table_name
+        FROM information_schema.tables
+        WHERE table_schema = 'public'
         AND table_type = 'BASE TABLE'
         ORDER BY table_name;
     """
@@ -49,23 +86,104 @@ def get_all_tables(cursor):
     return [row[0] for row in cursor.fetchall() if row[0] not in exclude_tables]
 
 
-def export_table_to_csv(cursor, table_name, backup_dir):
-    """Export a single table to CSV file."""
+def open_snapshot():
+    """
+    Open the connection holding the snapshot every table is read from.
+    The snapshot stays valid for as long as this transaction is open.
+    """
+    connection = psycopg2.connect(db_url)
+    connection.set_session(
+        isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True
+    )
+    cursor = connection.cursor()
+    # The oldest transaction still running when the snapshot was taken, as a
+    # 64 bit id. The next incremental backup exports the rows it or any later
+    # transaction wrote.
+    cursor.execute(
+        "SELECT pg_export_snapshot(), txid_snapshot_xmin(txid_current_snapshot())"
+    )
+    snapshot_id, snapshot_xmin = cursor.fetchone()
+    return connection, snapshot_id, snapshot_xmin
+
+
+def export_query(table_name, since_xmin=None):
+    """
+    What COPY reads of a table: all of it, or the rows written by
+    transaction since_xmin or later. age(xmin) counts transactions back from
+    the present, so the comparison survives the 32 bit xid wraparound.
+    Frozen rows have the largest age and are left out.
+    """
+    if since_xmin is None:
+        return f'"{table_name}"'
+    since_xid = int(since_xmin) % (2**32)
+    condition = f"age(xmin) <= age('{since_xid}'::xid)"
+    return f'(SELECT * FROM "{table_name}" WHERE {condition})'
+
+
+def export_table_to_csv(table_name, backup_dir, snapshot_id, since_xmin=None):
+    """
+    Stream a single table into a gzipped CSV file, reading it from the
+    snapshot. Returns (row count, uncompressed bytes, seconds, sha256), or
+    None if the export failed.
+    """
+    connection = None
     try:
-        cursor.execute(f'SELECT * FROM "{table_name}"')
-        column_names = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        csv_file = backup_dir / f"{table_name}.csv"
-        with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(column_names)
-            writer.writerows(rows)
-        return len(rows)
+        start = time.perf_counter()
+        connection = psycopg2.connect(db_url)
+        connection.set_session(
+            isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True
+        )
+        cursor = connection.cursor()
+        cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+        csv_file = backup_dir / f"{table_name}.csv.gz"
+        with gzip.open(csv_file, "wb", compresslevel=6) as f:
+            writer = CountingWriter(f)
+            cursor.copy_expert(
+                f"COPY {export_query(table_name, since_xmin)} "
+                "TO STDOUT WITH (FORMAT csv, HEADER)",
+                writer,
+            )
+        row_count = cursor.rowcount
+        connection.rollback()
+        seconds = time.perf_counter() - start
+        return row_count, writer.bytes_written, seconds, file_sha256(csv_file)
     except Exception:
         return None
+    finally:
+        if connection:
+            connection.close()
+
+
+def zip_backup(backup_dir, zip_name, manifest):
+    """
+    Bundle the gzipped tables and the manifest into zip_name. The tables are
+    already compressed, so they are stored as they are.
+    """
+    with zipfile.ZipFile(zip_name, "w", compression=zipfile.ZIP_STORED) as archive:
+        for csv_file in sorted(backup_dir.iterdir()):
+            with open(csv_file, "rb") as source, archive.open(
+                csv_file.name, "w", force_zip64=True
+            ) as target:
+                shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+
 
+def incremental_parent(chain, snapshot_xmin):
+    """
+    The archive an incremental backup builds on, or None when a full backup
+    has to be taken instead.
+    """
+    if not chain:
+        print("[INFO] No previous backup in the chain, taking a full backup")
+        return None
+    parent = chain[-1]
+    if snapshot_xmin - parent["snapshot_xmin"] > MAX_INCREMENTAL_XID_DISTANCE:
+        print("[INFO] Previous backup is too old, taking a full backup")
+        return None
+    return parent
 
-def backup_database():
+
+def backup_database(workers=DEFAULT_WORKERS, incremental=False):
     """Main backup function."""
     print("\n────────────────────────────────────────────────────────────")
     print("         Unique Services DB Backup Utility")
@@ -73,34 +191,72 @@ def backup_database():
     print("────────────────────────────────────────────────────────────")
     print("[START] Connecting to database ...")
     print(f"[INFO] Datbase URL: {db_url.split('@')[1] if '@' in db_url else 'Unknown'}")
+    print(f"[INFO] Workers: {workers}")
+    print(f"[INFO] Mode: {INCREMENTAL if incremental else FULL}")
     print("────────────────────────────────────────────────────────────")
 
     connection = None
     backup_dir = None
     try:
-        # Connect to the database
-        connection = psycopg2.connect(db_url)
+        # Connect to the database and take the snapshot of the backup
+        connection, snapshot_id, snapshot_xmin = open_snapshot()
         cursor = connection.cursor()
 
+        # Find the backup this one builds on
+        backups_dir = Path(f"{BACKUP_FOLDER}/backups")
+        parent = None
+        if incremental:
+            parent = incremental_parent(load_chain(backups_dir), snapshot_xmin)
+        since_xmin = parent["snapshot_xmin"] if parent else None
+        backup_type = INCREMENTAL if parent else FULL
+
         # Create backup directory and get timestamp
-        backup_dir, timestamp = create_backup_directory()
+        backup_dir, timestamp = create_backup_directory(
+            "_incremental" if parent else ""
+        )
 
         # Get all tables
         tables = get_all_tables(cursor)
 
-        # Export each table
+        # Export the tables in parallel, reporting each as it finishes
         successful = 0
         failed = 0
+        total_bytes = 0
+        manifest_tables = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    export_table_to_csv, table, backup_dir, snapshot_id, since_xmin
+                ): table
+                for table in tables
+            }
+            for future in as_completed(futures):
+                table = futures[future]
+                classy_table = f"[EXPORT] {table:<20}... "
+                result = future.result()
+                if result is not None:
+                    row_count, size, seconds, sha256 = result
+                    megabytes = size / (1024 * 1024)
+                    print(
+                        f"{classy_table}✔️  Success ({row_count} records, "
+                        f"{megabytes:.2f} MB, {megabytes / max(seconds, 1e-6):.2f} MB/s)"
+                    )
+                    successful += 1
+                    total_bytes += size
+                    manifest_tables[table] = {
+                        "file": f"{table}.csv.gz",
+                        "rows": row_count,
+                        "sha256": sha256,
+                    }
+                else:
+                    print(f"{classy_table}❌  Failed")
+                    failed += 1
 
-        for table in tables:
-            classy_table = f"[EXPORT] {table:<20}... "
-            row_count = export_table_to_csv(cursor, table, backup_dir)
-            if row_count is not None:
-                print(f"{classy_table}✔️  Success ({row_count} records)")
-                successful += 1
-            else:
-                print(f"{classy_table}❌  Failed")
-                failed += 1
+        # Every table has been read, the snapshot can go
+        connection.rollback()
+        elapsed = time.perf_counter() - start
 
         # Prepare zip file path
         zip_name = f"{BACKUP_FOLDER}/backups/backup_{timestamp}.zip"
@@ -108,23 +264,44 @@ def backup_database():
             os.remove(zip_name)
 
         # Zip the backup directory
-        zip_path = shutil.make_archive(str(backup_dir), "zip", root_dir=backup_dir)
-
-        # Move/rename the zip to the correct name if needed
-        if not zip_path.endswith(".zip"):
-            zip_path = zip_path + ".zip"
-        if zip_path != zip_name:
-            shutil.move(zip_path, zip_name)
-            zip_path = zip_name
+        manifest = {
+            "type": backup_type,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "snapshot_xmin": snapshot_xmin,
+            "parent": parent["archive"] if parent else None,
+            "tables": dict(sorted(manifest_tables.items())),
+        }
+        zip_backup(backup_dir, zip_name, manifest)
 
         # Delete the unzipped backup directory
         shutil.rmtree(backup_dir)
-        print(f"\n[ZIP] Backup zipped : {zip_path}")
+        print(f"\n[ZIP] Backup zipped : {zip_name}")
+
+        # Only a complete backup can be restored from, or built on
+        if failed:
+            print("[WARN] Backup is incomplete and was not added to the chain")
+        else:
+            append_chain(
+                backups_dir,
+                {
+                    "archive": Path(zip_name).name,
+                    "type": backup_type,
+                    "created": manifest["created"],
+                    "snapshot_xmin": snapshot_xmin,
+                    "parent": manifest["parent"],
+                    "sha256": file_sha256(zip_name),
+                },
+            )
 
         # Summary
+        total_megabytes = total_bytes / (1024 * 1024)
         print("\n────────────────────────────────────────────────────────────")
         print(f"[RESULT] Tables backed up:   {successful}")
         print(f"[RESULT] Tables failed:      {failed}")
+        print(
+            f"[RESULT] Exported:           {total_megabytes:.2f} MB in {elapsed:.2f}s "
+            f"({total_megabytes / max(elapsed, 1e-6):.2f} MB/s)"
+        )
         print("────────────────────────────────────────────────────────────")
         print(
             f"[COMPLETE] Backup finished at {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}"
@@ -141,4 +318,17 @@ def backup_database():
 
 
 if __name__ == "__main__":
-    backup_database()
+    parser = argparse.ArgumentParser(description="Unique Services DB Backup Utility")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"tables exported in parallel (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="export only the rows written since the previous backup",
+    )
+    args = parser.parse_args()
+    backup_database(workers=max(1, args.workers), incremental=args.incremental)
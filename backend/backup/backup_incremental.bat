@@ -0,0 +1,4 @@
+@echo off
+cd /d "D:\DAD_OFFICE\Unique_Services_App\backend\src\backup"
+"D:\DAD_OFFICE\Unique_Services_App\backend\.venv\Scripts\python.exe" backup.py --incremental
+pause
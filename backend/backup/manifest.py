@@ -0,0 +1,84 @@
+"""
+Manifest of a backup archive and the chain of archives in the backup folder.
+
+Every archive carries a manifest.json listing its tables with their row
+count and SHA-256. The chain file lists the archives in the order they were
+taken, a full backup followed by the incremental ones built on top of it.
+"""
+
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+CHAIN_NAME = "backup_chain.json"
+
+FULL = "full"
+INCREMENTAL = "incremental"
+
+# Transactions an incremental backup may lag behind its parent, well inside
+# the 2^31 window in which age(xmin) can be compared
+MAX_INCREMENTAL_XID_DISTANCE = 1_000_000_000
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_sha256(f):
+    """SHA-256 of an open binary file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return stream_sha256(f)
+
+
+def chain_path(backups_dir):
+    return Path(backups_dir) / CHAIN_NAME
+
+
+def load_chain(backups_dir):
+    """The archives of the backup folder, oldest first."""
+    path = chain_path(backups_dir)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def append_chain(backups_dir, entry):
+    """Add an archive to the chain, replacing an older one of the same name."""
+    chain = [
+        item for item in load_chain(backups_dir) if item["archive"] != entry["archive"]
+    ]
+    chain.append(entry)
+    path = chain_path(backups_dir)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(chain, f, indent=2)
+    temp_path.replace(path)
+
+
+def restore_chain(chain, archive=None):
+    """
+    The archives to replay to restore `archive` (the latest by default): the
+    last full backup taken before it, then every incremental one after that.
+    """
+    if archive:
+        names = [item["archive"] for item in chain]
+        if archive not in names:
+            raise ValueError(f"{archive} is not in {CHAIN_NAME}")
+        chain = chain[: names.index(archive) + 1]
+    for position in range(len(chain) - 1, -1, -1):
+        if chain[position]["type"] == FULL:
+            return chain[position:]
+    raise ValueError("No full backup to start the restore from")
+
+
+def read_manifest(zip_path):
+    with zipfile.ZipFile(zip_path) as archive:
+        return json.loads(archive.read(MANIFEST_NAME))
@@ -0,0 +1,435 @@
+"""
+Standalone database restore script.
+Replays a backup chain into the database: the last full backup, then every
+incremental backup taken after it, up to the archive asked for (the latest
+by default). A single zip can be restored with --file, including the plain
+CSV zips taken before backups had a manifest.
+Checksums of every archive and table are verified before the database is
+touched, and everything is restored in one transaction. Each CSV is
+streamed out of the zip into COPY ... FROM STDIN, parents before children,
+with the secondary indexes and foreign keys rebuilt once at the end, and
+the row counts checked against the manifest.
+The full backup replaces the rows of its tables, incremental ones upsert
+the rows they carry by primary key.
+With --dry-run everything is restored into a scratch schema instead, and
+rolled back."""
+
+import argparse
+import csv
+import gzip
+import io
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+from config_backup import Config_backup
+from manifest import (
+    FULL,
+    MANIFEST_NAME,
+    file_sha256,
+    load_chain,
+    read_manifest,
+    restore_chain,
+    stream_sha256,
+)
+
+# Get database URL from environment
+DATABASE_URL = Config_backup.DATABASE_URL_CONNECT
+if not DATABASE_URL:
+    raise ValueError("DATABASE_URL is not set.")
+
+# Convert asyncpg to psycopg2 format
+db_url = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+# Get backup folder from config_backup
+BACKUPS_DIR = Path(f"{Config_backup.BACKUP_FOLDER}/backups")
+
+SCHEMA = "public"
+# Memory for rebuilding the indexes at the end of the restore
+MAINTENANCE_WORK_MEM = "256MB"
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_primary_keys(cursor):
+    """Primary key columns of every table in the public schema."""
+    cursor.execute(
+        """
+        SELECT c.relname, a.attname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = ANY(i.indkey)
+        WHERE i.indisprimary AND n.nspname = 'public'
+        ORDER BY c.relname, array_position(i.indkey, a.attnum);
+    """
+    )
+    primary_keys = {}
+    for table, column in cursor.fetchall():
+        primary_keys.setdefault(table, []).append(column)
+    return primary_keys
+
+
+def get_load_order(cursor, tables):
+    """
+    tables ordered so that every table comes after the tables its foreign
+    keys point to (users, then master, then the rest).
+    """
+    cursor.execute(
+        """
+        SELECT child.relname, parent.relname
+        FROM pg_constraint con
+        JOIN pg_class child ON child.oid = con.conrelid
+        JOIN pg_class parent ON parent.oid = con.confrelid
+        JOIN pg_namespace n ON n.oid = child.relnamespace
+        WHERE con.contype = 'f' AND n.nspname = 'public';
+    """
+    )
+    parents = {table: set() for table in tables}
+    for child, parent in cursor.fetchall():
+        if child in parents and parent in parents and child != parent:
+            parents[child].add(parent)
+    ordered = []
+    while parents:
+        ready = sorted(table for table, needs in parents.items() if not needs)
+        if not ready:
+            raise ValueError(f"Foreign keys form a cycle between {sorted(parents)}")
+        for table in ready:
+            ordered.append(table)
+            del parents[table]
+        for needs in parents.values():
+            needs.difference_update(ready)
+    return ordered
+
+
+def archive_manifest(zip_path):
+    """
+    The manifest of an archive. A zip without one holds the plain CSVs of a
+    full backup, whose row counts and checksums are unknown.
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        names = archive.namelist()
+    if MANIFEST_NAME in names:
+        return read_manifest(zip_path)
+    return {
+        "type": FULL,
+        "tables": {
+            name[: -len(".csv")]: {"file": name, "rows": None, "sha256": None}
+            for name in sorted(names)
+            if name.endswith(".csv")
+        },
+    }
+
+
+def verify_archive(zip_path, sha256=None):
+    """Check the archive and every table in it against their checksums."""
+    if sha256 and file_sha256(zip_path) != sha256:
+        raise ValueError(f"{zip_path.name} does not match its checksum")
+    manifest = archive_manifest(zip_path)
+    with zipfile.ZipFile(zip_path) as archive:
+        for table, details in manifest["tables"].items():
+            if not details["sha256"]:
+                continue
+            with archive.open(details["file"]) as member:
+                if stream_sha256(member) != details["sha256"]:
+                    raise ValueError(f"{table} in {zip_path.name} is corrupt")
+    return manifest
+
+
+@contextmanager
+def open_csv(archive, details):
+    """Stream a table's CSV out of the zip, without extracting it."""
+    with archive.open(details["file"]) as member:
+        if details["file"].endswith(".gz"):
+            with gzip.open(member, "rb") as f:
+                yield f
+        else:
+            yield member
+
+
+def read_columns(archive, details):
+    """Column names from the header line of a table's CSV."""
+    with open_csv(archive, details) as f:
+        header = f.readline().decode("utf-8-sig")
+    return next(csv.reader(io.StringIO(header)))
+
+
+def copy_in(cursor, archive, target, details):
+    """COPY a table's CSV into target, returning the rows loaded."""
+    columns = ", ".join(quote(column) for column in read_columns(archive, details))
+    with open_csv(archive, details) as f:
+        cursor.copy_expert(
+            f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv, HEADER)", f
+        )
+    return cursor.rowcount
+
+
+def load_table(cursor, archive, table, details):
+    """COPY a table's CSV into the table."""
+    return copy_in(cursor, archive, quote(table), details)
+
+
+def upsert_table(cursor, archive, table, details, primary_key):
+    """COPY a table's CSV into a temporary table and upsert it by primary key."""
+    columns = read_columns(archive, details)
+    column_list = ", ".join(quote(column) for column in columns)
+    staging = quote(f"restore_{table}")
+    cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {quote(table)})")
+    row_count = copy_in(cursor, archive, staging, details)
+    updates = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}"
+        for column in columns
+        if column not in primary_key
+    )
+    conflict = ", ".join(quote(column) for column in primary_key)
+    action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    cursor.execute(
+        f"INSERT INTO {quote(table)} ({column_list}) "
+        f"SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT ({conflict}) {action}"
+    )
+    cursor.execute(f"DROP TABLE {staging}")
+    return row_count
+
+
+def drop_secondary_indexes(cursor, schema, tables):
+    """
+    Drop the indexes of tables that back no constraint, returning the
+    statements that build them again. Building an index once over the loaded
+    rows is much cheaper than updating it row by row.
+    """
+    cursor.execute(
+        """
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = ANY(%s)
+        AND NOT EXISTS (
+            SELECT 1 FROM pg_constraint con WHERE con.conindid = i.indexrelid
+        );
+    """,
+        (schema, list(tables)),
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+    return [definition for _, definition in indexes]
+
+
+def drop_foreign_keys(cursor, schema, tables):
+    """
+    Drop the foreign keys of tables, returning the statements that add them
+    back. Adding a key validates all rows in one pass instead of firing a
+    trigger per row.
+    """
+    cursor.execute(
+        """
+        SELECT con.conrelid::regclass::text, con.conname,
+               pg_get_constraintdef(con.oid)
+        FROM pg_constraint con
+        JOIN pg_class c ON c.oid = con.conrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE con.contype = 'f' AND n.nspname = %s AND c.relname = ANY(%s);
+    """,
+        (schema, list(tables)),
+    )
+    foreign_keys = cursor.fetchall()
+    for table, name, _ in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote(name)}")
+    return [
+        f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}"
+        for table, name, definition in foreign_keys
+    ]
+
+
+def reset_sequences(cursor, schema, tables):
+    """Move identity and serial sequences past the restored ids."""
+    cursor.execute(
+        """
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = %s
+        AND (is_identity = 'YES' OR column_default LIKE 'nextval(%%');
+    """,
+        (schema,),
+    )
+    for table, column in cursor.fetchall():
+        if table not in tables:
+            continue
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+            f"COALESCE(MAX({quote(column)}), 0) + 1, false) FROM {quote(table)}",
+            (f"{quote(schema)}.{quote(table)}", column),
+        )
+
+
+def create_scratch_schema(cursor, tables):
+    """
+    Create an empty copy of tables in a scratch schema and restore into it
+    from now on. Foreign keys are not copied.
+    """
+    schema = f"restore_check_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    cursor.execute(f"CREATE SCHEMA {quote(schema)}")
+    for table in tables:
+        cursor.execute(
+            f"CREATE TABLE {quote(schema)}.{quote(table)} "
+            f"(LIKE public.{quote(table)} INCLUDING ALL)"
+        )
+    cursor.execute(f"SET LOCAL search_path TO {quote(schema)}")
+    return schema
+
+
+def restore_database(archive_name=None, zip_file=None, dry_run=False, assume_yes=False):
+    """Main restore function."""
+    print("\n────────────────────────────────────────────────────────────")
+    print("         Unique Services DB Restore Utility")
+    print("────────────────────────────────────────────────────────────")
+
+    connection = None
+    try:
+        if zip_file:
+            replay = [(Path(zip_file), None)]
+        else:
+            replay = [
+                (BACKUPS_DIR / entry["archive"], entry["sha256"])
+                for entry in restore_chain(load_chain(BACKUPS_DIR), archive_name)
+            ]
+
+        # Verify the whole chain before touching the database
+        manifests = []
+        for zip_path, sha256 in replay:
+            manifest = verify_archive(zip_path, sha256)
+            manifests.append(manifest)
+            print(f"[VERIFY] {zip_path.name:<40} ✔️  {manifest['type']}")
+        if manifests[0]["type"] != FULL:
+            raise ValueError("The restore has to start from a full backup")
+
+        print("────────────────────────────────────────────────────────────")
+        print(
+            f"[INFO] Datbase URL: {db_url.split('@')[1] if '@' in db_url else 'Unknown'}"
+        )
+        if dry_run:
+            print("[INFO] Dry run: restoring into a scratch schema, then rolling back")
+        elif not assume_yes:
+            answer = input("[CONFIRM] Replace the database contents? Type YES: ")
+            if answer.strip() != "YES":
+                print("[ABORT] Nothing was restored")
+                return
+        print("────────────────────────────────────────────────────────────")
+
+        connection = psycopg2.connect(db_url)
+        cursor = connection.cursor()
+        # Nothing is committed before the end, a crash loses nothing
+        cursor.execute("SET LOCAL synchronous_commit TO off")
+        cursor.execute(f"SET LOCAL maintenance_work_mem TO '{MAINTENANCE_WORK_MEM}'")
+        primary_keys = get_primary_keys(cursor)
+        tables = sorted(
+            {table for manifest in manifests for table in manifest["tables"]}
+        )
+        order = get_load_order(cursor, tables)
+
+        schema = create_scratch_schema(cursor, order) if dry_run else SCHEMA
+        start = time.perf_counter()
+        rebuild = drop_foreign_keys(cursor, schema, order)
+        rebuild += drop_secondary_indexes(cursor, schema, order)
+
+        total_rows = 0
+        for (zip_path, _), manifest in zip(replay, manifests):
+            print(f"[ARCHIVE] {zip_path.name}")
+            with zipfile.ZipFile(zip_path) as archive:
+                if manifest["type"] == FULL:
+                    cursor.execute(
+                        "TRUNCATE " + ", ".join(quote(table) for table in order)
+                    )
+                for table in order:
+                    details = manifest["tables"].get(table)
+                    if not details:
+                        continue
+                    table_start = time.perf_counter()
+                    if manifest["type"] == FULL:
+                        row_count = load_table(cursor, archive, table, details)
+                    elif details["rows"]:
+                        row_count = upsert_table(
+                            cursor, archive, table, details, primary_keys[table]
+                        )
+                    else:
+                        row_count = 0
+                    if details["rows"] is not None and row_count != details["rows"]:
+                        raise ValueError(
+                            f"{table} loaded {row_count} records, "
+                            f"the manifest has {details['rows']}"
+                        )
+                    total_rows += row_count
+                    seconds = time.perf_counter() - table_start
+                    print(
+                        f"[RESTORE] {table:<20}... ✔️  {row_count} records "
+                        f"({seconds:.2f}s)"
+                    )
+
+        rebuild_start = time.perf_counter()
+        for statement in rebuild:
+            cursor.execute(statement)
+        print(
+            f"[REBUILD] {len(rebuild)} indexes and foreign keys "
+            f"({time.perf_counter() - rebuild_start:.2f}s)"
+        )
+        reset_sequences(cursor, schema, set(manifests[0]["tables"]))
+        elapsed = time.perf_counter() - start
+
+        if dry_run:
+            connection.rollback()
+        else:
+            connection.commit()
+
+        print("\n────────────────────────────────────────────────────────────")
+        print(f"[RESULT] Archives replayed:  {len(replay)}")
+        print(f"[RESULT] Records restored:   {total_rows}")
+        print(f"[RESULT] Time taken:         {elapsed:.2f}s")
+        if dry_run:
+            print(f"[RESULT] Dry run in {schema} rolled back, nothing was changed")
+        print("────────────────────────────────────────────────────────────")
+        print(
+            f"[COMPLETE] Restore finished at {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}"
+        )
+        print("────────────────────────────────────────────────────────────")
+
+    except psycopg2.Error as e:
+        print(f"[ERROR] Database error, nothing was restored: {str(e)}")
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unique Services DB Restore Utility")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--archive",
+        help="restore up to this archive of the chain (default the latest)",
+    )
+    source.add_argument(
+        "--file", help="restore this full backup zip instead of the chain"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="restore into a scratch schema and roll back",
+    )
+    parser.add_argument(
+        "--yes", action="store_true", help="do not ask for confirmation"
+    )
+    args = parser.parse_args()
+    restore_database(
+        archive_name=args.archive,
+        zip_file=args.file,
+        dry_run=args.dry_run,
+        assume_yes=args.yes,
+    )
@@ -0,0 +1,180 @@
+"""
+Microbenchmark for the JSON request normalizer.
+Compares the per-request overhead of the old StripJSONMiddleware +
+CapitalizeJSONMiddleware pair (two BaseHTTPMiddleware, two json round trips)
+with the single pure ASGI NormalizeJSONMiddleware.
+
+Run from the backend folder:
+    python benchmarks/normalize_middleware.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from middleware.normalize import NormalizeJSONMiddleware
+
+ITERATIONS = 5000
+
+PAYLOAD = json.dumps(
+    {
+        "name": "  ramesh kumar  ",
+        "srf_date": "2025-12-01",
+        "division": " fans ",
+        "model": "ceiling fan 1200mm ",
+        "serial_number": " ab12345 ",
+        "problem": "not working ",
+        "remark": " customer will collect ",
+        "service_charge": 150,
+        "records": [
+            {"srf_number": f" s{i:05d}/1 ", "settlement_date": "2025-12-01"}
+            for i in range(20)
+        ],
+    }
+).encode()
+
+
+# ---------------------------
+# Old implementation (middleware/strip.py + middleware/capitalize.py)
+# ---------------------------
+EXCLUDED = [
+    "/auth/login",
+    "/user/create_user",
+    "/user/reset_password",
+    "/user/delete_user",
+]
+
+
+def strip_outer_whitespace(data):
+    if isinstance(data, dict):
+        return {k: strip_outer_whitespace(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [strip_outer_whitespace(item) for item in data]
+    elif isinstance(data, str):
+        return data.strip()
+    return data
+
+
+def capitalize_values(obj):
+    if isinstance(obj, dict):
+        return {k: capitalize_values(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [capitalize_values(item) for item in obj]
+    elif isinstance(obj, str):
+        return obj.upper()
+    return obj
+
+
+def legacy_middleware(transform):
+    class LegacyJSONMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            if request.url.path in EXCLUDED:
+                return await call_next(request)
+            if request.headers.get("content-type") == "application/json":
+                body_bytes = await request.body()
+                if body_bytes:
+                    try:
+                        data = transform(json.loads(body_bytes))
+                        request._body = json.dumps(data).encode("utf-8")
+                    except json.JSONDecodeError:
+                        pass
+            return await call_next(request)
+
+    return LegacyJSONMiddleware
+
+
+async def endpoint(request: Request):
+    body = await request.body()
+    return Response(body, media_type="application/json")
+
+
+def build_app(middleware):
+    return Starlette(
+        routes=[Route("/bench", endpoint, methods=["POST", "GET"])],
+        middleware=middleware,
+    )
+
+
+async def run_request(app, method, body):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/bench",
+        "raw_path": b"/bench",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, method, body):
+    for _ in range(200):
+        await run_request(app, method, body)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await run_request(app, method, body)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main():
+    apps = {
+        "bare": build_app([]),
+        "before": build_app(
+            [
+                # Same order as the old register_middleware: strip runs first
+                Middleware(legacy_middleware(strip_outer_whitespace)),
+                Middleware(legacy_middleware(capitalize_values)),
+            ]
+        ),
+        "after": build_app([Middleware(NormalizeJSONMiddleware)]),
+    }
+    print("\n────────────────────────────────────────────────────────────")
+    print("         JSON Normalizer Middleware Benchmark")
+    print("────────────────────────────────────────────────────────────")
+    print(f"[INFO] {ITERATIONS} requests per case, body {len(PAYLOAD)} bytes")
+    for method, body in (("POST", PAYLOAD), ("GET", b"")):
+        bare = await measure(apps["bare"], method, body)
+        before = await measure(apps["before"], method, body)
+        after = await measure(apps["after"], method, body)
+        print("────────────────────────────────────────────────────────────")
+        print(f"[{method}] bare app          : {bare:8.1f} us/request")
+        print(f"[{method}] before overhead   : {before - bare:8.1f} us/request")
+        print(f"[{method}] after overhead    : {after - bare:8.1f} us/request")
+    print("────────────────────────────────────────────────────────────")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark for the cell wrapping of the print overlays, on a 100 row vendor
+challan.
+Compares the old inline word wrap (stringWidth of the growing line for every
+word) with pdf.layout.wrap_text, with its LRU cache cold (glyph tables only)
+and warm (a reprint), and times the whole render_vendor_challan. Then renders
+vendor and CNF challans of growing size, which run over several pages, to
+check that the time per row stays flat.
+
+Run from the backend folder:
+    python benchmarks/pdf_layout.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from out_of_warranty.documents import render_vendor_challan
+from pdf.layout import wrap_text
+from warranty.documents import render_cnf_challan
+
+ITERATIONS = 50
+ROWS = 100
+# Challan sizes of the scaling runs, and the runs of each
+SCALING_ROWS = (50, 100, 200, 400)
+SCALING_ITERATIONS = 3
+
+# Column widths of the vendor challan table
+COLUMN_WIDTHS = [21, 74, 85, 100, 100, 135]
+
+DIVISIONS = ["FANS", "PUMP", "LIGHT", "SDA", "MOTOR"]
+MODELS = [
+    "CEILING FAN 1200MM HS PLUS",
+    "SUBMERSIBLE PUMP 1HP 3 STAGE",
+    "TABLE FAN 400MM HIGH SPEED",
+    "MIXER GRINDER 750W 3 JAR",
+]
+REMARKS = [
+    "MOTOR WINDING BURNT NEEDS REWINDING",
+    "BEARING NOISE AND SLOW SPEED",
+    "CAPACITOR FAULTY CHECK SWITCH ALSO",
+    "",
+]
+
+
+def vendor_rows(count):
+    # (id, date, code, srf number, division, model, serial number, remark), the
+    # columns print_vendor_challan selects
+    return [
+        (
+            i,
+            None,
+            f"C{i % 9000:04d}",
+            f"S{i:05d}/1",
+            DIVISIONS[i % len(DIVISIONS)],
+            MODELS[i % len(MODELS)],
+            f"SN{i * 7919:08d}",
+            REMARKS[i % len(REMARKS)],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def cnf_rows(count):
+    return [
+        {
+            "model": MODELS[i % len(MODELS)],
+            "serial_number": f"SN{i * 7919:08d}",
+            "complaint_number": f"CMP{i:07d}",
+            "srf_number": f"R{i:05d}/1",
+            "sticker_number": f"ST{i:06d}",
+            "name": f"CUSTOMER {i % 97} {REMARKS[i % len(REMARKS)]}",
+            "asc_name": "CITY SERVICE CENTRE",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+VENDOR_ROWS = vendor_rows(ROWS)
+
+
+def cells():
+    for idx, row in enumerate(VENDOR_ROWS, 1):
+        row_data = [str(idx), row[3], row[4], row[5], str(row[6]), row[7]]
+        yield from zip(COLUMN_WIDTHS, row_data)
+
+
+# ---------------------------
+# Old implementation (inline in every overlay)
+# ---------------------------
+def legacy_wrap(text, width):
+    words = str(text).split()
+    lines = []
+    line = ""
+    for word in words:
+        test_line = line + (" " if line else "") + word
+        if stringWidth(test_line, "Helvetica", 9) <= width:
+            line = test_line
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def wrap_all(wrap):
+    for width, text in cells():
+        wrap(text, width)
+
+
+def measure(run, before=None, iterations=ITERATIONS):
+    run()
+    total = 0.0
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        run()
+        total += time.perf_counter() - start
+    return total / iterations * 1000
+
+
+def main():
+    calls = sum(1 for _ in cells())
+    legacy = measure(lambda: wrap_all(legacy_wrap))
+    cold = measure(
+        lambda: wrap_all(lambda text, width: wrap_text(text, "Helvetica", 9, width)),
+        before=wrap_text.cache_clear,
+    )
+    warm = measure(
+        lambda: wrap_all(lambda text, width: wrap_text(text, "Helvetica", 9, width))
+    )
+    render = measure(
+        lambda: render_vendor_challan(VENDOR_ROWS, "V00001", "01-12-2025", "ADMIN")
+    )
+    print("\n────────────────────────────────────────────────────────────")
+    print("         PDF Cell Layout Benchmark")
+    print("────────────────────────────────────────────────────────────")
+    print(f"[INFO] Vendor challan, {ROWS} rows, {calls} cells, {ITERATIONS} runs")
+    print("────────────────────────────────────────────────────────────")
+    print(f"[WRAP] before (inline)     : {legacy:8.2f} ms/challan")
+    print(f"[WRAP] after, cache cold   : {cold:8.2f} ms/challan")
+    print(f"[WRAP] after, cache warm   : {warm:8.2f} ms/challan")
+    print(f"[RENDER] whole challan     : {render:8.2f} ms/challan")
+    print("────────────────────────────────────────────────────────────")
+    for count in SCALING_ROWS:
+        vendor = vendor_rows(count)
+        cnf = cnf_rows(count)
+        vendor_ms = measure(
+            lambda: render_vendor_challan(vendor, "V00001", "01-12-2025", "ADMIN"),
+            iterations=SCALING_ITERATIONS,
+        )
+        cnf_ms = measure(
+            lambda: render_cnf_challan(cnf, "FANS", "U00001", "01-12-2025"),
+            iterations=SCALING_ITERATIONS,
+        )
+        print(
+            f"[SCALE] {count:4d} rows  vendor {vendor_ms / count:6.2f} ms/row"
+            f"   CNF {cnf_ms / count:6.2f} ms/row"
+        )
+    print("────────────────────────────────────────────────────────────")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Plan check for the pending and settlement lists.
+Copies the warranty, out_of_warranty, market, retail and master tables
+into a scratch schema, seeds them with a large, mostly settled history,
+recreates their indexes under the same names, and EXPLAINs the query each
+list endpoint runs. Every list has to be read through its partial index from
+the pending list indexes migration (an index scan or a bitmap index scan), a
+sequential scan of the history fails the check.
+Everything runs in one transaction that is rolled back, nothing is left in
+the database.
+
+Run from the backend folder, against a database migrated to head:
+    python benchmarks/pending_list_plans.py [--rows 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import psycopg2
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from config import Config
+from market.service import MarketService
+from out_of_warranty.models import OutOfWarranty
+from out_of_warranty.service import OutOfWarrantyService
+from retail.service import RetailService
+from warranty.models import Warranty
+from warranty.service import WarrantyService
+
+SCHEMA = "plan_check"
+TABLES = ["master", "warranty", "out_of_warranty", "market", "retail"]
+# Customer codes are C0001 to C9999
+MASTERS = 9999
+
+# Every pending list is about 1% of the rows or less, the rest is settled
+SEED = {
+    "master": """
+        INSERT INTO master (code, name, address, city, contact1, created_by)
+        SELECT 'C' || lpad(i::text, 4, '0'), 'CUSTOMER ' || i, 'ADDRESS', 'CITY',
+               '9000000000', 'ADMIN'
+        FROM generate_series(1, {masters}) AS i
+    """,
+    "warranty": """
+        INSERT INTO warranty (
+            srf_number, code, srf_date, head, division, model, serial_number,
+            problem, challan, challan_number, final_status, created_by
+        )
+        SELECT 'R' || lpad(i::text, 6, '0') || '/1',
+               'C' || lpad((i % {masters} + 1)::text, 4, '0'),
+               current_date - i % 1000,
+               CASE WHEN i % 10 = 0 THEN 'REPLACE' ELSE 'REPAIR' END,
+               (ARRAY['FANS', 'PUMP', 'LIGHT', 'SDA'])[i % 4 + 1],
+               'MODEL', 'SN' || i, 'PROBLEM',
+               CASE WHEN i % 200 = 0 THEN 'N' ELSE 'Y' END,
+               CASE WHEN i % 200 <> 0 THEN 'U' || lpad((i / 50)::text, 5, '0') END,
+               CASE WHEN i % 100 = 0 THEN 'N' ELSE 'Y' END,
+               'ADMIN'
+        FROM generate_series(1, {rows}) AS i
+    """,
+    "out_of_warranty": """
+        INSERT INTO out_of_warranty (
+            srf_number, srf_date, code, division, service_charge,
+            service_charge_waive, model, serial_number, challan, challan_number,
+            repair_date, vendor_date1, vendor_date2, vendor_settlement_date,
+            vendor_settled, gst, final_status, settlement_date, final_settled,
+            created_by
+        )
+        SELECT 'S' || lpad(i::text, 6, '0') || '/1',
+               current_date - i % 1000,
+               'C' || lpad((i % {masters} + 1)::text, 4, '0'),
+               'FANS', 0, 'N', 'MODEL', 'SN' || i, 'Y',
+               CASE WHEN i % 5 = 0 THEN 'V' || lpad((i / 50)::text, 5, '0') END,
+               CASE WHEN i % 100 <> 1 THEN current_date END,
+               CASE WHEN i % 5 = 0 THEN current_date END,
+               CASE WHEN i % 5 = 0 THEN current_date END,
+               CASE WHEN i % 5 = 0 AND i % 500 <> 0 THEN current_date END,
+               CASE WHEN i % 500 = 5 THEN 'N' ELSE 'Y' END,
+               'N',
+               CASE WHEN i % 100 = 2 THEN 'N' ELSE 'Y' END,
+               CASE WHEN i % 100 NOT IN (2, 3) THEN current_date END,
+               CASE WHEN i % 100 = 4 THEN 'N' ELSE 'Y' END,
+               'ADMIN'
+        FROM generate_series(1, {rows}) AS i
+    """,
+    "market": """
+        INSERT INTO market (
+            mcode, code, receive_date, division, invoice_number, invoice_date,
+            quantity, final_status, created_by
+        )
+        SELECT 'M' || lpad(i::text, 6, '0'),
+               'C' || lpad((i % {masters} + 1)::text, 4, '0'),
+               current_date, 'FANS', 'I' || i % 100000, current_date, 1,
+               CASE WHEN i % 100 = 0 THEN 'N' ELSE 'Y' END,
+               'ADMIN'
+        FROM generate_series(1, {rows}) AS i
+    """,
+    "retail": """
+        INSERT INTO retail (
+            rcode, retail_date, division, code, details, amount, received,
+            settlement_date, final_status, created_by
+        )
+        SELECT 'X' || lpad(i::text, 6, '0'), current_date, 'FANS',
+               'C' || lpad((i % {masters} + 1)::text, 4, '0'), 'DETAILS', 100,
+               CASE WHEN i % 100 = 0 THEN 'N' ELSE 'Y' END,
+               CASE WHEN i % 100 <> 0 THEN current_date END,
+               CASE WHEN i % 100 IN (0, 1) THEN 'N' ELSE 'Y' END,
+               'ADMIN'
+        FROM generate_series(1, {rows}) AS i
+    """,
+}
+
+
+class CaptureSession:
+    """Stands in for the session of a service, keeping the statement it runs."""
+
+    def __init__(self):
+        self.statement = None
+
+    async def execute(self, statement):
+        self.statement = statement
+        return self
+
+    def all(self):
+        return []
+
+    def scalars(self):
+        return self
+
+
+def captured(list_method, *args):
+    session = CaptureSession()
+    asyncio.run(list_method(session, *args))
+    return session.statement
+
+
+def list_queries():
+    """(list, statement, index expected in its plan)"""
+    warranty_service = WarrantyService()
+    out_of_warranty_service = OutOfWarrantyService()
+    market_service = MarketService()
+    retail_service = RetailService()
+    token = {"user": {"username": "ADMIN"}}
+    return [
+        (
+            "list_warranty_pending",
+            captured(warranty_service.list_warranty_pending),
+            "ix_warranty_pending",
+        ),
+        (
+            "list_cnf_challan_details",
+            captured(
+                lambda session: warranty_service.list_cnf_challan_details(
+                    session, "FANS"
+                )
+            ),
+            "ix_warranty_cnf_challan_pending",
+        ),
+        (
+            "cnf challan by number",
+            select(Warranty).where(Warranty.challan_number == "U00001"),
+            "ix_warranty_challan_number",
+        ),
+        (
+            "list_out_of_warranty_pending",
+            captured(out_of_warranty_service.list_out_of_warranty_pending),
+            "ix_out_of_warranty_pending",
+        ),
+        (
+            "list_vendor_challan_details",
+            captured(out_of_warranty_service.list_vendor_challan_details),
+            "ix_out_of_warranty_vendor_challan_pending",
+        ),
+        (
+            "list_vendor_not_settled",
+            captured(out_of_warranty_service.list_vendor_not_settled),
+            "ix_out_of_warranty_vendor_not_settled",
+        ),
+        (
+            "list_final_vendor_settlement",
+            captured(out_of_warranty_service.list_final_vendor_settlement),
+            "ix_out_of_warranty_vendor_final_settlement",
+        ),
+        (
+            "list_srf_not_settled",
+            captured(out_of_warranty_service.list_srf_not_settled),
+            "ix_out_of_warranty_srf_not_settled",
+        ),
+        (
+            "list_final_srf_settlement",
+            captured(out_of_warranty_service.list_final_srf_settlement),
+            "ix_out_of_warranty_final_srf_settlement",
+        ),
+        (
+            "vendor challan by number",
+            select(OutOfWarranty).where(OutOfWarranty.challan_number == "V00001"),
+            "ix_out_of_warranty_challan_number",
+        ),
+        (
+            "list_market_pending",
+            captured(market_service.list_market_pending),
+            "ix_market_pending",
+        ),
+        (
+            "list_retail_not_received",
+            captured(retail_service.list_retail_not_received),
+            "ix_retail_not_received",
+        ),
+        (
+            "list_retail_unsettled",
+            captured(
+                lambda session: retail_service.list_retail_unsettled(session, token)
+            ),
+            "ix_retail_unsettled",
+        ),
+        (
+            "list_retail_final_settlement",
+            captured(retail_service.list_retail_final_settlement),
+            "ix_retail_final_settlement",
+        ),
+    ]
+
+
+def to_sql(statement):
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def seed(cursor, rows):
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in TABLES:
+        cursor.execute(
+            f"CREATE TABLE {SCHEMA}.{table} "
+            f"(LIKE public.{table} INCLUDING ALL EXCLUDING INDEXES)"
+        )
+    cursor.execute(f"SET LOCAL search_path TO {SCHEMA}, public")
+    for table in TABLES:
+        cursor.execute(SEED[table].format(rows=rows, masters=MASTERS))
+        # LIKE ... INCLUDING INDEXES would rename every index, so the
+        # definitions are replayed from public to keep the names in the plans
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes"
+            " WHERE schemaname = 'public' AND tablename = %s",
+            (table,),
+        )
+        for (indexdef,) in cursor.fetchall():
+            cursor.execute(
+                indexdef.replace(f" ON public.{table} ", f" ON {SCHEMA}.{table} ")
+            )
+        cursor.execute(f"ANALYZE {table}")
+
+
+def reads_index(plan, index):
+    """Index Scan using <index>, Index Only Scan using or Bitmap Index Scan on."""
+    return re.search(rf"\b(?:using|on) {re.escape(index)}\b", plan) is not None
+
+
+def main(rows):
+    db_url = Config.DATABASE_URL_CONNECT.replace(
+        "postgresql+asyncpg://", "postgresql://"
+    )
+    queries = list_queries()
+    connection = psycopg2.connect(db_url)
+    failed = 0
+    try:
+        cursor = connection.cursor()
+        print(f"[SEED] {rows} rows per table into {SCHEMA} ...")
+        seed(cursor, rows)
+        for name, statement, index in queries:
+            cursor.execute("EXPLAIN " + to_sql(statement))
+            plan = "\n".join(line for (line,) in cursor.fetchall())
+            if reads_index(plan, index):
+                print(f"[PLAN] {name:<32} ✔️  {index}")
+            else:
+                failed += 1
+                print(f"[PLAN] {name:<32} ❌  expected {index}\n{plan}")
+    finally:
+        connection.rollback()
+        connection.close()
+    print(f"\n{len(queries) - failed}/{len(queries)} lists read through their index")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    sys.exit(1 if main(args.rows) else 0)
@@ -15,6 +15,7 @@ from src.market.models import Market
 from src.challan.models import Challan
 from src.warranty.models import Warranty
 from src.out_of_warranty.models import OutOfWarranty
+from src.counter.models import NumberCounter
 from sqlmodel import SQLModel
 from src.config import Config
 
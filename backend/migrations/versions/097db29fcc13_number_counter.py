@@ -0,0 +1,55 @@
+"""Number counter
+
+Revision ID: 097db29fcc13
+Revises: 6c682651ad62
+Create Date: 2026-10-18 10:02:41.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '097db29fcc13'
+down_revision: Union[str, Sequence[str], None] = '6c682651ad62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# counter name -> (table, column, prefix) used to seed from existing rows
+COUNTERS = {
+    'master': ('master', 'code', 'C'),
+    'road_challan': ('challan', 'challan_number', 'N'),
+    'retail': ('retail', 'rcode', 'X'),
+    'market': ('market', 'mcode', 'M'),
+    'warranty_srf': ('warranty', 'srf_number', 'R'),
+    'cnf_challan': ('warranty', 'challan_number', 'U'),
+    'out_of_warranty_srf': ('out_of_warranty', 'srf_number', 'S'),
+    'vendor_challan': ('out_of_warranty', 'challan_number', 'V'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('number_counter',
+    sa.Column('name', sa.VARCHAR(length=20), nullable=False),
+    sa.Column('value', sa.INTEGER(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Seed each counter with the highest number already in use
+    for name, (table, column, prefix) in COUNTERS.items():
+        op.execute(
+            f"""
+            INSERT INTO number_counter (name, value)
+            SELECT '{name}', COALESCE(MAX(substring({column} from '^{prefix}([0-9]+)')::integer), 0)
+            FROM {table}
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('number_counter')
@@ -0,0 +1,48 @@
+"""Trigram search
+
+Revision ID: 5b1e8d47c2a9
+Revises: 097db29fcc13
+Create Date: 2026-10-18 11:26:07.215480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e8d47c2a9'
+down_revision: Union[str, Sequence[str], None] = '097db29fcc13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# index name -> (table, column) of the free text filters searched with ILIKE
+TRIGRAM_INDEXES = {
+    'ix_master_name_trgm': ('master', 'name'),
+    'ix_warranty_delivered_by_trgm': ('warranty', 'delivered_by'),
+    'ix_market_delivery_by_trgm': ('market', 'delivery_by'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.drop_index(name, table_name=table, postgresql_using='gin')
+    # The extension is left installed, other database objects may use it
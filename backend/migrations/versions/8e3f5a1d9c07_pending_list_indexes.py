@@ -0,0 +1,75 @@
+"""Pending list indexes
+
+Revision ID: 8e3f5a1d9c07
+Revises: 5b1e8d47c2a9
+Create Date: 2026-10-18 12:41:52.903166
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f5a1d9c07'
+down_revision: Union[str, Sequence[str], None] = '5b1e8d47c2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# index name -> (table, columns, predicate). Each partial index holds only the
+# rows of one pending list, in the order the list is sorted by, so the list
+# is read straight off the index however large the settled history grows.
+PARTIAL_INDEXES = {
+    'ix_warranty_pending': (
+        'warranty', ['srf_number'], "final_status = 'N'"),
+    'ix_warranty_cnf_challan_pending': (
+        'warranty', ['division', 'srf_number'],
+        "head = 'REPLACE' AND challan = 'N'"),
+    'ix_warranty_challan_number': (
+        'warranty', ['challan_number'], 'challan_number IS NOT NULL'),
+    'ix_out_of_warranty_pending': (
+        'out_of_warranty', ['srf_number'], "final_status = 'N'"),
+    'ix_out_of_warranty_vendor_challan_pending': (
+        'out_of_warranty', ['srf_number'],
+        'repair_date IS NULL AND vendor_date1 IS NULL'),
+    'ix_out_of_warranty_vendor_not_settled': (
+        'out_of_warranty', ['srf_number'],
+        'vendor_date2 IS NOT NULL AND vendor_settlement_date IS NULL'),
+    'ix_out_of_warranty_vendor_final_settlement': (
+        'out_of_warranty', ['srf_number'],
+        "vendor_settlement_date IS NOT NULL AND vendor_settled = 'N'"),
+    'ix_out_of_warranty_srf_not_settled': (
+        'out_of_warranty', ['srf_number'],
+        "settlement_date IS NULL AND final_status = 'Y'"),
+    'ix_out_of_warranty_final_srf_settlement': (
+        'out_of_warranty', ['srf_number'],
+        "settlement_date IS NOT NULL AND final_settled = 'N'"),
+    'ix_out_of_warranty_challan_number': (
+        'out_of_warranty', ['challan_number'], 'challan_number IS NOT NULL'),
+    'ix_market_pending': (
+        'market', ['mcode'], "final_status = 'N'"),
+    'ix_retail_not_received': (
+        'retail', ['rcode'], "received = 'N'"),
+    'ix_retail_unsettled': (
+        'retail', ['rcode'], 'settlement_date IS NULL'),
+    'ix_retail_final_settlement': (
+        'retail', ['rcode'],
+        "settlement_date IS NOT NULL AND final_status = 'N'"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (table, columns, predicate) in PARTIAL_INDEXES.items():
+        op.create_index(
+            name, table, columns, unique=False, postgresql_where=sa.text(predicate)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, (table, columns, predicate) in PARTIAL_INDEXES.items():
+        op.drop_index(name, table_name=table)
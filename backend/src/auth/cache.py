@@ -0,0 +1,129 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+from .schemas import Principal
+
+
+def normalize_username(username: str) -> str:
+    # Usernames are matched with ilike after collapsing the spacing
+    return " ".join(username.split()).lower()
+
+
+class PrincipalCache:
+    """
+    LRU of the active users behind access tokens, so that guarded routes do
+    not look the user up on every request.
+
+    An entry lives for `ttl` seconds, or until UserService changes the user
+    and bumps its version. The version only invalidates the cache of this
+    process, so the TTL bounds how long another worker may still let a
+    deleted user in.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Principal]]" = (
+            OrderedDict()
+        )
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, username: str) -> int:
+        return self._versions.get(normalize_username(username), 0)
+
+    def get(self, username: str) -> Optional[Principal]:
+        key = (normalize_username(username), self.version(username))
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, username: str, principal: Principal, version: int) -> None:
+        # A change that landed while the user was being read makes the result
+        # stale already, so it is not stored
+        if self.version(username) != version:
+            return
+        key = (normalize_username(username), version)
+        self._entries[key] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        username = normalize_username(username)
+        version = self._versions.get(username, 0)
+        self._versions[username] = version + 1
+        self._entries.pop((username, version), None)
+
+    def stats(self) -> dict:
+        return cache_stats(len(self._entries), self.max_size, self.hits, self.misses)
+
+
+class VerifiedTokenCache:
+    """
+    LRU of the claims of recently verified JWTs, keyed by the SHA-256 digest
+    of the token, so that repeat requests of a browser session skip the
+    signature check and the JSON parsing.
+
+    A token is only kept until its own "exp", after which it is verified
+    again, and rejected, like any other expired token.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, token_data: dict) -> None:
+        # A token without an expiry is verified on every request
+        if "exp" not in token_data:
+            return
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        self._entries[key] = (token_data["exp"], token_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return cache_stats(len(self._entries), self.max_size, self.hits, self.misses)
+
+
+def cache_stats(size: int, max_size: int, hits: int, misses: int) -> dict:
+    lookups = hits + misses
+    return {
+        "size": size,
+        "max_size": max_size,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0,
+    }
+
+
+principal_cache = PrincipalCache(
+    ttl=Config.PRINCIPAL_CACHE_TTL, max_size=Config.PRINCIPAL_CACHE_SIZE
+)
+token_cache = VerifiedTokenCache(max_size=Config.TOKEN_CACHE_SIZE)
@@ -4,7 +4,6 @@ from fastapi import Depends, Request
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from auth.models import User
 from db.db import get_session
 from exceptions import (
     AccessDenied,
@@ -13,8 +12,10 @@ from exceptions import (
     RefreshTokenRequired,
 )
 
+from .cache import principal_cache
+from .schemas import Principal
 from .service import AuthService
-from .utils import decode_user_token
+from .utils import verify_user_token
 
 auth_service = AuthService()
 
@@ -38,16 +39,11 @@ class TokenBearer(HTTPBearer):
                 token = request.cookies.get("access_token")
         if not token:
             raise InvalidToken()
-        token_data = decode_user_token(token)
-        if not self.token_valid(token):
-            raise InvalidToken()
+        # Raises InvalidToken if the signature or expiry does not check out
+        token_data = verify_user_token(token)
         self.verify_token_data(token_data)
         return token_data
 
-    def token_valid(self, token: str) -> bool:
-        token_data = decode_user_token(token)
-        return token_data is not None
-
     def verify_token_data(self, token_data: dict):
         raise NotImplementedError("Override this method in subclasses")
 
@@ -69,16 +65,26 @@ class RefreshTokenBearer(TokenBearer):
 async def get_current_user(
     token_data: dict = Depends(AccessTokenBearer()),
     session: AsyncSession = Depends(get_session),
-):
+) -> Principal:
     username = token_data["user"]["username"]
-    return await auth_service.get_user_by_username(username, session)
+    principal = principal_cache.get(username)
+    if principal:
+        return principal
+    version = principal_cache.version(username)
+    user = await auth_service.get_user_by_username(username, session)
+    if not user:
+        # Deleted since the token was issued
+        raise AccessDenied()
+    principal = Principal(username=user.username, role=user.role)
+    principal_cache.set(username, principal, version)
+    return principal
 
 
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    async def __call__(self, current_user: User = Depends(get_current_user)):
+    async def __call__(self, current_user: Principal = Depends(get_current_user)):
         if current_user.role in self.allowed_roles:
             return True
         raise AccessDenied()
@@ -0,0 +1,61 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from config import Config
+from exceptions import TooManyLoginAttempts
+
+from .cache import normalize_username
+
+
+def login_keys(username: str, client_host: Optional[str]) -> Dict[str, int]:
+    """
+    The keys a login attempt is counted under, with the failures each may
+    have in the window. The client address gets more room, since an office
+    shares one address between all of its users.
+    """
+    keys = {"user:" + normalize_username(username): Config.LOGIN_MAX_FAILURES}
+    if client_host:
+        keys["client:" + client_host] = Config.LOGIN_MAX_FAILURES_PER_CLIENT
+    return keys
+
+
+class LoginRateLimiter:
+    """
+    Failed logins per key over a sliding window of `window` seconds.
+
+    The check runs before the password is verified, so that guessing at a
+    username costs no bcrypt work once the limit is reached.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._failures: Dict[str, Deque[float]] = {}
+        self.rejected = 0
+
+    def _recent(self, key: str, now: float) -> Deque[float]:
+        failures = self._failures.get(key, deque())
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            self._failures.pop(key, None)
+        return failures
+
+    def check(self, keys: Dict[str, int]) -> None:
+        now = time.monotonic()
+        for key, max_failures in keys.items():
+            if len(self._recent(key, now)) >= max_failures:
+                self.rejected += 1
+                raise TooManyLoginAttempts()
+
+    def record_failure(self, keys: Dict[str, int]) -> None:
+        now = time.monotonic()
+        for key in keys:
+            self._recent(key, now)
+            self._failures.setdefault(key, deque()).append(now)
+
+    def reset(self, key: str) -> None:
+        self._failures.pop(key, None)
+
+
+login_rate_limiter = LoginRateLimiter(window=Config.LOGIN_FAILURE_WINDOW)
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -26,8 +26,11 @@ refresh_token_bearer = RefreshTokenBearer()
 
 
 @auth_router.post("/login", status_code=status.HTTP_200_OK)
-async def login(user: UserLogin, session: AsyncSession = Depends(get_session)):
-    valid_user = await auth_service.login(user, session)
+async def login(
+    user: UserLogin, request: Request, session: AsyncSession = Depends(get_session)
+):
+    client_host = request.client.host if request.client else None
+    valid_user = await auth_service.login(user, session, client_host)
     access_token = create_user_token(
         user_data={"username": valid_user.username, "role": valid_user.role}
     )
@@ -7,6 +7,11 @@ class UserResponse(BaseModel):
     phone_number: str
 
 
+class Principal(BaseModel):
+    username: str
+    role: str
+
+
 class UserLogin(BaseModel):
     username: str = Field(..., min_length=1)
     password: str = Field(..., min_length=1)
@@ -4,19 +4,33 @@ from sqlalchemy.future import select
 from exceptions import InvalidCredentials, UserNotFound
 
 from .models import User
+from .ratelimit import login_keys, login_rate_limiter
 from .schemas import UserLogin
-from .utils import verify_password
+from .utils import check_password
 
 
 class AuthService:
 
-    async def login(self, user: UserLogin, session: AsyncSession) -> bool:
+    async def login(
+        self, user: UserLogin, session: AsyncSession, client_host: str = None
+    ) -> bool:
+        keys = login_keys(user.username, client_host)
+        login_rate_limiter.check(keys)
         existing_user = await self.get_user_by_username(user.username, session)
         if not existing_user:
+            login_rate_limiter.record_failure(keys)
             raise UserNotFound()
-        if verify_password(user.password, existing_user.password):
-            return existing_user
-        raise InvalidCredentials()
+        valid, new_hash = await check_password(user.password, existing_user.password)
+        if not valid:
+            login_rate_limiter.record_failure(keys)
+            raise InvalidCredentials()
+        if new_hash:
+            # Stored with an outdated bcrypt cost
+            existing_user.password = new_hash
+            session.add(existing_user)
+            await session.commit()
+        login_rate_limiter.reset(next(iter(keys)))
+        return existing_user
 
     async def get_user_by_username(self, username: str, session: AsyncSession):
         # Normalize username spacing
@@ -1,5 +1,8 @@
+import asyncio
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 import jwt
 from passlib.context import CryptContext
@@ -7,7 +10,16 @@ from passlib.context import CryptContext
 from config import Config
 from exceptions import InvalidToken
 
-password_context = CryptContext(schemes=["bcrypt"])
+from .cache import token_cache
+
+# Hashes with fewer or more rounds than BCRYPT_ROUNDS are rehashed at login
+password_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=Config.BCRYPT_ROUNDS)
+# bcrypt takes a few hundred milliseconds per call and releases the GIL, so it
+# runs on these threads instead of the event loop. At most
+# PASSWORD_HASH_WORKERS hashes run at once, the rest wait their turn.
+password_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 ACCESS_TOKEN_EXPIRY = timedelta(hours=3)
 
@@ -21,6 +33,27 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return password_context.verify(password, hashed_password)
 
 
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, generate_hash_password, password
+    )
+
+
+async def check_password(
+    password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies password against hashed_password off the event loop. When the
+    password matches a hash of an outdated cost, also returns a new hash to
+    store in its place.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, password_context.verify_and_update, password, hashed_password
+    )
+
+
 def create_user_token(user_data: dict, expiry: timedelta = None, refresh: bool = False):
     payload = {}
 
@@ -48,3 +81,16 @@ def decode_user_token(token: str) -> dict:
         raise InvalidToken()
     except jwt.PyJWTError:
         raise InvalidToken()
+
+
+def verify_user_token(token: str) -> dict:
+    """
+    Returns the claims of token, verifying its signature only the first time
+    it is seen. The returned dict is shared between requests and must not be
+    modified.
+    """
+    token_data = token_cache.get(token)
+    if token_data is None:
+        token_data = decode_user_token(token)
+        token_cache.set(token, token_data)
+    return token_data
@@ -0,0 +1,25 @@
+import io
+import zipfile
+from typing import List, Tuple
+
+from PyPDF2 import PdfReader, PdfWriter
+
+
+def merge_documents(documents: List[bytes]) -> bytes:
+    """Joins the PDFs into one, in the given order."""
+    writer = PdfWriter()
+    for pdf_bytes in documents:
+        writer.append(PdfReader(io.BytesIO(pdf_bytes)))
+
+    output_stream = io.BytesIO()
+    writer.write(output_stream)
+    return output_stream.getvalue()
+
+
+def zip_documents(documents: List[Tuple[str, bytes]]) -> bytes:
+    """Zips each (number, PDF) as <number>.pdf."""
+    output_stream = io.BytesIO()
+    with zipfile.ZipFile(output_stream, "w", zipfile.ZIP_DEFLATED) as archive:
+        for number, pdf_bytes in documents:
+            archive.writestr(f"{number}.pdf", pdf_bytes)
+    return output_stream.getvalue()
@@ -0,0 +1,59 @@
+import io
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from auth.dependencies import AccessTokenBearer
+from batch_print.schemas import BatchPrintJobResponse, BatchPrintRequest
+from batch_print.service import MEDIA_TYPES, BatchPrintService
+from config import Config
+from db.db import get_session
+
+batch_print_router = APIRouter()
+batch_print_service = BatchPrintService(ttl=Config.BATCH_PRINT_JOB_TTL)
+access_token_bearer = AccessTokenBearer()
+
+"""
+Start printing a list of SRFs or challans, returns the job id and the numbers not found.
+"""
+
+
+@batch_print_router.post(
+    "",
+    response_model=BatchPrintJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_batch_print(
+    data: BatchPrintRequest,
+    session: AsyncSession = Depends(get_session),
+    token=Depends(access_token_bearer),
+):
+    job, missing = await batch_print_service.create_job(data, token, session)
+    return BatchPrintJobResponse(job_id=job.id, total=len(job.numbers), missing=missing)
+
+
+"""
+Progress of a batch print, one JSON line per document rendered and a last line once complete.
+"""
+
+
+@batch_print_router.get("/{job_id}/progress", status_code=status.HTTP_200_OK)
+async def batch_print_progress(job_id: str, _=Depends(access_token_bearer)):
+    job = batch_print_service.get_job(job_id)
+    return StreamingResponse(job.progress(), media_type="application/x-ndjson")
+
+
+"""
+Download a batch print as one PDF or a zip of PDFs, waits for the job to finish.
+"""
+
+
+@batch_print_router.get("/{job_id}", status_code=status.HTTP_200_OK)
+async def download_batch_print(job_id: str, _=Depends(access_token_bearer)):
+    job = await batch_print_service.output(job_id)
+    return StreamingResponse(
+        io.BytesIO(job.output),
+        media_type=MEDIA_TYPES[job.format],
+        headers={"Content-Disposition": f'attachment; filename="{job.filename}"'},
+    )
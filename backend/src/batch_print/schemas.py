@@ -0,0 +1,26 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from config import Config
+
+
+class BatchPrintRequest(BaseModel):
+    kind: Literal["srf", "warranty_srf", "vendor_challan", "cnf_challan"]
+    numbers: List[str] = Field(
+        ..., min_length=1, max_length=Config.BATCH_PRINT_MAX_DOCUMENTS
+    )
+    format: Literal["pdf", "zip"] = "pdf"
+
+
+class BatchPrintJobResponse(BaseModel):
+    job_id: str
+    total: int
+    missing: List[str]
+
+
+class BatchPrintProgress(BaseModel):
+    status: Literal["rendering", "complete", "failed"]
+    done: int
+    total: int
+    number: Optional[str] = None
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from batch_print.documents import merge_documents, zip_documents
+from batch_print.schemas import BatchPrintProgress, BatchPrintRequest
+from exceptions import PrintDocumentsNotFound, PrintJobNotFound
+from out_of_warranty import documents as out_of_warranty_documents
+from out_of_warranty.service import OutOfWarrantyService
+from pdf.renderer import pdf_renderer
+from warranty import documents as warranty_documents
+from warranty.service import WarrantyService
+
+logger = logging.getLogger(__name__)
+
+out_of_warranty_service = OutOfWarrantyService()
+warranty_service = WarrantyService()
+
+
+class BatchDocument(NamedTuple):
+    # Letter a bare number is padded with, as the single print endpoints do
+    prefix: str
+    render: Callable[..., bytes]
+    # (numbers, received_by, session) -> {number: render arguments}
+    read: Callable[[List[str], str, AsyncSession], Awaitable[Dict[str, tuple]]]
+
+
+BATCH_DOCUMENTS = {
+    "srf": BatchDocument(
+        "S",
+        out_of_warranty_documents.render_srf,
+        out_of_warranty_service.srf_print_jobs,
+    ),
+    "warranty_srf": BatchDocument(
+        "R",
+        warranty_documents.render_srf,
+        warranty_service.srf_print_jobs,
+    ),
+    "vendor_challan": BatchDocument(
+        "V",
+        out_of_warranty_documents.render_vendor_challan,
+        lambda numbers, received_by, session: (
+            out_of_warranty_service.vendor_challan_print_jobs(numbers, session)
+        ),
+    ),
+    "cnf_challan": BatchDocument(
+        "U",
+        warranty_documents.render_cnf_challan,
+        lambda numbers, received_by, session: (
+            warranty_service.cnf_challan_print_jobs(numbers, session)
+        ),
+    ),
+}
+
+MEDIA_TYPES = {"pdf": "application/pdf", "zip": "application/zip"}
+
+
+class PrintJob:
+    """
+    One batch print: the documents render in the background while any number
+    of clients follow the progress events, and the combined output is kept
+    until the job expires.
+    """
+
+    def __init__(self, kind: str, format: str, numbers: List[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.format = format
+        self.numbers = numbers
+        self.created = time.monotonic()
+        self.events: List[BatchPrintProgress] = []
+        self.output: Optional[bytes] = None
+        self.error: Optional[Exception] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.output is not None or self.error is not None
+
+    @property
+    def filename(self) -> str:
+        return f"{self.kind}_{self.id[:8]}.{self.format}"
+
+    def report(self, event: BatchPrintProgress) -> None:
+        self.events.append(event)
+        # Wake every listener, the next change gets a fresh event
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def progress(self) -> AsyncIterator[bytes]:
+        """Yields every progress event as one JSON line, until the job ends."""
+        sent = 0
+        while True:
+            changed = self._changed
+            for event in self.events[sent:]:
+                yield event.model_dump_json().encode("utf-8") + b"\n"
+            sent = len(self.events)
+            if self.finished:
+                return
+            await changed.wait()
+
+
+class BatchPrintService:
+    """
+    Prints many SRFs or challans in one go. The rows of all the documents are
+    read with a single query, the documents render in the PDF render pool
+    (at most one per worker at a time, so a batch leaves queue slots for the
+    single prints at the counter) and are joined into one PDF or zipped.
+
+    Jobs live in the memory of the worker process that created them.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: Dict[str, PrintJob] = {}
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.created > self.ttl:
+                del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> PrintJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise PrintJobNotFound()
+        return job
+
+    async def create_job(
+        self, data: BatchPrintRequest, token: dict, session: AsyncSession
+    ) -> Tuple[PrintJob, List[str]]:
+        """
+        Starts a batch print of the documents that exist and returns the job
+        with the numbers that were not found.
+        """
+        document = BATCH_DOCUMENTS[data.kind]
+        numbers = list(
+            dict.fromkeys(
+                number if len(number) == 6 else document.prefix + number.zfill(5)
+                for number in data.numbers
+            )
+        )
+        jobs = await document.read(numbers, token["user"]["username"], session)
+        if not jobs:
+            raise PrintDocumentsNotFound()
+
+        self._expire()
+        job = PrintJob(
+            data.kind, data.format, [number for number in numbers if number in jobs]
+        )
+        job.task = asyncio.create_task(self._run(job, document, jobs))
+        self._jobs[job.id] = job
+        return job, [number for number in numbers if number not in jobs]
+
+    async def _run(
+        self, job: PrintJob, document: BatchDocument, jobs: Dict[str, tuple]
+    ) -> None:
+        total = len(job.numbers)
+        documents: Dict[str, bytes] = {}
+        slots = asyncio.Semaphore(pdf_renderer.workers)
+
+        async def render(number: str) -> None:
+            async with slots:
+                rendered = await pdf_renderer.render_document(
+                    job.kind, document.render, *jobs[number]
+                )
+            documents[number] = rendered.content
+            job.report(
+                BatchPrintProgress(
+                    status="rendering", done=len(documents), total=total, number=number
+                )
+            )
+
+        try:
+            results = await asyncio.gather(
+                *[render(number) for number in job.numbers], return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            if job.format == "zip":
+                job.output = await pdf_renderer.render(
+                    "batch_zip",
+                    zip_documents,
+                    [(number, documents[number]) for number in job.numbers],
+                )
+            else:
+                job.output = await pdf_renderer.render(
+                    "batch_pdf",
+                    merge_documents,
+                    [documents[number] for number in job.numbers],
+                )
+        except Exception as exc:
+            logger.exception("Batch print %s of %s failed", job.id, job.kind)
+            job.error = exc
+            job.report(
+                BatchPrintProgress(status="failed", done=len(documents), total=total)
+            )
+        else:
+            job.report(BatchPrintProgress(status="complete", done=total, total=total))
+
+    async def output(self, job_id: str) -> PrintJob:
+        """Waits for the job to finish and returns it, or raises its error."""
+        job = self.get_job(job_id)
+        # A client that disconnects while waiting does not cancel the job
+        await asyncio.shield(job.task)
+        if job.error is not None:
+            raise job.error
+        return job
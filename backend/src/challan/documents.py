@@ -0,0 +1,127 @@
+from pdf.compose import render_copies, stamp_copies
+from pdf.layout import text_width, wrap_text
+from pdf.templates import ROAD_CHALLAN_TEMPLATE
+
+
+def draw_challan_overlay(
+    can,
+    rows,
+    challan_number,
+    challan_date,
+    name,
+    full_address,
+    code,
+    contact,
+    order_number,
+    order_date,
+    invoice_number,
+    invoice_date,
+    total,
+    remark,
+):
+    """
+    Draws the challan details and rows on the overlay.
+    """
+    # PDF layout constants (integrated)
+    font = "Helvetica"
+    font_bold = "Helvetica-Bold"
+    font_size = 13
+    font_size_bold = 10
+    line_spacing = 10
+    min_row_height = 30
+    row_padding = 1
+    columns = [
+        {"x": 28, "width": 22},  # Sl No
+        {"x": 60, "width": 360},  # Spare
+        {"x": 440, "width": 40},  # Quantity
+        {"x": 490, "width": 80},  # Unit
+    ]
+
+    # Header fields
+    can.setFont(font_bold, font_size_bold)
+    can.drawString(178, 696, challan_number)
+    can.drawString(368, 696, challan_date)
+    can.drawString(240, 658, name)
+    can.drawString(240, 634, full_address)
+    can.drawString(170, 608, code)
+    can.drawString(500, 608, contact)
+    can.drawString(170, 589, order_number)
+    can.drawString(500, 589, order_date)
+    can.drawString(170, 570, invoice_number)
+    can.drawString(500, 570, invoice_date)
+    can.drawString(170, 551, remark)
+
+    can.setFont(font_bold, font_size)
+    can.drawString(450, 251, str(total))
+
+    # Table rows
+    start_y = 507
+    y = start_y
+    for idx, row in enumerate(rows, 1):
+        row_data = [
+            str(idx),
+            str(row["spare"]) if row["spare"] is not None else "",
+            str(row["quantity"]) if row["quantity"] is not None else "",
+            str(row["unit"]) if row["unit"] is not None else "",
+        ]
+        row_lines = [
+            wrap_text(text, font, font_size, col["width"])
+            for col, text in zip(columns, row_data)
+        ]
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max(max_lines * line_spacing, min_row_height)
+
+        # Only the first page of the overlay is printed
+        if y - row_height < 100:
+            break
+
+        for col, lines in zip(columns, row_lines):
+            total_text_height = len(lines) * line_spacing
+            vertical_offset = (row_height - total_text_height) / 2
+            for i, ln in enumerate(lines):
+                safe_ln = ln or ""
+                line_width = text_width(safe_ln, font, font_size)
+                center_x = col["x"] + col["width"] / 2 - line_width / 2
+                y_position = y - vertical_offset - (i * line_spacing)
+                can.drawString(center_x, y_position, safe_ln)
+        y -= row_height + row_padding
+
+
+def render_challan(
+    rows,
+    challan_number,
+    challan_date,
+    name,
+    full_address,
+    code,
+    contact,
+    order_number,
+    order_date,
+    invoice_number,
+    invoice_date,
+    total,
+    remark,
+) -> bytes:
+    """
+    Renders a road challan and returns the PDF.
+    """
+    # One overlay, stamped on the office and the customer copy
+    overlay_pages = render_copies(
+        lambda can: draw_challan_overlay(
+            can,
+            rows,
+            challan_number,
+            challan_date,
+            name,
+            full_address,
+            code,
+            contact,
+            order_number,
+            order_date,
+            invoice_number,
+            invoice_date,
+            total,
+            remark,
+        )
+    )
+    return stamp_copies(ROAD_CHALLAN_TEMPLATE, overlay_pages)
@@ -1,11 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from auth.dependencies import AccessTokenBearer
 from db.db import get_session
+from pdf.response import pdf_response
 
 from .schemas import ChallanNextCodeMaxChallanDate, ChallanNumber, CreateChallan
 from .service import ChallanService
@@ -72,14 +73,11 @@ Print challan details by code.
 @challan_router.post("/print", status_code=status.HTTP_200_OK)
 async def print_challan(
     data: ChallanNumber,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    challan_pdf = await challan_service.print_challan(data.challan_number, session)
-    return StreamingResponse(
-        challan_pdf,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{data.challan_number}.pdf"'
-        },
+    challan_pdf = await challan_service.print_challan(
+        data.challan_number, session, if_none_match
     )
+    return pdf_response(challan_pdf, f"{data.challan_number}.pdf")
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +9,30 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     FRONTEND_URL: str
+    PDF_RENDER_POOL: str = "thread"
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_QUEUE_SIZE: int = 8
+    PDF_RENDER_QUEUE_TIMEOUT: float = 10.0
+    PDF_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "unique_services_pdf")
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    BATCH_PRINT_MAX_DOCUMENTS: int = 100
+    BATCH_PRINT_JOB_TTL: float = 600.0
+    DASHBOARD_GROUP_TIMEOUT: float = 5.0
+    DASHBOARD_CACHE_TTL: float = 60.0
+    PRINCIPAL_CACHE_TTL: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_SIZE: int = 1024
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_MAX_FAILURES_PER_CLIENT: int = 20
+    LOGIN_FAILURE_WINDOW: float = 300.0
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
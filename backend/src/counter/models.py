@@ -0,0 +1,12 @@
+import sqlalchemy.dialects.postgresql as pg
+from sqlmodel import Column, Field, SQLModel
+
+
+class NumberCounter(SQLModel, table=True):
+    __tablename__ = "number_counter"
+    name: str = Field(sa_column=Column(pg.VARCHAR(20), primary_key=True))
+    # Last number handed out for this series
+    value: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+
+    def __repr__(self):
+        return f"<NumberCounter {self.name} - {self.value}>"
@@ -0,0 +1,67 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from .models import NumberCounter
+
+# Counter names, one per numbered series
+MASTER_CODE = "master"  # C0001
+ROAD_CHALLAN = "road_challan"  # N00001
+RETAIL_RCODE = "retail"  # X00001
+MARKET_MCODE = "market"  # M00001
+WARRANTY_SRF = "warranty_srf"  # R00001/1
+CNF_CHALLAN = "cnf_challan"  # U00001
+OUT_OF_WARRANTY_SRF = "out_of_warranty_srf"  # S00001/1
+VENDOR_CHALLAN = "vendor_challan"  # V00001
+
+
+class CounterService:
+    """
+    Hands out sequential numbers from the number_counter table.
+
+    Every lookup is a single primary key access, so the cost does not grow with
+    the size of the numbered tables. allocate() and bump() take a row lock on
+    the counter, so they must run inside the same transaction as the insert
+    that uses the number: concurrent creators queue on the lock, and a rollback
+    also rolls the counter back, leaving no gaps.
+    """
+
+    async def peek(self, name: str, session: AsyncSession) -> int:
+        """Returns the number the next allocate() call would hand out."""
+        statement = select(NumberCounter.value).where(NumberCounter.name == name)
+        result = await session.execute(statement)
+        value = result.scalar()
+        return (value or 0) + 1
+
+    async def last(self, name: str, session: AsyncSession) -> int:
+        """Returns the last number handed out, 0 if none."""
+        return await self.peek(name, session) - 1
+
+    async def allocate(self, name: str, session: AsyncSession) -> int:
+        """Increments the counter and returns the new value (does not commit)."""
+        statement = (
+            insert(NumberCounter)
+            .values(name=name, value=1)
+            .on_conflict_do_update(
+                index_elements=[NumberCounter.name],
+                set_={"value": NumberCounter.value + 1},
+            )
+            .returning(NumberCounter.value)
+        )
+        result = await session.execute(statement)
+        return result.scalar_one()
+
+    async def bump(self, name: str, value: int, session: AsyncSession) -> None:
+        """
+        Moves the counter forward to value if it is behind (does not commit).
+        Used where the number is chosen by the client, e.g. challan batches.
+        """
+        statement = (
+            insert(NumberCounter)
+            .values(name=name, value=value)
+            .on_conflict_do_update(
+                index_elements=[NumberCounter.name],
+                set_={"value": func.greatest(NumberCounter.value, value)},
+            )
+        )
+        await session.execute(statement)
@@ -1,23 +1,83 @@
+import time
 from typing import AsyncIterator
 
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import create_engine
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config import Config
+from db.query_stats import track_queries
 
-async_engine = AsyncEngine(
-    create_engine(
-        url=Config.DATABASE_URL_CONNECT,
-        echo=False,
-    )
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also records how long checkouts wait for a connection,
+    including the time to open an overflow connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            # Negative while the pool has not opened all of its connections yet
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": (
+                round(self.wait_seconds / self.checkouts * 1000, 2)
+                if self.checkouts
+                else 0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+
+async_engine = create_async_engine(
+    Config.DATABASE_URL_CONNECT,
+    echo=False,
+    poolclass=InstrumentedPool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args={
+        # Prepared statements kept per connection by the asyncpg dialect, 0
+        # turns them off (needed behind pgbouncer in transaction mode)
+        "prepared_statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE,
+    },
+)
+track_queries(async_engine)
+
+# Built once, every session of the app comes from here
+async_session_maker = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
-    Session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
-    async with Session() as session:
+    async with async_session_maker() as session:
         yield session
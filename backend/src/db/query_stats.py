@@ -0,0 +1,70 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Longest repr of the parameters written to the slow query log
+MAX_LOGGED_PARAMETERS = 500
+
+
+class QueryStats:
+    """Queries run on behalf of one request and the time spent in them."""
+
+    __slots__ = ("route", "count", "seconds")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set for the duration of a request by QueryStatsMiddleware. The object is
+# shared, not copied, by the tasks a request spawns (the dashboard groups),
+# so their queries add up in the same totals.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += seconds
+    if seconds * 1000 >= Config.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s | parameters: %s",
+            seconds * 1000,
+            stats.route if stats is not None else "-",
+            " ".join(statement.split()),
+            repr(parameters)[:MAX_LOGGED_PARAMETERS],
+        )
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    starts = exception_context.connection and exception_context.connection.info.get(
+        "query_start"
+    )
+    if starts:
+        starts.pop()
+
+
+def track_queries(engine: AsyncEngine):
+    """Count and time every statement the engine runs."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -86,6 +86,22 @@ class ServiceCenterAlreadyExists(BaseException):
     """Service Center Already Exists"""
 
 
+class PrintQueueFull(BaseException):
+    """Too many documents are waiting to be printed"""
+
+
+class TooManyLoginAttempts(BaseException):
+    """Too many failed logins in a short time"""
+
+
+class PrintDocumentsNotFound(BaseException):
+    """None of the documents of a batch print exist"""
+
+
+class PrintJobNotFound(BaseException):
+    """Batch print job not found or expired"""
+
+
 def create_exception_handler(
     status_code: int, initial_detail: Any
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -312,6 +328,54 @@ def register_exceptions(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        PrintQueueFull,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "Printer Busy",
+                "resolution": "Please retry the print in a few seconds",
+                "error_code": "print_queue_full",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        TooManyLoginAttempts,
+        create_exception_handler(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            initial_detail={
+                "message": "Too Many Login Attempts",
+                "resolution": "Please wait a few minutes before trying again",
+                "error_code": "too_many_login_attempts",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        PrintDocumentsNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "message": "No Documents Found",
+                "resolution": "Please check the SRF or challan numbers",
+                "error_code": "print_documents_not_found",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        PrintJobNotFound,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "message": "Print Job Not Found",
+                "resolution": "The print job has expired, please print again",
+                "error_code": "print_job_not_found",
+            },
+        ),
+    )
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request, exc):
         # Customize the error message here
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from auth.cache import principal_cache, token_cache
+from auth.dependencies import AccessTokenBearer
+from db.db import async_engine
+from pdf.renderer import pdf_renderer
+
+health_router = APIRouter()
+access_token_bearer = AccessTokenBearer()
+
+
+"""
+Returns the state of the PDF render pool:
+- pool, workers, queue_size,
+- in_flight, queue_depth, waiting_for_slot, rejected,
+- renders: per document kind counts, failures and render/queue times.
+- cache: entries, bytes, hit rate and evictions of the rendered PDF cache.
+"""
+
+
+@health_router.get("/pdf", status_code=status.HTTP_200_OK)
+async def pdf_render_stats(_=Depends(access_token_bearer)):
+    return JSONResponse(content=pdf_renderer.stats())
+
+
+"""
+Returns the size and hit rate of the authentication caches:
+- tokens: verified JWTs whose signature check was skipped,
+- principals: users whose lookup was skipped by RoleChecker.
+"""
+
+
+@health_router.get("/auth", status_code=status.HTTP_200_OK)
+async def auth_cache_stats(_=Depends(access_token_bearer)):
+    return JSONResponse(
+        content={"tokens": token_cache.stats(), "principals": principal_cache.stats()}
+    )
+
+
+"""
+Returns the state of the database connection pool:
+- size, checked_in, checked_out, overflow, max_overflow,
+- checkouts, timeouts and the average/max wait for a connection.
+"""
+
+
+@health_router.get("/db", status_code=status.HTTP_200_OK)
+async def db_pool_stats(_=Depends(access_token_bearer)):
+    return JSONResponse(content=async_engine.pool.stats())
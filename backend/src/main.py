@@ -1,14 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 
 from auth.routes import auth_router
+from auth.utils import password_executor
+from batch_print.routes import batch_print_router
 from challan.routes import challan_router
 from exceptions import register_exceptions
+from health.routes import health_router
 from market.routes import market_router
 from master.routes import master_router
 from menu.routes import menu_router
+from metrics.routes import metrics_router
 from middleware.middleware import register_middleware
 from out_of_warranty.routes import out_of_warranty_router
+from pdf.renderer import pdf_renderer
+from pdf.templates import template_registry
 from retail.routes import retail_router
 from service_center.routes import service_center_router
 from service_charge.routes import service_charge_router
@@ -17,6 +25,17 @@ from warranty.routes import warranty_router
 
 version = "v1"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse the print templates once, before the first request
+    template_registry.preload()
+    yield
+    # Let in-flight renders and password hashes finish before shutting down
+    pdf_renderer.shutdown()
+    password_executor.shutdown(wait=True)
+
+
 app = FastAPI(
     version=version,
     title="Unique Services",
@@ -30,6 +49,7 @@ app = FastAPI(
     openapi_url=f"/openapi.json",
     docs_url=f"/docs",
     redoc_url=f"/redoc",
+    lifespan=lifespan,
 )
 
 
@@ -78,3 +98,6 @@ app.include_router(
 app.include_router(
     out_of_warranty_router, prefix="/out_of_warranty", tags=["Out of Warranty"]
 )
+app.include_router(batch_print_router, prefix="/batch_print", tags=["Batch Print"])
+app.include_router(health_router, prefix="/health", tags=["Health"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
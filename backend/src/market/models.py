@@ -1,12 +1,26 @@
 from datetime import date
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlmodel import Column, Field, SQLModel
 
 
 class Market(SQLModel, table=True):
     __tablename__ = "market"
+    __table_args__ = (
+        Index(
+            "ix_market_delivery_by_trgm",
+            "delivery_by",
+            postgresql_using="gin",
+            postgresql_ops={"delivery_by": "gin_trgm_ops"},
+        ),
+        # Partial index behind the pending list
+        Index(
+            "ix_market_pending",
+            "mcode",
+            postgresql_where=text("final_status = 'N'"),
+        ),
+    )
     mcode: str = Field(primary_key=True, index=True)
     code: str = Field(
         sa_column=Column(
@@ -1,8 +1,8 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from auth.dependencies import AccessTokenBearer
@@ -17,6 +17,7 @@ from market.schemas import (
     MarketUpdate,
 )
 from market.service import MarketService
+from utils.pagination import MAX_ENQUIRY_PAGE_SIZE, NEXT_CURSOR_HEADER
 
 market_router = APIRouter()
 market_service = MarketService()
@@ -108,6 +109,7 @@ Filter market enquiry records
 
 @market_router.get("/enquiry", response_model=List[MarketEnquiry])
 async def master_enquiry(
+    response: Response,
     final_status: Optional[str] = None,
     name: Optional[str] = None,
     division: Optional[str] = None,
@@ -116,11 +118,29 @@ async def master_enquiry(
     delivered_by: Optional[str] = None,
     invoice_number: Optional[str] = None,
     challan_number: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ENQUIRY_PAGE_SIZE),
+    stream: bool = False,
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
+    if stream:
+        # NDJSON, read through a server side cursor
+        return StreamingResponse(
+            market_service.stream_market_enquiry(
+                final_status,
+                name,
+                division,
+                from_delivery_date,
+                to_delivery_date,
+                delivered_by,
+                invoice_number,
+                challan_number,
+            ),
+            media_type="application/x-ndjson",
+        )
     try:
-        enquiry_list = await market_service.get_market_enquiry(
+        enquiry_list, next_cursor = await market_service.get_market_enquiry(
             session,
             final_status,
             name,
@@ -129,7 +149,12 @@ async def master_enquiry(
             to_delivery_date,
             delivered_by,
             invoice_number,
+            challan_number,
+            after=after,
+            limit=limit,
         )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return enquiry_list
     except:
         return []
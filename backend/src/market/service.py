@@ -1,10 +1,10 @@
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy import case, func, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Select, case, func, select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from counter.service import MARKET_MCODE, CounterService
 from exceptions import IncorrectCodeFormat, MarketNotFound, MasterNotFound
 from market.models import Market
 from market.schemas import (
@@ -16,43 +16,56 @@ from market.schemas import (
 )
 from master.models import Master
 from master.service import MasterService
+from menu.cache import MARKET_GROUP, dashboard_cache
 from utils.date_utils import format_date_ddmmyyyy, parse_date
+from utils.pagination import keyset_page, stream_ndjson
+from utils.projection import Projection
+from utils.search import contains
 
+counter_service = CounterService()
 master_service = MasterService()
 
+# Columns behind each enquiry row
+MARKET_ENQUIRY = Projection(
+    MarketEnquiry,
+    mcode=Market.mcode,
+    name=Master.name,
+    contact1=Master.contact1,
+    contact2=Master.contact2,
+    division=Market.division,
+    invoice_number=Market.invoice_number,
+    invoice_date=(Market.invoice_date, format_date_ddmmyyyy),
+    challan_number=Market.challan_number,
+    quantity=Market.quantity,
+    delivery_date=(Market.delivery_date, format_date_ddmmyyyy),
+    delivery_by=Market.delivery_by,
+)
+
 
 class MarketService:
 
     async def create_market(
         self, session: AsyncSession, market: CreateMarket, token: dict
     ):
-        for _ in range(3):  # Retry up to 3 times in case of IntegrityError
-            master = await master_service.get_master_by_name(market.name, session)
-            market_data_dict = market.model_dump()
-            market_data_dict["mcode"] = await self.market_next_mcode(session)
-            market_data_dict["created_by"] = token["user"]["username"]
-            market_data_dict["code"] = master.code
-            # Convert date fields to date objects
-            for date_field in ["receive_date", "invoice_date", "challan_date"]:
-                if date_field in market_data_dict:
-                    market_data_dict[date_field] = parse_date(
-                        market_data_dict[date_field]
-                    )
-            market_data_dict.pop("name", None)
-            new_market = Market(**market_data_dict)
-            session.add(new_market)
-            try:
-                await session.commit()
-                return new_market
-            except IntegrityError as e:
-                await session.rollback()
+        master = await master_service.get_master_by_name(market.name, session)
+        market_data_dict = market.model_dump()
+        next_mcode = await counter_service.allocate(MARKET_MCODE, session)
+        market_data_dict["mcode"] = "M" + str(next_mcode).zfill(5)
+        market_data_dict["created_by"] = token["user"]["username"]
+        market_data_dict["code"] = master.code
+        # Convert date fields to date objects
+        for date_field in ["receive_date", "invoice_date", "challan_date"]:
+            if date_field in market_data_dict:
+                market_data_dict[date_field] = parse_date(market_data_dict[date_field])
+        market_data_dict.pop("name", None)
+        new_market = Market(**market_data_dict)
+        session.add(new_market)
+        await session.commit()
+        dashboard_cache.invalidate(MARKET_GROUP)
+        return new_market
 
     async def market_next_mcode(self, session: AsyncSession):
-        statement = select(Market.mcode).order_by(Market.mcode.desc()).limit(1)
-        result = await session.execute(statement)
-        last_mcode = result.scalar()
-        last_number = last_mcode[1:] if last_mcode else "0"
-        next_mcode = int(last_number) + 1
+        next_mcode = await counter_service.peek(MARKET_MCODE, session)
         next_mcode = "M" + str(next_mcode).zfill(5)
         return next_mcode
 
@@ -108,12 +121,12 @@ class MarketService:
         existing_market.updated_by = token["user"]["username"]
         session.add(existing_market)
         await session.commit()
+        dashboard_cache.invalidate(MARKET_GROUP)
         await session.refresh(existing_market)
         return existing_market
 
-    async def get_market_enquiry(
+    def _enquiry_statement(
         self,
-        session: AsyncSession,
         final_status: Optional[str] = None,
         name: Optional[str] = None,
         division: Optional[str] = None,
@@ -122,15 +135,19 @@ class MarketService:
         delivered_by: Optional[str] = None,
         invoice_number: Optional[str] = None,
         challan_number: Optional[str] = None,
-    ) -> List[MarketEnquiry]:
+    ) -> Select:
         # Check if master name exists
-        statement = select(Market, Master).join(Master, Master.code == Market.code)
+        statement = (
+            MARKET_ENQUIRY.select()
+            .select_from(Market)
+            .join(Master, Master.code == Market.code)
+        )
         # Apply filters dynamically
         if final_status:
             statement = statement.where(Market.final_status == final_status)
 
         if name:
-            statement = statement.where(Master.name.ilike(f"%{name}%"))
+            statement = statement.where(contains(Master.name, name))
 
         if division:
             statement = statement.where(Market.division == division)
@@ -141,7 +158,7 @@ class MarketService:
             statement = statement.where(Market.delivery_date <= to_delivery_date)
 
         if delivered_by:
-            statement = statement.where(Market.delivery_by.ilike(f"%{delivered_by}%"))
+            statement = statement.where(contains(Market.delivery_by, delivered_by))
 
         if invoice_number:
             statement = statement.where(
@@ -150,31 +167,58 @@ class MarketService:
         if challan_number:
             statement = statement.where(
                 Market.challan_number == challan_number)    
+        return statement
 
-        statement = statement.order_by(Market.mcode)
+    async def get_market_enquiry(
+        self,
+        session: AsyncSession,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_delivery_date: Optional[date] = None,
+        to_delivery_date: Optional[date] = None,
+        delivered_by: Optional[str] = None,
+        invoice_number: Optional[str] = None,
+        challan_number: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[MarketEnquiry], Optional[str]]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_delivery_date,
+            to_delivery_date,
+            delivered_by,
+            invoice_number,
+            challan_number,
+        )
+        return await keyset_page(
+            session, statement, Market.mcode, MARKET_ENQUIRY.build, after, limit
+        )
 
-        result = await session.execute(statement)
-        rows = result.all()
-        return [
-            MarketEnquiry(
-                mcode=row.Market.mcode,
-                name=row.Master.name,
-                contact1=row.Master.contact1,
-                contact2=row.Master.contact2,
-                division=row.Market.division,
-                invoice_number=row.Market.invoice_number,
-                invoice_date=format_date_ddmmyyyy(row.Market.invoice_date),
-                challan_number=row.Market.challan_number,
-                quantity=row.Market.quantity,
-                delivery_date=(
-                    format_date_ddmmyyyy(row.Market.delivery_date)
-                    if row.Market.delivery_date
-                    else None
-                ),
-                delivery_by=row.Market.delivery_by,
-            )
-            for row in rows
-        ]
+    def stream_market_enquiry(
+        self,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_delivery_date: Optional[date] = None,
+        to_delivery_date: Optional[date] = None,
+        delivered_by: Optional[str] = None,
+        invoice_number: Optional[str] = None,
+        challan_number: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_delivery_date,
+            to_delivery_date,
+            delivered_by,
+            invoice_number,
+            challan_number,
+        )
+        return stream_ndjson(statement, Market.mcode, MARKET_ENQUIRY.build)
 
     async def list_delivered_by(self, session: AsyncSession):
         statement = (
@@ -1,10 +1,19 @@
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlmodel import Column, Field, SQLModel
 
 
 class Master(SQLModel, table=True):
     __tablename__ = "master"
+    __table_args__ = (
+        # pg_trgm index behind the name search and the name filter of enquiries
+        Index(
+            "ix_master_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
     code: str = Field(primary_key=True, index=True)
     name: str = Field(sa_column=Column(pg.VARCHAR(40), nullable=False, unique=True))
     address: str = Field(sa_column=Column(pg.VARCHAR(40), nullable=False))
@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -13,9 +13,11 @@ from master.schemas import (
     MasterCode,
     MasterName,
     MasterResponse,
+    MasterSearchResult,
     UpdateMaster,
 )
 from master.service import MasterService
+from utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 master_router = APIRouter()
 master_service = MasterService()
@@ -62,6 +64,24 @@ async def list_master_names(
     return names
 
 
+"""
+Typeahead search of master names, closest matches first.
+"""
+
+
+@master_router.get(
+    "/search", response_model=List[MasterSearchResult], status_code=status.HTTP_200_OK
+)
+async def search_masters(
+    q: str = Query(..., min_length=1, max_length=40),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    session: AsyncSession = Depends(get_session),
+    _=Depends(access_token_bearer),
+):
+    results = await master_service.search_masters(q, session, limit)
+    return results
+
+
 """
 Get master details by code.
 """
@@ -40,3 +40,9 @@ class MasterName(BaseModel):
 
 class MasterAddress(BaseModel):
     full_address: str
+
+
+class MasterSearchResult(BaseModel):
+    code: str
+    name: str
+    city: str
@@ -1,16 +1,30 @@
-from sqlalchemy import func, select, union_all
+from typing import List
+
+from sqlalchemy import func, or_, select, union_all
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from counter.service import MASTER_CODE, CounterService
 from exceptions import (
     CannotChangeMasterName,
     IncorrectCodeFormat,
     MasterAlreadyExists,
     MasterNotFound,
 )
+from menu.cache import MASTER_GROUP, dashboard_cache
+from utils.search import SEARCH_LIMIT, contains, starts_with
 
 from .models import Master
-from .schemas import CreateMaster, UpdateMaster
+from .schemas import CreateMaster, MasterSearchResult, UpdateMaster
+
+counter_service = CounterService()
+
+
+def full_address(master: Master) -> str:
+    address = master.address + ", " + master.city
+    if master.pin:
+        address += " - " + master.pin
+    return address
 
 
 class MasterService:
@@ -18,27 +32,25 @@ class MasterService:
     async def create_master(
         self, session: AsyncSession, master: CreateMaster, token: dict
     ):
-        for _ in range(3):  # Retry up to 3 times
-            master_data_dict = master.model_dump()
-            master_data_dict["code"] = await self.master_next_code(session)
-            if await self.check_master_name_available(master.name, session):
-                raise MasterAlreadyExists()
-            master_data_dict["created_by"] = token["user"]["username"]
-            new_master = Master(**master_data_dict)
-            session.add(new_master)
-            try:
-                await session.commit()
-                return new_master
-            except IntegrityError:
-                await session.rollback()
+        if await self.check_master_name_available(master.name, session):
             raise MasterAlreadyExists()
+        master_data_dict = master.model_dump()
+        next_code = await counter_service.allocate(MASTER_CODE, session)
+        master_data_dict["code"] = "C" + str(next_code).zfill(4)
+        master_data_dict["created_by"] = token["user"]["username"]
+        new_master = Master(**master_data_dict)
+        session.add(new_master)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Name taken by a concurrent create, counter is rolled back too
+            await session.rollback()
+            raise MasterAlreadyExists()
+        dashboard_cache.invalidate(MASTER_GROUP)
+        return new_master
 
     async def master_next_code(self, session: AsyncSession):
-        statement = select(Master.code).order_by(Master.code.desc()).limit(1)
-        result = await session.execute(statement)
-        last_code = result.scalar()
-        last_number = last_code[1:] if last_code else "0"
-        next_code = int(last_number) + 1
+        next_code = await counter_service.peek(MASTER_CODE, session)
         next_code = "C" + str(next_code).zfill(4)
         return next_code
 
@@ -58,6 +70,31 @@ class MasterService:
         names = result.scalars().all()
         return names
 
+    async def search_masters(
+        self, q: str, session: AsyncSession, limit: int = SEARCH_LIMIT
+    ) -> List[MasterSearchResult]:
+        q = q.strip()
+        if not q:
+            return []
+        # Names containing q, or close to a word of it (q <% name) to forgive
+        # typos. Both are answered from the trigram index on master.name.
+        # Prefix matches rank first, then the closest names.
+        statement = (
+            select(Master.code, Master.name, Master.city)
+            .where(or_(contains(Master.name, q), Master.name.op("%>")(q)))
+            .order_by(
+                starts_with(Master.name, q).desc(),
+                func.word_similarity(q, Master.name).desc(),
+                Master.name,
+            )
+            .limit(limit)
+        )
+        result = await session.execute(statement)
+        return [
+            MasterSearchResult(code=row.code, name=row.name, city=row.city)
+            for row in result.all()
+        ]
+
     async def get_master_by_code(self, code: str, session: AsyncSession):
         # format code to C____
         if len(code) != 5:
@@ -95,24 +132,19 @@ class MasterService:
         except:
             await session.rollback()
             raise MasterAlreadyExists()
+        dashboard_cache.invalidate(MASTER_GROUP)
         await session.refresh(existing_master)
         return existing_master
 
     async def get_address(self, name: str, session: AsyncSession):
         master = await self.get_master_by_name(name, session)
-        full_address = master.address + ", " + master.city
-        if master.pin:
-            full_address += " - " + master.pin
-        return full_address
+        return full_address(master)
 
     async def get_master_details(self, code: str, session: AsyncSession):
         master = await self.get_master_by_code(code, session)
-        full_address = master.address + ", " + master.city
-        if master.pin:
-            full_address += " - " + master.pin
         return {
             "name": master.name,
-            "full_address": full_address,
+            "full_address": full_address(master),
             "contact1": master.contact1,
             "gst": master.gst,
         }
@@ -0,0 +1,55 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+# Dashboard groups, one per MenuService overview
+MASTER_GROUP = "master"
+RETAIL_GROUP = "retail"
+CHALLAN_GROUP = "challan"
+WARRANTY_GROUP = "warranty"
+OUT_OF_WARRANTY_GROUP = "out_of_warranty"
+MARKET_GROUP = "market"
+
+
+class DashboardCache:
+    """
+    Snapshot of the dashboard overview groups.
+
+    An entry lives for `ttl` seconds, or until a write in the owning service
+    invalidates its group. The top customers list in the master group counts
+    rows from every table, but it is only refreshed by the TTL, so that each
+    write invalidates its own group and nothing else.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, dict]] = {}
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, group: str) -> Optional[dict]:
+        entry = self._entries.get(group)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def version(self, group: str) -> int:
+        return self._versions.get(group, 0)
+
+    def set(self, group: str, value: dict, version: int) -> None:
+        # A write that landed while the group was being computed makes the
+        # result stale already, so it is not stored
+        if self.version(group) == version:
+            self._entries[group] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, *groups: str) -> None:
+        for group in groups:
+            self._versions[group] = self.version(group) + 1
+            self._entries.pop(group, None)
+
+
+dashboard_cache = DashboardCache(ttl=Config.DASHBOARD_CACHE_TTL)
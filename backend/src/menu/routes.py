@@ -1,13 +1,12 @@
 import asyncio
+import hashlib
 import json
 import os
 
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
-from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import Response
 
 from auth.dependencies import AccessTokenBearer
-from db.db import get_session
 from menu.service import MenuService
 
 menu_router = APIRouter()
@@ -33,68 +32,78 @@ Returns dashboard data:
 
 
 @menu_router.get("/dashboard", status_code=status.HTTP_200_OK)
-async def get_dashboard_data(
-    session: AsyncSession = Depends(get_session), _=Depends(access_token_bearer)
-):
-    # Use the grouped service methods (these each make multiple internal queries
-    # but significantly reduce number of round-trips overall).
-    master = await menu_service.master_overview(session)
-    retail = await menu_service.retail_overview(session)
-    challan = await menu_service.challan_overview(session)
-    warranty = await menu_service.warranty_overview(session)
-    ow = await menu_service.out_of_warranty_overview(session)
-    market = await menu_service.market_overview(session)
-
-    number_of_customers = master["master_count"]
-    number_of_asc_names = master["asc_count"]
-    top_customers = master["top_customers"]
-
-    retail_division_wise_data = retail["division_counts"]
-    retail_received_settled_unsettled = retail["pie"]
-
-    number_of_challan = challan["challan_count"]
-    challan_number_of_items = challan["items_count"]
-    challan_rolling_months = challan["rolling"]
-
-    market_status_per_division = market["status_list"]
-    total_markets = market["total_markets"]
-
-    warranty_pending_completed_per_division = warranty["pending_completed"]
-    warranty_srf_delivery = warranty["srf_delivery"]
-    warranty_heads = warranty["heads"]
-
-    ow_srf_repair_delivery = ow["srf_repair_delivery"]
-    ow_pending_completed_per_division = ow["pending_completed"]
-    ow_count = ow["count"]
+async def get_dashboard_data(request: Request, _=Depends(access_token_bearer)):
+    # Groups come from the dashboard cache or run concurrently, each on its own
+    # connection. A group that is too slow comes back as None and is listed
+    # under "unavailable".
+    overview = await menu_service.dashboard_overview()
+    master = overview["master"]
+    retail = overview["retail"]
+    challan = overview["challan"]
+    warranty = overview["warranty"]
+    ow = overview["out_of_warranty"]
+    market = overview["market"]
 
     dashboard_data = {
-        "customer": {
-            "number_of_customers": ((number_of_customers // 10) * 10),
-            "number_of_asc_names": ((number_of_asc_names // 10) * 10),
-            "top_customers": top_customers,
-        },
-        "challan": {
-            "number_of_challans": ((number_of_challan // 10) * 10),
-            "number_of_items": ((challan_number_of_items // 10) * 10),
-            "challan_rolling_months": challan_rolling_months,
-        },
-        "retail": {
-            "division_wise_donut": retail_division_wise_data,
-            "settled_vs_unsettled_pie_chart": retail_received_settled_unsettled,
-        },
-        "market": {
-            "status_per_division_stacked_bar_chart": market_status_per_division,
-            "total_markets": ((total_markets // 10) * 10),
-        },
-        "warranty": {
-            "division_wise_pending_completed_bar_graph": warranty_pending_completed_per_division,
-            "srf_vs_delivery_month_wise_bar_graph": warranty_srf_delivery,
-            "warranty_heads": warranty_heads,
-        },
-        "out_of_warranty": {
-            "srf_receive_vs_delivery_bar_graph": ow_srf_repair_delivery,
-            "final_status_bar_graph": ow_pending_completed_per_division,
-            "out_of_warranty_count": ((ow_count // 10) * 10),
-        },
+        "customer": (
+            {
+                "number_of_customers": ((master["master_count"] // 10) * 10),
+                "number_of_asc_names": ((master["asc_count"] // 10) * 10),
+                "top_customers": master["top_customers"],
+            }
+            if master
+            else None
+        ),
+        "challan": (
+            {
+                "number_of_challans": ((challan["challan_count"] // 10) * 10),
+                "number_of_items": ((challan["items_count"] // 10) * 10),
+                "challan_rolling_months": challan["rolling"],
+            }
+            if challan
+            else None
+        ),
+        "retail": (
+            {
+                "division_wise_donut": retail["division_counts"],
+                "settled_vs_unsettled_pie_chart": retail["pie"],
+            }
+            if retail
+            else None
+        ),
+        "market": (
+            {
+                "status_per_division_stacked_bar_chart": market["status_list"],
+                "total_markets": ((market["total_markets"] // 10) * 10),
+            }
+            if market
+            else None
+        ),
+        "warranty": (
+            {
+                "division_wise_pending_completed_bar_graph": warranty[
+                    "pending_completed"
+                ],
+                "srf_vs_delivery_month_wise_bar_graph": warranty["srf_delivery"],
+                "warranty_heads": warranty["heads"],
+            }
+            if warranty
+            else None
+        ),
+        "out_of_warranty": (
+            {
+                "srf_receive_vs_delivery_bar_graph": ow["srf_repair_delivery"],
+                "final_status_bar_graph": ow["pending_completed"],
+                "out_of_warranty_count": ((ow["count"] // 10) * 10),
+            }
+            if ow
+            else None
+        ),
+        "unavailable": [name for name, group in overview.items() if group is None],
     }
-    return JSONResponse(content=dashboard_data)
+    body = json.dumps(dashboard_data, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,16 +1,31 @@
+import asyncio
+import logging
 from datetime import date, timedelta
 
 from sqlalchemy import case, func, select, union_all
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from challan.models import Challan
+from config import Config
+from db.db import async_session_maker
 from market.models import Market
 from master.models import Master
+from menu.cache import (
+    CHALLAN_GROUP,
+    MARKET_GROUP,
+    MASTER_GROUP,
+    OUT_OF_WARRANTY_GROUP,
+    RETAIL_GROUP,
+    WARRANTY_GROUP,
+    dashboard_cache,
+)
 from out_of_warranty.models import OutOfWarranty
 from retail.models import Retail
 from service_center.models import ServiceCentre
 from warranty.models import Warranty
 
+logger = logging.getLogger(__name__)
+
 
 class MenuService:
 
@@ -365,3 +380,52 @@ class MenuService:
 
         return {"status_list": status_list, "total_markets": total_markets}
 
+    # ---------------------------
+    # DASHBOARD (all groups, concurrently)
+    # ---------------------------
+    async def _run_group(self, name: str, overview, timeout: float):
+        cached = dashboard_cache.get(name)
+        if cached is not None:
+            return cached
+        version = dashboard_cache.version(name)
+        # Every group gets its own pooled connection so the groups run in parallel
+        async with async_session_maker() as session:
+            result = await asyncio.wait_for(overview(session), timeout=timeout)
+        dashboard_cache.set(name, result, version)
+        return result
+
+    async def dashboard_overview(
+        self, timeout: float = Config.DASHBOARD_GROUP_TIMEOUT
+    ) -> dict:
+        """
+        Returns all overview groups, from the dashboard cache where possible.
+        The missing groups are computed concurrently, each bounded by `timeout`
+        seconds. A group that times out or fails is returned as None, so the
+        rest of the dashboard is still served.
+        """
+        groups = {
+            MASTER_GROUP: self.master_overview,
+            RETAIL_GROUP: self.retail_overview,
+            CHALLAN_GROUP: self.challan_overview,
+            WARRANTY_GROUP: self.warranty_overview,
+            OUT_OF_WARRANTY_GROUP: self.out_of_warranty_overview,
+            MARKET_GROUP: self.market_overview,
+        }
+        results = await asyncio.gather(
+            *(
+                self._run_group(name, overview, timeout)
+                for name, overview in groups.items()
+            ),
+            return_exceptions=True,
+        )
+
+        overview = {}
+        for name, result in zip(groups, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning("Dashboard group %s timed out after %ss", name, timeout)
+                result = None
+            elif isinstance(result, Exception):
+                logger.warning("Dashboard group %s failed: %r", name, result)
+                result = None
+            overview[name] = result
+        return overview
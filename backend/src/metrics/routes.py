@@ -0,0 +1,68 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from db.db import async_engine
+from metrics.collectors import Counter, Gauge, registry
+
+metrics_router = APIRouter()
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_metric(kind, name: str, documentation: str, read):
+    """A metric read from the connection pool when the metrics are scraped."""
+    return registry.register(
+        kind(name, documentation, collect=lambda: {(): read(async_engine.pool)})
+    )
+
+
+_pool_metric(
+    Gauge, "db_pool_size", "Connections the pool keeps open.", lambda p: p.size()
+)
+_pool_metric(
+    Gauge,
+    "db_pool_checked_out",
+    "Connections in use right now.",
+    lambda p: p.checkedout(),
+)
+_pool_metric(
+    Gauge,
+    "db_pool_overflow",
+    "Overflow connections open beyond the pool size (negative until it fills).",
+    lambda p: p.overflow(),
+)
+_pool_metric(
+    Counter,
+    "db_pool_checkouts_total",
+    "Connections handed out since start.",
+    lambda p: p.checkouts,
+)
+_pool_metric(
+    Counter,
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a connection since start.",
+    lambda p: p.timeouts,
+)
+_pool_metric(
+    Counter,
+    "db_pool_wait_seconds_total",
+    "Total time spent waiting for a connection since start.",
+    lambda p: p.wait_seconds,
+)
+
+
+"""
+Returns every metric of the app in the Prometheus text format:
+- http_requests_total, http_request_duration_seconds and
+  http_requests_in_flight, by method and route template,
+- db_pool_*: the state of the database connection pool,
+- pdf_render_duration_seconds, by template,
+- http_body_rewrite_seconds: the JSON body normalisation of the middleware.
+Left open for the scraper, it only exposes aggregates.
+"""
+
+
+@metrics_router.get("", status_code=status.HTTP_200_OK)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
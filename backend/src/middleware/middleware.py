@@ -3,21 +3,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from config import Config
-from middleware.capitalize import CapitalizeJSONMiddleware
-from middleware.strip import StripJSONMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.normalize import NormalizeJSONMiddleware
+from middleware.query_stats import (
+    DB_QUERIES_HEADER,
+    SERVER_TIMING_HEADER,
+    QueryStatsMiddleware,
+)
+from utils.pagination import NEXT_CURSOR_HEADER
 
 
 def register_middleware(app: FastAPI):
 
-    app.add_middleware(CapitalizeJSONMiddleware)
+    # Added first, so it runs innermost and sees the matched route
+    app.add_middleware(MetricsMiddleware)
 
-    app.add_middleware(StripJSONMiddleware)
+    app.add_middleware(NormalizeJSONMiddleware)
+
+    app.add_middleware(QueryStatsMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[Config.FRONTEND_URL],
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            NEXT_CURSOR_HEADER,
+            DB_QUERIES_HEADER,
+            SERVER_TIMING_HEADER,
+            "ETag",
+        ],
         allow_credentials=True,
     )
 
@@ -0,0 +1,102 @@
+import time
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics.collectors import http_body_rewrite_seconds
+
+# Paths whose bodies must reach the handler untouched (passwords, usernames)
+EXCLUDED_PATH_PREFIXES = (
+    "/auth/login",
+    "/user/create_user",
+    "/user/reset_password",
+    "/user/delete_user",
+)
+
+# Methods that never carry a JSON body worth rewriting
+PASSTHROUGH_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def normalize_values(data):
+    """
+    Strips leading/trailing spaces and uppercases every string value in a
+    dict/list, in a single recursive pass. Keys are left as they are.
+    """
+    if isinstance(data, str):
+        return data.strip().upper()
+    elif isinstance(data, dict):
+        return {k: normalize_values(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [normalize_values(item) for item in data]
+    else:
+        return data
+
+
+def is_json(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            return value.split(b";", 1)[0].strip().lower() == b"application/json"
+    return False
+
+
+class NormalizeJSONMiddleware:
+    """
+    Pure ASGI middleware that strips and uppercases all string values of a JSON
+    request body before it reaches the route.
+
+    The body is decoded and encoded once per request. GET/HEAD/OPTIONS, non
+    JSON requests and excluded paths are passed straight through without
+    buffering the body.
+    """
+
+    def __init__(
+        self, app: ASGIApp, excluded_prefixes: tuple = EXCLUDED_PATH_PREFIXES
+    ) -> None:
+        self.app = app
+        self.excluded_prefixes = tuple(excluded_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in PASSTHROUGH_METHODS
+            or scope["path"].startswith(self.excluded_prefixes)
+            or not is_json(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away before sending the whole body
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        if body:
+            start = time.perf_counter()
+            try:
+                body = orjson.dumps(normalize_values(orjson.loads(body)))
+            except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+                pass
+            http_body_rewrite_seconds.observe(time.perf_counter() - start)
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value)
+                for name, value in scope["headers"]
+                if name != b"content-length"
+            ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+
+        body_sent = False
+
+        async def replay() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay, send)
@@ -0,0 +1,56 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.query_stats import QueryStats, current_query_stats
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware counting the SQL queries of each request. The count
+    and the time spent in the database so far are sent back with the response
+    headers:
+
+        X-DB-Queries: 4
+        Server-Timing: db;dur=12.5;desc="4 queries", app;dur=30.1
+
+    For streamed responses the headers cover the queries run before the
+    first byte.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = current_query_stats.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (DB_QUERIES_HEADER.lower().encode("latin-1"), b"%d" % stats.count),
+                    (
+                        SERVER_TIMING_HEADER.lower().encode("latin-1"),
+                        timing.encode("latin-1"),
+                    ),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
@@ -0,0 +1,227 @@
+from pdf.compose import render_copies, render_pages, stamp_copies
+from pdf.layout import text_width, wrap_text
+from pdf.table import TableStyle, draw_table, layout_table
+from pdf.templates import ESTIMATE_TEMPLATE, SRF_TEMPLATE, VENDOR_CHALLAN_TEMPLATE
+
+# The lower copy of a vendor challan sits this far below the upper one
+VENDOR_CHALLAN_COPY_OFFSET = 393
+# Columns of a vendor challan row
+VENDOR_CHALLAN_COLUMNS = [
+    {"x": 21, "width": 21},  # Sl No
+    {"x": 46, "width": 74},  # SRF No
+    {"x": 125, "width": 85},  # Division
+    {"x": 220, "width": 100},  # Model
+    {"x": 330, "width": 100},  # Serial No
+    {"x": 440, "width": 135},  # Remark
+]
+# Drawn at 8 points, but wrapped and centred at 9 as it has always been
+VENDOR_CHALLAN_STYLE = TableStyle(
+    line_spacing=8, min_row_height=20, row_padding=0.2, draw_size=8
+)
+# Where the first row is placed, and the lowest a row may reach: the foot of
+# the ruled table of the upper copy
+VENDOR_CHALLAN_TABLE_TOP = 661
+VENDOR_CHALLAN_TABLE_BOTTOM = 499
+
+
+def draw_srf_overlay(
+    can, rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+):
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(110, 736, srf_no)
+    can.drawString(480, 736, srf_date)
+    can.drawString(300, 736, code)
+    can.drawString(190, 680, name)
+    can.drawString(190, 655, address)
+    can.drawString(190, 630, contact1)
+    can.drawString(475, 630, gst)
+    can.drawString(410, 140, received_by)
+
+    start_y = 556
+    y = start_y
+    line_spacing = 8
+    min_row_height = 16
+    row_padding = 7
+    columns = [
+        {"x": 10, "width": 20},
+        {"x": 40, "width": 50},
+        {"x": 105, "width": 95},
+        {"x": 210, "width": 75},
+        {"x": 290, "width": 110},
+        {"x": 405, "width": 110},
+        {"x": 520, "width": 60},
+    ]
+
+    can.setFont("Helvetica", 9)
+
+    for idx, row in enumerate(rows, 1):
+        division = row[2] or ""
+        model = row[3] or ""
+        slno = row[4] or ""
+        remark = row[5] or ""
+        service_charge_raw = row[6]
+        service_charge = f"{service_charge_raw:.2f}"
+        problem = row[14] or ""
+
+        row_data = [
+            str(idx),
+            division,
+            model,
+            str(slno),
+            problem,
+            remark,
+            str(service_charge),
+        ]
+
+        row_lines = [
+            wrap_text(str(text), "Helvetica", 9, col["width"])
+            for col, text in zip(columns, row_data)
+        ]
+
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max(max_lines * line_spacing, min_row_height)
+
+        # Only the first page of the overlay is printed
+        if y - row_height < 100:
+            break
+
+        for col, lines in zip(columns, row_lines):
+            total_text_height = len(lines) * line_spacing
+            vertical_offset = (row_height - total_text_height) / 2
+
+            for i, ln in enumerate(lines):
+                line_width = text_width(ln, "Helvetica", 9)
+                center_x = col["x"] + col["width"] / 2 - line_width / 2
+                y_position = y - vertical_offset - (i * line_spacing)
+                can.drawString(center_x, y_position, ln)
+
+        y -= row_height + row_padding
+
+
+def render_srf(
+    rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+) -> bytes:
+    """
+    Renders the customer and ASC copies of an SRF receipt and returns the PDF.
+    """
+    # Both copies carry the same details, the overlay is drawn once
+    overlay_pages = render_copies(
+        lambda can: draw_srf_overlay(
+            can, rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+        )
+    )
+    return stamp_copies(SRF_TEMPLATE, overlay_pages)
+
+
+def vendor_challan_cells(rows):
+    for idx, row in enumerate(rows, 1):
+        srf = row[3] or ""
+        division = row[4] or ""
+        model = row[5] or ""
+        slno = row[6] or ""
+        remark = row[7] or ""
+        yield [str(idx), srf, division, model, str(slno), remark]
+
+
+def draw_vendor_challan_overlay(can, placed, challan_no, challan_date, received_by):
+    """One page of one copy of the challan, the upper half of the sheet."""
+    # Header
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(140, 735, challan_no)
+    can.drawString(490, 735, challan_date)
+    can.drawString(220, 700, received_by)
+
+    # Table
+    draw_table(can, VENDOR_CHALLAN_COLUMNS, placed, VENDOR_CHALLAN_STYLE)
+
+
+def render_vendor_challan(rows, challan_no, challan_date, received_by) -> bytes:
+    """
+    Renders a vendor challan and returns the PDF. Rows that do not fit in
+    the table go on further sheets, each with the header printed again.
+    """
+    pages = layout_table(
+        vendor_challan_cells(rows),
+        [col["width"] for col in VENDOR_CHALLAN_COLUMNS],
+        VENDOR_CHALLAN_STYLE,
+        VENDOR_CHALLAN_TABLE_TOP,
+        VENDOR_CHALLAN_TABLE_BOTTOM,
+    )
+    overlay_pages = render_pages(
+        lambda can, page: draw_vendor_challan_overlay(
+            can, pages[page], challan_no, challan_date, received_by
+        ),
+        len(pages),
+        offsets=(0, -VENDOR_CHALLAN_COPY_OFFSET),
+    )
+    return stamp_copies(VENDOR_CHALLAN_TEMPLATE, overlay_pages, len(pages))
+
+
+def draw_estimate_overlay(
+    can, table_rows, code, name, address, today_date, grand_total
+):
+    # Header
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(150, 688, code)
+    can.drawString(220, 668, name)
+    can.drawString(220, 645, address)
+    can.drawString(460, 688, today_date)
+
+    # Grand total
+    column_width = 50
+    x_start = 460
+    line_width = text_width(grand_total, "Helvetica-Bold", 10)
+    x_position = x_start + (column_width - line_width) / 2
+    can.drawString(x_position, 425, grand_total)
+
+    # Table layout
+    y = 567
+    line_spacing = 8
+    min_row_height = 17
+    row_padding = 0.2
+
+    columns = [
+        {"x": 50, "width": 90},  # SRF No
+        {"x": 145, "width": 65},  # Service Charge
+        {"x": 220, "width": 40},  # Rewinding Cost
+        {"x": 265, "width": 40},  # Spare Cost
+        {"x": 310, "width": 40},  # Other Cost
+        {"x": 355, "width": 40},  # Godown Cost
+        {"x": 400, "width": 50},  # Discount
+        {"x": 460, "width": 50},  # Total Amount
+    ]
+
+    can.setFont("Helvetica", 8)
+
+    for row in table_rows:
+        row_lines = [
+            wrap_text(str(text), "Helvetica", 9, col["width"])
+            for col, text in zip(columns, row)
+        ]
+
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max(max_lines * line_spacing, min_row_height)
+
+        for col, lines in zip(columns, row_lines):
+            total_height = len(lines) * line_spacing
+            vertical_offset = (row_height - total_height) / 2
+
+            for i, ln in enumerate(lines):
+                line_width = text_width(ln, "Helvetica", 9)
+                center_x = col["x"] + col["width"] / 2 - line_width / 2
+                y_position = y - vertical_offset - (i * line_spacing)
+                can.drawString(center_x, y_position, ln)
+
+        y -= row_height + row_padding
+
+
+def render_estimate(table_rows, code, name, address, today_date, grand_total) -> bytes:
+    """
+    Renders an estimate and returns the PDF.
+    """
+    overlay_pages = render_copies(
+        lambda can: draw_estimate_overlay(
+            can, table_rows, code, name, address, today_date, grand_total
+        )
+    )
+    return stamp_copies(ESTIMATE_TEMPLATE, overlay_pages)
@@ -2,12 +2,56 @@ from datetime import date
 from email.policy import default
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlmodel import Column, Field, SQLModel
 
 
 class OutOfWarranty(SQLModel, table=True):
     __tablename__ = "out_of_warranty"
+    __table_args__ = (
+        # Partial indexes behind the pending and settlement lists
+        Index(
+            "ix_out_of_warranty_pending",
+            "srf_number",
+            postgresql_where=text("final_status = 'N'"),
+        ),
+        Index(
+            "ix_out_of_warranty_vendor_challan_pending",
+            "srf_number",
+            postgresql_where=text("repair_date IS NULL AND vendor_date1 IS NULL"),
+        ),
+        Index(
+            "ix_out_of_warranty_vendor_not_settled",
+            "srf_number",
+            postgresql_where=text(
+                "vendor_date2 IS NOT NULL AND vendor_settlement_date IS NULL"
+            ),
+        ),
+        Index(
+            "ix_out_of_warranty_vendor_final_settlement",
+            "srf_number",
+            postgresql_where=text(
+                "vendor_settlement_date IS NOT NULL AND vendor_settled = 'N'"
+            ),
+        ),
+        Index(
+            "ix_out_of_warranty_srf_not_settled",
+            "srf_number",
+            postgresql_where=text("settlement_date IS NULL AND final_status = 'Y'"),
+        ),
+        Index(
+            "ix_out_of_warranty_final_srf_settlement",
+            "srf_number",
+            postgresql_where=text(
+                "settlement_date IS NOT NULL AND final_settled = 'N'"
+            ),
+        ),
+        Index(
+            "ix_out_of_warranty_challan_number",
+            "challan_number",
+            postgresql_where=text("challan_number IS NOT NULL"),
+        ),
+    )
 
     srf_number: str = Field(primary_key=True, index=True)
     srf_date: date = Field(sa_column=Column(pg.DATE, nullable=False))
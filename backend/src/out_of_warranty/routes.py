@@ -1,7 +1,7 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -29,6 +29,8 @@ from out_of_warranty.schemas import (
     UpdateVendorUnsettled,
 )
 from out_of_warranty.service import OutOfWarrantyService
+from pdf.response import pdf_response
+from utils.pagination import MAX_ENQUIRY_PAGE_SIZE, NEXT_CURSOR_HEADER
 
 out_of_warranty_router = APIRouter()
 out_of_warranty_service = OutOfWarrantyService()
@@ -161,17 +163,14 @@ Print srf by srf number.
 @out_of_warranty_router.post("/srf_print", status_code=status.HTTP_200_OK)
 async def print_srf(
     data: OutOfWarrantySRFNumber,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
-    srf_pdf = await out_of_warranty_service.print_srf(data.srf_number, token, session)
-    return StreamingResponse(
-        srf_pdf,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{data.srf_number}.pdf"'
-        },
+    srf_pdf = await out_of_warranty_service.print_srf(
+        data.srf_number, token, session, if_none_match
     )
+    return pdf_response(srf_pdf, f"{data.srf_number}.pdf")
 
 
 """
@@ -233,8 +232,12 @@ async def create_vendor_challan(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await out_of_warranty_service.create_vendor_challan(list_vendor, session)
-    return JSONResponse(content={"message": f"Vendor Challan Records Updated"})
+    not_found = await out_of_warranty_service.create_vendor_challan(
+        list_vendor, session
+    )
+    return JSONResponse(
+        content={"message": f"Vendor Challan Records Updated", "not_found": not_found}
+    )
 
 
 """
@@ -245,19 +248,14 @@ Print vendor challan by challan number.
 @out_of_warranty_router.post("/vendor_challan_print", status_code=status.HTTP_200_OK)
 async def print_vendor_challan(
     data: OutOfWarrantyVendorChallanCode,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
     vendor_pdf = await out_of_warranty_service.print_vendor_challan(
-        data.challan_number, token, session
-    )
-    return StreamingResponse(
-        vendor_pdf,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{data.challan_number}.pdf"'
-        },
+        data.challan_number, token, session, if_none_match
     )
+    return pdf_response(vendor_pdf, f"{data.challan_number}.pdf")
 
 
 """
@@ -272,6 +270,7 @@ OutOfWarranty enquiry using query parameters.
     status_code=status.HTTP_200_OK,
 )
 async def enquiry_out_of_warranty(
+    response: Response,
     final_status: Optional[str] = None,
     final_settled: Optional[str] = None,
     vendor_settled: Optional[str] = None,
@@ -283,11 +282,32 @@ async def enquiry_out_of_warranty(
     repaired: Optional[str] = None,
     challaned: Optional[str] = None,
     delivered: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ENQUIRY_PAGE_SIZE),
+    stream: bool = False,
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
+    if stream:
+        # NDJSON, read through a server side cursor
+        return StreamingResponse(
+            out_of_warranty_service.stream_enquiry_out_of_warranty(
+                final_status,
+                name,
+                division,
+                from_srf_date,
+                to_srf_date,
+                estimated,
+                final_settled,
+                vendor_settled,
+                challaned,
+                delivered,
+                repaired,
+            ),
+            media_type="application/x-ndjson",
+        )
     try:
-        result = await out_of_warranty_service.enquiry_out_of_warranty(
+        result, next_cursor = await out_of_warranty_service.enquiry_out_of_warranty(
             session,
             final_status,
             name,
@@ -300,7 +320,11 @@ async def enquiry_out_of_warranty(
             challaned,
             delivered,
             repaired,
+            after=after,
+            limit=limit,
         )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return result
     except:
         return []
@@ -351,8 +375,15 @@ async def update_vendor_unsettled(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await out_of_warranty_service.update_vendor_unsettled(list_vendor, session)
-    return JSONResponse(content={"message": f"Vendor Records Proposed for Settlement"})
+    not_found = await out_of_warranty_service.update_vendor_unsettled(
+        list_vendor, session
+    )
+    return JSONResponse(
+        content={
+            "message": f"Vendor Records Proposed for Settlement",
+            "not_found": not_found,
+        }
+    )
 
 
 """
@@ -390,8 +421,12 @@ async def update_final_vendor_settlement(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await out_of_warranty_service.update_final_vendor_settlement(list_vendor, session)
-    return JSONResponse(content={"message": f"Vendor Records Settled"})
+    not_found = await out_of_warranty_service.update_final_vendor_settlement(
+        list_vendor, session
+    )
+    return JSONResponse(
+        content={"message": f"Vendor Records Settled", "not_found": not_found}
+    )
 
 
 """
@@ -424,8 +459,13 @@ async def update_srf_unsettled(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await out_of_warranty_service.update_srf_unsettled(list_srf, session)
-    return JSONResponse(content={"message": f"SRF Records Proposed for Settlement"})
+    not_found = await out_of_warranty_service.update_srf_unsettled(list_srf, session)
+    return JSONResponse(
+        content={
+            "message": f"SRF Records Proposed for Settlement",
+            "not_found": not_found,
+        }
+    )
 
 
 """
@@ -461,8 +501,12 @@ async def update_final_srf_settlement(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await out_of_warranty_service.update_final_srf_settlement(list_srf, session)
-    return JSONResponse(content={"message": f"Vendor Records Settled"})
+    not_found = await out_of_warranty_service.update_final_srf_settlement(
+        list_srf, session
+    )
+    return JSONResponse(
+        content={"message": f"Vendor Records Settled", "not_found": not_found}
+    )
 
 
 """
@@ -495,12 +539,11 @@ Print estimate receipt by srf number.
 @out_of_warranty_router.post("/estimate_print", status_code=status.HTTP_200_OK)
 async def print_estimate(
     data: OutOfWarrantySRFNumberList,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    estimate_pdf = await out_of_warranty_service.print_estimate(data, session)
-    return StreamingResponse(
-        estimate_pdf,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="estimate.pdf"'},
+    estimate_pdf = await out_of_warranty_service.print_estimate(
+        data, session, if_none_match
     )
+    return pdf_response(estimate_pdf, "estimate.pdf")
@@ -1,19 +1,15 @@
-import io
-import os
 from datetime import date, datetime, timedelta
-from typing import List, Optional
-
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from reportlab.pdfgen import canvas
-from sqlalchemy import case, func, select
-from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, case, func, or_, select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from counter.service import OUT_OF_WARRANTY_SRF, VENDOR_CHALLAN, CounterService
 from exceptions import IncorrectCodeFormat, MasterNotFound, OutOfWarrantyNotFound
 from master.models import Master
 from master.service import MasterService
+from menu.cache import OUT_OF_WARRANTY_GROUP, dashboard_cache
+from out_of_warranty.documents import render_estimate, render_srf, render_vendor_challan
 from out_of_warranty.models import OutOfWarranty
 from out_of_warranty.schemas import (
     OutOfWarrantyCreate,
@@ -34,34 +30,37 @@ from out_of_warranty.schemas import (
     UpdateVendorFinalSettlement,
     UpdateVendorUnsettled,
 )
-from utils.date_utils import format_date_ddmmyyyy, parse_date
-from utils.file_utils import safe_join, split_text_to_lines
-
+from pdf.renderer import RenderedPdf, pdf_renderer
+from utils.bulk import bulk_update
+from utils.date_utils import format_date_ddmmyyyy, format_date_or_blank, parse_date
+from utils.pagination import keyset_page, stream_ndjson
+from utils.projection import Projection
+from utils.search import contains
+
+counter_service = CounterService()
 master_service = MasterService()
 
+# Columns behind each enquiry row
+OUT_OF_WARRANTY_ENQUIRY = Projection(
+    OutOfWarrantyEnquiry,
+    srf_number=OutOfWarranty.srf_number,
+    srf_date=(OutOfWarranty.srf_date, format_date_ddmmyyyy),
+    name=Master.name,
+    model=OutOfWarranty.model,
+    estimate_date=(OutOfWarranty.estimate_date, format_date_or_blank),
+    repair_date=(OutOfWarranty.repair_date, format_date_or_blank),
+    vendor_date1=(OutOfWarranty.vendor_date1, format_date_or_blank),
+    delivery_date=(OutOfWarranty.delivery_date, format_date_or_blank),
+    final_amount=(OutOfWarranty.final_amount, lambda amount: amount or 0),
+    contact1=Master.contact1,
+    contact2=Master.contact2,
+)
+
 
 class OutOfWarrantyService:
 
     async def get_next_base_number(self, session: AsyncSession) -> int:
-        statement = select(OutOfWarranty.srf_number)
-        result = await session.execute(statement)
-        srf_numbers = [
-            row[0]
-            for row in result.fetchall()
-            if row[0] and row[0].startswith("S") and "/" in row[0]
-        ]
-        base_numbers = []
-        for srf in srf_numbers:
-            base, _ = srf.split("/")
-            try:
-                base_num = int(base[1:])
-                base_numbers.append(base_num)
-            except ValueError:
-                continue
-        if base_numbers:
-            return max(base_numbers) + 1
-        else:
-            return 1
+        return await counter_service.peek(OUT_OF_WARRANTY_SRF, session)
 
     async def create_out_of_warranty(
         self, session: AsyncSession, out_of_warranty: OutOfWarrantyCreate, token: dict
@@ -73,50 +72,30 @@ class OutOfWarrantyService:
         if sub_number < 1 or sub_number > 8:
             raise IncorrectCodeFormat()
 
-        # If frontend requests a new base, generate next base number
+        out_of_warranty_dict = out_of_warranty.model_dump()
+        master = await master_service.get_master_by_name(out_of_warranty.name, session)
+        out_of_warranty_dict["created_by"] = token["user"]["username"]
+        out_of_warranty_dict["code"] = master.code
+        for date_field in ["srf_date", "collection_date"]:
+            if date_field in out_of_warranty_dict:
+                out_of_warranty_dict[date_field] = parse_date(
+                    out_of_warranty_dict[date_field]
+                )
+        out_of_warranty_dict.pop("name", None)
+
         base_part = parts[0]
         if base_part == "NEW":
-            for _ in range(3):  # Retry up to 3 times
-                next_base = await self.get_next_base_number(session)
-                srf_number = f"S{str(next_base).zfill(5)}/1"
-                out_of_warranty_dict = out_of_warranty.model_dump()
-                out_of_warranty_dict["srf_number"] = srf_number
-                master = await master_service.get_master_by_name(
-                    out_of_warranty.name, session
-                )
-                out_of_warranty_dict["created_by"] = token["user"]["username"]
-                out_of_warranty_dict["code"] = master.code
-                for date_field in ["srf_date", "collection_date"]:
-                    if date_field in out_of_warranty_dict:
-                        out_of_warranty_dict[date_field] = parse_date(
-                            out_of_warranty_dict[date_field]
-                        )
-                out_of_warranty_dict.pop("name", None)
-                new_out_of_warranty = OutOfWarranty(**out_of_warranty_dict)
-                session.add(new_out_of_warranty)
-                try:
-                    await session.commit()
-                    return new_out_of_warranty
-                except IntegrityError:
-                    await session.rollback()
-        else:
-            # Use the base provided by frontend, just validate sub-number
-            out_of_warranty_dict = out_of_warranty.model_dump()
-            master = await master_service.get_master_by_name(
-                out_of_warranty.name, session
-            )
-            out_of_warranty_dict["created_by"] = token["user"]["username"]
-            out_of_warranty_dict["code"] = master.code
-            for date_field in ["srf_date", "collection_date"]:
-                if date_field in out_of_warranty_dict:
-                    out_of_warranty_dict[date_field] = parse_date(
-                        out_of_warranty_dict[date_field]
-                    )
-            out_of_warranty_dict.pop("name", None)
-            new_out_of_warranty = OutOfWarranty(**out_of_warranty_dict)
-            session.add(new_out_of_warranty)
-            await session.commit()
-            return new_out_of_warranty
+            # If frontend requests a new base, allocate the next base number
+            next_base = await counter_service.allocate(OUT_OF_WARRANTY_SRF, session)
+            out_of_warranty_dict["srf_number"] = f"S{str(next_base).zfill(5)}/1"
+        elif base_part[1:].isdigit():
+            # Use the base provided by frontend, keep the counter ahead of it
+            await counter_service.bump(OUT_OF_WARRANTY_SRF, int(base_part[1:]), session)
+        new_out_of_warranty = OutOfWarranty(**out_of_warranty_dict)
+        session.add(new_out_of_warranty)
+        await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return new_out_of_warranty
 
     async def warranty_next_code(self, session: AsyncSession):
         next_base_number = await self.get_next_base_number(session)
@@ -223,6 +202,7 @@ class OutOfWarrantyService:
         existing_out_of_warranty.updated_by = token["user"]["username"]
         session.add(existing_out_of_warranty)
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
         await session.refresh(existing_out_of_warranty)
         return existing_out_of_warranty
 
@@ -238,11 +218,36 @@ class OutOfWarrantyService:
         return last_srf_number
 
     async def print_srf(
-        self, srf_number: OutOfWarrantySRFNumber, token: dict, session: AsyncSession
-    ) -> io.BytesIO:
-        # Query out_of_warranty and master data for SRF
+        self,
+        srf_number: OutOfWarrantySRFNumber,
+        token: dict,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
         if len(srf_number) != 6:
             srf_number = "S" + srf_number.zfill(5)
+        jobs = await self.srf_print_jobs(
+            [srf_number], token["user"]["username"], session
+        )
+        if srf_number[:6] not in jobs:
+            raise OutOfWarrantyNotFound()
+
+        return await pdf_renderer.render_document(
+            "srf", render_srf, *jobs[srf_number[:6]], if_none_match=if_none_match
+        )
+
+    async def srf_print_jobs(
+        self, srf_numbers: List[str], received_by: str, session: AsyncSession
+    ) -> Dict[str, tuple]:
+        """
+        Reads the rows of all the given SRFs with one query and returns the
+        arguments of render_srf for each SRF found, by SRF number.
+        """
+        srf_numbers = [
+            number if len(number) == 6 else "S" + number.zfill(5)
+            for number in srf_numbers
+        ]
+        # Query out_of_warranty and master data for SRF
         statement = (
             select(
                 OutOfWarranty.srf_number,
@@ -262,179 +267,50 @@ class OutOfWarrantyService:
                 OutOfWarranty.problem,
             )
             .join(Master, OutOfWarranty.code == Master.code)
-            .where(OutOfWarranty.srf_number.like(f"{srf_number}%"))
+            .where(
+                or_(
+                    *[
+                        OutOfWarranty.srf_number.like(f"{number}%")
+                        for number in srf_numbers
+                    ]
+                )
+            )
         )
         result = await session.execute(statement)
-        rows = result.fetchall()
-
-        if not rows:
-            raise OutOfWarrantyNotFound()
-
-        srf_no = srf_number[:6]
-        srf_date = rows[0][1].strftime("%d-%m-%Y") if rows[0][1] else ""
-        code = rows[0][7]
-        name = rows[0][8]
-        pin = ", " + rows[0][13] if rows[0][13] else ""
-        address = rows[0][9] + ", " + rows[0][12] + pin
-        contact1 = rows[0][10]
-        gst = rows[0][11] if rows[0][11] else ""
-        received_by = token["user"]["username"]
-
-        def generate_overlay(
-            rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
-        ):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-
-            can.setFont("Helvetica-Bold", 10)
-            can.drawString(110, 736, srf_no)
-            can.drawString(480, 736, srf_date)
-            can.drawString(300, 736, code)
-            can.drawString(190, 680, name)
-            can.drawString(190, 655, address)
-            can.drawString(190, 630, contact1)
-            can.drawString(475, 630, gst)
-            can.drawString(410, 140, received_by)
-
-            start_y = 556
-            y = start_y
-            line_spacing = 8
-            min_row_height = 16
-            row_padding = 7
-            columns = [
-                {"x": 10, "width": 20},
-                {"x": 40, "width": 50},
-                {"x": 105, "width": 95},
-                {"x": 210, "width": 75},
-                {"x": 290, "width": 110},
-                {"x": 405, "width": 110},
-                {"x": 520, "width": 60},
-            ]
-
-            can.setFont("Helvetica", 9)
-
-            for idx, row in enumerate(rows, 1):
-                division = row[2] or ""
-                model = row[3] or ""
-                slno = row[4] or ""
-                remark = row[5] or ""
-                service_charge_raw = row[6]
-                service_charge = f"{service_charge_raw:.2f}"
-                problem = row[14] or ""
-
-                row_data = [
-                    str(idx),
-                    division,
-                    model,
-                    str(slno),
-                    problem,
-                    remark,
-                    str(service_charge),
-                ]
-
-                row_lines = []
-                for col, text in zip(columns, row_data):
-                    words = text.split()
-                    lines = []
-                    line = ""
-                    for word in words:
-                        test_line = line + (" " if line else "") + word
-                        if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                            line = test_line
-                        else:
-                            lines.append(line)
-                            line = word
-                    if line:
-                        lines.append(line)
-                    row_lines.append(lines)
-
-                max_lines = max(len(lines) for lines in row_lines)
-                row_height = max(max_lines * line_spacing, min_row_height)
-
-                if y - row_height < 100:
-                    can.showPage()
-                    can.setFont("Helvetica", 9)
-                    y = height - 50
-
-                for col, lines in zip(columns, row_lines):
-                    total_text_height = len(lines) * line_spacing
-                    vertical_offset = (row_height - total_text_height) / 2
-
-                    for i, ln in enumerate(lines):
-                        text_width = stringWidth(ln, "Helvetica", 9)
-                        center_x = col["x"] + col["width"] / 2 - text_width / 2
-                        y_position = y - vertical_offset - (i * line_spacing)
-                        can.drawString(center_x, y_position, ln)
-
-                y -= row_height + row_padding
-
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        # Create overlays
-        overlay_customer = generate_overlay(
-            rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
-        )
-        overlay_asc = generate_overlay(
-            rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
-        )
-
-        # Path to the static PDF template (use absolute path for portability, with path injection protection)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "out_of_warranty_receipt.pdf")
-
-        # Read the template PDF
-        try:
-            with open(template_path, "rb") as f:
-                template_bytes = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Template PDF not found at {template_path}")
-        template_buffer = io.BytesIO(template_bytes)
-        template_pdf = PdfReader(template_buffer)
-
-        # Merge overlays
-        writer = PdfWriter()
-        page1 = template_pdf.pages[0]
-        page1.merge_page(overlay_customer.pages[0])
-        writer.add_page(page1)
-
-        if len(template_pdf.pages) > 1:
-            page2 = template_pdf.pages[1]
-            page2.merge_page(overlay_asc.pages[0])
-            writer.add_page(page2)
-
-        output_stream = io.BytesIO()
-        writer.write(output_stream)
-        output_stream.seek(0)
-        return output_stream
+        documents: Dict[str, list] = {}
+        for row in result.fetchall():
+            documents.setdefault(row[0][:6], []).append(tuple(row))
+
+        jobs = {}
+        for srf_no, rows in documents.items():
+            srf_date = rows[0][1].strftime("%d-%m-%Y") if rows[0][1] else ""
+            code = rows[0][7]
+            name = rows[0][8]
+            pin = ", " + rows[0][13] if rows[0][13] else ""
+            address = rows[0][9] + ", " + rows[0][12] + pin
+            contact1 = rows[0][10]
+            gst = rows[0][11] if rows[0][11] else ""
+            jobs[srf_no] = (
+                rows,
+                srf_no,
+                srf_date,
+                code,
+                name,
+                address,
+                contact1,
+                gst,
+                received_by,
+            )
+        return jobs
 
     async def next_vendor_challan_code(self, session: AsyncSession):
-        statement = (
-            select(OutOfWarranty.challan_number)
-            .where(OutOfWarranty.challan_number.isnot(None))
-            .order_by(OutOfWarranty.challan_number.desc())
-            .limit(1)
-        )
-        result = await session.execute(statement)
-        last_challan_number = result.scalar()
-        last_number = last_challan_number[1:] if last_challan_number else "0"
-        next_challan_number = int(last_number) + 1
+        next_challan_number = await counter_service.peek(VENDOR_CHALLAN, session)
         next_challan_number = "V" + str(next_challan_number).zfill(5)
         return next_challan_number
 
     async def last_vendor_challan_code(self, session: AsyncSession):
-        statement = (
-            select(OutOfWarranty.challan_number)
-            .where(OutOfWarranty.challan_number.isnot(None))
-            .order_by(OutOfWarranty.challan_number.desc())
-            .limit(1)
-        )
-        result = await session.execute(statement)
-        last_challan_number = result.scalar()
-        return last_challan_number or None
+        last_number = await counter_service.last(VENDOR_CHALLAN, session)
+        return "V" + str(last_number).zfill(5) if last_number else None
 
     async def list_vendor_challan_details(self, session: AsyncSession):
         statement = (
@@ -463,26 +339,63 @@ class OutOfWarrantyService:
         list_vendor_challan: List[OutOfWarrantyVendorChallanCreate],
         session: AsyncSession,
     ):
-        for record in list_vendor_challan:
-            statement = select(OutOfWarranty).where(
-                OutOfWarranty.srf_number == record.srf_number
-            )
-            result = await session.execute(statement)
-            existing_warranty = result.scalar_one_or_none()
-            if existing_warranty:
-                existing_warranty.challan = record.challan
-                existing_warranty.challan_number = record.challan_number
-                existing_warranty.vendor_date1 = record.vendor_date1
-                existing_warranty.received_by = record.received_by
-                session.add(existing_warranty)
+        for challan_number in {record.challan_number for record in list_vendor_challan}:
+            if challan_number[1:].isdigit():
+                await counter_service.bump(
+                    VENDOR_CHALLAN, int(challan_number[1:]), session
+                )
+        not_found = await bulk_update(
+            session,
+            OutOfWarranty,
+            "srf_number",
+            [
+                {
+                    "srf_number": record.srf_number,
+                    "challan": record.challan,
+                    "challan_number": record.challan_number,
+                    "vendor_date1": record.vendor_date1,
+                    "received_by": record.received_by,
+                }
+                for record in list_vendor_challan
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return not_found
 
     async def print_vendor_challan(
-        self, challan_number: str, token: dict, session: AsyncSession
-    ) -> io.BytesIO:
-        # Query out_of_warranty data for challan_number
+        self,
+        challan_number: str,
+        token: dict,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
         if len(challan_number) != 6:
             challan_number = "V" + challan_number.zfill(5)
+        jobs = await self.vendor_challan_print_jobs([challan_number], session)
+        if not jobs:
+            raise OutOfWarrantyNotFound()
+
+        return await pdf_renderer.render_document(
+            "vendor_challan",
+            render_vendor_challan,
+            *jobs[challan_number],
+            if_none_match=if_none_match,
+        )
+
+    async def vendor_challan_print_jobs(
+        self, challan_numbers: List[str], session: AsyncSession
+    ) -> Dict[str, tuple]:
+        """
+        Reads the rows of all the given vendor challans with one query and
+        returns the arguments of render_vendor_challan for each challan found,
+        by challan number.
+        """
+        challan_numbers = [
+            number if len(number) == 6 else "V" + number.zfill(5)
+            for number in challan_numbers
+        ]
+        # Query out_of_warranty data for challan_number
         statement = select(
             OutOfWarranty.challan_number,
             OutOfWarranty.vendor_date1,
@@ -492,124 +405,21 @@ class OutOfWarrantyService:
             OutOfWarranty.model,
             OutOfWarranty.serial_number,
             OutOfWarranty.remark,
-        ).where(OutOfWarranty.challan_number == challan_number)
+        ).where(OutOfWarranty.challan_number.in_(challan_numbers))
         result = await session.execute(statement)
-        rows = result.fetchall()
-
-        if not rows:
-            raise OutOfWarrantyNotFound()
-
-        challan_date = rows[0][1].strftime("%d-%m-%Y") if rows[0][1] else ""
-        received_by = rows[0][2]
-
-        def generate_overlay(rows, challan_no, challan_date, received_by):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-
-            def draw_block(start_y_offset):
-                # Header
-                can.setFont("Helvetica-Bold", 10)
-                can.drawString(140, 735 - start_y_offset, challan_no)
-                can.drawString(490, 735 - start_y_offset, challan_date)
-                can.drawString(220, 700 - start_y_offset, received_by)
-
-                # Table
-                y = 661 - start_y_offset
-                line_spacing = 8
-                min_row_height = 20
-                row_padding = 0.2
-
-                columns = [
-                    {"x": 21, "width": 21},  # Sl No
-                    {"x": 46, "width": 74},  # SRF No
-                    {"x": 125, "width": 85},  # Division
-                    {"x": 220, "width": 100},  # Model
-                    {"x": 330, "width": 100},  # Serial No
-                    {"x": 440, "width": 135},  # Remark
-                ]
-
-                can.setFont("Helvetica", 8)
-
-                for idx, row in enumerate(rows, 1):
-                    srf = row[3] or ""
-                    division = row[4] or ""
-                    model = row[5] or ""
-                    slno = row[6] or ""
-                    remark = row[7] or ""
-
-                    row_data = [str(idx), srf, division, model, str(slno), remark]
-
-                    row_lines = []
-                    for col, text in zip(columns, row_data):
-                        words = str(text).split()
-                        lines = []
-                        line = ""
-                        for word in words:
-                            test_line = line + (" " if line else "") + word
-                            if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                                line = test_line
-                            else:
-                                lines.append(line)
-                                line = word
-                        if line:
-                            lines.append(line)
-                        row_lines.append(lines)
-
-                    max_lines = max(len(lines) for lines in row_lines)
-                    row_height = max(max_lines * line_spacing, min_row_height)
-
-                    for col, lines in zip(columns, row_lines):
-                        total_text_height = len(lines) * line_spacing
-                        vertical_offset = (row_height - total_text_height) / 2
-                        for i, ln in enumerate(lines):
-                            text_width = stringWidth(ln, "Helvetica", 9)
-                            center_x = col["x"] + col["width"] / 2 - text_width / 2
-                            y_position = y - vertical_offset - (i * line_spacing)
-                            can.drawString(center_x, y_position, ln)
-
-                    y -= row_height + row_padding
-
-            # Draw both blocks
-            draw_block(start_y_offset=0)  # First copy
-            draw_block(start_y_offset=393)  # Second copy lower
-
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        overlay = generate_overlay(rows, challan_number, challan_date, received_by)
-
-        # Path to the static PDF template (use absolute path for portability, with path injection protection)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "vendor_challan.pdf")
-
-        # Read the template PDF
-        try:
-            with open(template_path, "rb") as f:
-                template_bytes = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Template PDF not found at {template_path}")
-        template_buffer = io.BytesIO(template_bytes)
-        template_pdf = PdfReader(template_buffer)
-
-        # Merge overlays
-        writer = PdfWriter()
-        for i in range(len(template_pdf.pages)):
-            page = template_pdf.pages[i]
-            overlay_page = overlay.pages[min(i, len(overlay.pages) - 1)]
-            page.merge_page(overlay_page)
-            writer.add_page(page)
-
-        output_stream = io.BytesIO()
-        writer.write(output_stream)
-        output_stream.seek(0)
-        return output_stream
-
-    async def enquiry_out_of_warranty(
+        documents: Dict[str, list] = {}
+        for row in result.fetchall():
+            documents.setdefault(row[0], []).append(tuple(row))
+
+        jobs = {}
+        for challan_number, rows in documents.items():
+            challan_date = rows[0][1].strftime("%d-%m-%Y") if rows[0][1] else ""
+            received_by = rows[0][2]
+            jobs[challan_number] = (rows, challan_number, challan_date, received_by)
+        return jobs
+
+    def _enquiry_statement(
         self,
-        session: AsyncSession,
         final_status: Optional[str] = None,
         name: Optional[str] = None,
         division: Optional[str] = None,
@@ -621,17 +431,18 @@ class OutOfWarrantyService:
         vendor_settled: Optional[str] = None,
         delivered: Optional[str] = None,
         repaired: Optional[str] = None,
-    ):
-
-        statement = select(OutOfWarranty, Master).join(
-            Master, OutOfWarranty.code == Master.code
+    ) -> Select:
+        statement = (
+            OUT_OF_WARRANTY_ENQUIRY.select()
+            .select_from(OutOfWarranty)
+            .join(Master, OutOfWarranty.code == Master.code)
         )
 
         if final_status:
             statement = statement.where(OutOfWarranty.final_status == final_status)
 
         if name:
-            statement = statement.where(Master.name.ilike(f"%{name}%"))
+            statement = statement.where(contains(Master.name, name))
 
         if division:
             statement = statement.where(OutOfWarranty.division == division)
@@ -673,48 +484,77 @@ class OutOfWarrantyService:
                 statement = statement.where(OutOfWarranty.vendor_date1.isnot(None))
             else:
                 statement = statement.where(OutOfWarranty.vendor_date1.is_(None))
+        return statement
 
-        statement = statement.order_by(OutOfWarranty.srf_number)
-
-        result = await session.execute(statement)
-        rows = result.all()
+    async def enquiry_out_of_warranty(
+        self,
+        session: AsyncSession,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_srf_date: Optional[date] = None,
+        to_srf_date: Optional[date] = None,
+        estimated: Optional[str] = None,
+        final_settled: Optional[str] = None,
+        challaned: Optional[str] = None,
+        vendor_settled: Optional[str] = None,
+        delivered: Optional[str] = None,
+        repaired: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[OutOfWarrantyEnquiry], Optional[str]]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_srf_date,
+            to_srf_date,
+            estimated,
+            final_settled,
+            challaned,
+            vendor_settled,
+            delivered,
+            repaired,
+        )
+        return await keyset_page(
+            session,
+            statement,
+            OutOfWarranty.srf_number,
+            OUT_OF_WARRANTY_ENQUIRY.build,
+            after,
+            limit,
+        )
 
-        return [
-            OutOfWarrantyEnquiry(
-                srf_number=row.OutOfWarranty.srf_number,
-                srf_date=format_date_ddmmyyyy(row.OutOfWarranty.srf_date),
-                name=row.Master.name,
-                model=row.OutOfWarranty.model,
-                estimate_date=(
-                    format_date_ddmmyyyy(row.OutOfWarranty.estimate_date)
-                    if row.OutOfWarranty.estimate_date
-                    else ""
-                ),
-                repair_date=(
-                    format_date_ddmmyyyy(row.OutOfWarranty.repair_date)
-                    if row.OutOfWarranty.repair_date
-                    else ""
-                ),
-                vendor_date1=(
-                    format_date_ddmmyyyy(row.OutOfWarranty.vendor_date1)
-                    if row.OutOfWarranty.vendor_date1
-                    else ""
-                ),
-                delivery_date=(
-                    format_date_ddmmyyyy(row.OutOfWarranty.delivery_date)
-                    if row.OutOfWarranty.delivery_date
-                    else ""
-                ),
-                final_amount=(
-                    row.OutOfWarranty.final_amount
-                    if row.OutOfWarranty.final_amount
-                    else 0
-                ),
-                contact1=row.Master.contact1,
-                contact2=row.Master.contact2,
-            )
-            for row in rows
-        ]
+    def stream_enquiry_out_of_warranty(
+        self,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_srf_date: Optional[date] = None,
+        to_srf_date: Optional[date] = None,
+        estimated: Optional[str] = None,
+        final_settled: Optional[str] = None,
+        challaned: Optional[str] = None,
+        vendor_settled: Optional[str] = None,
+        delivered: Optional[str] = None,
+        repaired: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_srf_date,
+            to_srf_date,
+            estimated,
+            final_settled,
+            challaned,
+            vendor_settled,
+            delivered,
+            repaired,
+        )
+        return stream_ndjson(
+            statement, OutOfWarranty.srf_number, OUT_OF_WARRANTY_ENQUIRY.build
+        )
 
     async def list_received_by(self, session: AsyncSession):
         statement = (
@@ -754,16 +594,22 @@ class OutOfWarrantyService:
     async def update_vendor_unsettled(
         self, list_vendor: List[UpdateVendorUnsettled], session: AsyncSession
     ):
-        for vendor in list_vendor:
-            statement = select(OutOfWarranty).where(
-                OutOfWarranty.srf_number == vendor.srf_number
-            )
-            result = await session.execute(statement)
-            existing_vendor = result.scalar_one_or_none()
-            if existing_vendor:
-                existing_vendor.vendor_settlement_date = vendor.vendor_settlement_date
-                existing_vendor.vendor_bill_number = vendor.vendor_bill_number
+        not_found = await bulk_update(
+            session,
+            OutOfWarranty,
+            "srf_number",
+            [
+                {
+                    "srf_number": vendor.srf_number,
+                    "vendor_settlement_date": vendor.vendor_settlement_date,
+                    "vendor_bill_number": vendor.vendor_bill_number,
+                }
+                for vendor in list_vendor
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return not_found
 
     async def list_final_vendor_settlement(self, session: AsyncSession):
         statement = (
@@ -795,17 +641,23 @@ class OutOfWarrantyService:
     async def update_final_vendor_settlement(
         self, list_vendor: List[UpdateVendorFinalSettlement], session: AsyncSession
     ):
-        for vendor in list_vendor:
-            statement = select(OutOfWarranty).where(
-                OutOfWarranty.srf_number == vendor.srf_number
-            )
-            result = await session.execute(statement)
-            existing_vendor = result.scalar_one_or_none()
-            if existing_vendor:
-                existing_vendor.vendor_cost1 = vendor.vendor_cost1
-                existing_vendor.vendor_cost2 = vendor.vendor_cost2
-                existing_vendor.vendor_settled = vendor.vendor_settled
+        not_found = await bulk_update(
+            session,
+            OutOfWarranty,
+            "srf_number",
+            [
+                {
+                    "srf_number": vendor.srf_number,
+                    "vendor_cost1": vendor.vendor_cost1,
+                    "vendor_cost2": vendor.vendor_cost2,
+                    "vendor_settled": vendor.vendor_settled,
+                }
+                for vendor in list_vendor
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return not_found
 
     async def list_srf_not_settled(self, session: AsyncSession):
         statement = (
@@ -838,15 +690,18 @@ class OutOfWarrantyService:
     async def update_srf_unsettled(
         self, list_srf: List[UpdateSRFUnsettled], session: AsyncSession
     ):
-        for srf in list_srf:
-            statement = select(OutOfWarranty).where(
-                OutOfWarranty.srf_number == srf.srf_number
-            )
-            result = await session.execute(statement)
-            existing_srf = result.scalar_one_or_none()
-            if existing_srf:
-                existing_srf.settlement_date = srf.settlement_date
+        not_found = await bulk_update(
+            session,
+            OutOfWarranty,
+            "srf_number",
+            [
+                {"srf_number": srf.srf_number, "settlement_date": srf.settlement_date}
+                for srf in list_srf
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return not_found
 
     async def list_final_srf_settlement(self, session: AsyncSession):
         statement = (
@@ -879,15 +734,18 @@ class OutOfWarrantyService:
     async def update_final_srf_settlement(
         self, list_srf: List[UpdateSRFFinalSettlement], session: AsyncSession
     ):
-        for srf in list_srf:
-            statement = select(OutOfWarranty).where(
-                OutOfWarranty.srf_number == srf.srf_number
-            )
-            result = await session.execute(statement)
-            existing_srf = result.scalar_one_or_none()
-            if existing_srf:
-                existing_srf.final_settled = srf.final_settled
+        not_found = await bulk_update(
+            session,
+            OutOfWarranty,
+            "srf_number",
+            [
+                {"srf_number": srf.srf_number, "final_settled": srf.final_settled}
+                for srf in list_srf
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(OUT_OF_WARRANTY_GROUP)
+        return not_found
 
     async def get_out_of_warranty_estimate_print_details(
         self,
@@ -917,8 +775,11 @@ class OutOfWarrantyService:
         ]
 
     async def print_estimate(
-        self, codes: OutOfWarrantySRFNumberList, session: AsyncSession
-    ) -> io.BytesIO:
+        self,
+        codes: OutOfWarrantySRFNumberList,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
 
         # Query out_of_warranty + master
         statement = (
@@ -975,114 +836,14 @@ class OutOfWarrantyService:
 
         grand_total_str = f"{grand_total:.2f}"
 
-        def generate_overlay(table_rows, code, name, address, today_date, grand_total):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-
-            # Header
-            can.setFont("Helvetica-Bold", 10)
-            can.drawString(150, 688, code)
-            can.drawString(220, 668, name)
-            can.drawString(220, 645, address)
-            can.drawString(460, 688, today_date)
-
-            # Grand total
-            column_width = 50
-            x_start = 460
-            text_width = stringWidth(grand_total, "Helvetica-Bold", 10)
-            x_position = x_start + (column_width - text_width) / 2
-            can.drawString(x_position, 425, grand_total)
-
-            # Table layout
-            y = 567
-            line_spacing = 8
-            min_row_height = 17
-            row_padding = 0.2
-
-            columns = [
-                {"x": 50, "width": 90},  # SRF No
-                {"x": 145, "width": 65},  # Service Charge
-                {"x": 220, "width": 40},  # Rewinding Cost
-                {"x": 265, "width": 40},  # Spare Cost
-                {"x": 310, "width": 40},  # Other Cost
-                {"x": 355, "width": 40},  # Godown Cost
-                {"x": 400, "width": 50},  # Discount
-                {"x": 460, "width": 50},  # Total Amount
-            ]
-
-            can.setFont("Helvetica", 8)
-
-            for row in table_rows:
-                row_lines = []
-                for col, text in zip(columns, row):
-                    words = text.split()
-                    lines, line = [], ""
-
-                    for word in words:
-                        test_line = (line + " " + word).strip()
-                        if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                            line = test_line
-                        else:
-                            lines.append(line)
-                            line = word
-
-                    if line:
-                        lines.append(line)
-
-                    row_lines.append(lines)
-
-                max_lines = max(len(lines) for lines in row_lines)
-                row_height = max(max_lines * line_spacing, min_row_height)
-
-                for col, lines in zip(columns, row_lines):
-                    total_height = len(lines) * line_spacing
-                    vertical_offset = (row_height - total_height) / 2
-
-                    for i, ln in enumerate(lines):
-                        text_width = stringWidth(ln, "Helvetica", 9)
-                        center_x = col["x"] + col["width"] / 2 - text_width / 2
-                        y_position = y - vertical_offset - (i * line_spacing)
-                        can.drawString(center_x, y_position, ln)
-
-                y -= row_height + row_padding
-
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        # Build overlay PDF
-        overlay = generate_overlay(
+        return await pdf_renderer.render_document(
+            "estimate",
+            render_estimate,
             table_rows,
             code,
             name,
             address,
             today_date,
             grand_total_str,
+            if_none_match=if_none_match,
         )
-
-        # Load static PDF template (same style as your other code)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "estimate.pdf")
-
-        with open(template_path, "rb") as f:
-            template_buffer = io.BytesIO(f.read())
-
-        base_pdf = PdfReader(template_buffer)
-
-        writer = PdfWriter()
-
-        # Merge overlay onto template pages
-        for i in range(len(base_pdf.pages)):
-            base_page = base_pdf.pages[i]
-            overlay_page = overlay.pages[min(i, len(overlay.pages) - 1)]
-            base_page.merge_page(overlay_page)
-            writer.add_page(base_page)
-
-        # Return PDF buffer
-        output = io.BytesIO()
-        writer.write(output)
-        output.seek(0)
-
-        return output
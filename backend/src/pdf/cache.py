@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from config import Config
+from pdf.templates import DOCUMENT_TEMPLATES, template_registry
+
+# Part of every key. Bump it when an overlay is drawn differently, so that
+# PDFs rendered by the old code are no longer served.
+LAYOUT_VERSION = 2
+
+CACHE_FILE_SUFFIX = ".pdf"
+
+logger = logging.getLogger(__name__)
+
+
+def document_key(kind: str, args: Sequence) -> Optional[str]:
+    """
+    Content address of a print document: a hash of its kind, the version of
+    its template and the repr of the values it is rendered from. Any change
+    to a row gives another key, so nothing is ever invalidated. None for
+    kinds that are not cached.
+    """
+    template = DOCUMENT_TEMPLATES.get(kind)
+    if template is None:
+        return None
+    digest = hashlib.sha256()
+    for part in (
+        kind,
+        str(LAYOUT_VERSION),
+        template_registry.version(template),
+        repr(tuple(args)),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PdfCache:
+    """
+    Rendered print documents on local disk, one file per key, evicted least
+    recently used first once the files add up to more than max_bytes.
+
+    The index of sizes in use order is rebuilt from the files' mtimes on
+    start, and a hit touches its file, so the order survives a restart.
+    Every worker process keeps its own index of the shared directory: a file
+    another worker evicted is a miss. A cache that cannot be read or written
+    is a miss as well, it never fails a print.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def _load(self) -> None:
+        entries = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.is_file() and entry.name.endswith(CACHE_FILE_SUFFIX):
+                        stat = entry.stat()
+                        key = entry.name[: -len(CACHE_FILE_SUFFIX)]
+                        entries.append((stat.st_mtime_ns, key, stat.st_size))
+        except OSError:
+            logger.exception("PDF cache disabled, cannot use %s", self.directory)
+            self.enabled = False
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached PDF, or None. Blocking, call it off the event loop."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._sizes:
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._sizes.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        """Stores a rendered PDF. Blocking, call it off the event loop."""
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+        if not self.enabled:
+            return
+        path = self._path(key)
+        # Written aside and renamed, so a reader never sees half a file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(temp_path, path)
+        except OSError:
+            logger.warning("Could not write %s to the PDF cache", key, exc_info=True)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._total += len(pdf_bytes) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(pdf_bytes)
+            self._evict()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "size": len(self._sizes),
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+        }
+
+
+pdf_cache = PdfCache(Config.PDF_CACHE_DIR, Config.PDF_CACHE_MAX_BYTES)
@@ -0,0 +1,96 @@
+import io
+from typing import Callable, List, Optional, Sequence
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2._page import PageObject
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf.templates import template_registry
+
+# Name of the form XObject holding the part every copy shares
+SHARED_FORM = "shared"
+
+Draw = Callable[[canvas.Canvas], None]
+# Draws one page of a document, given the page number
+DrawPage = Callable[[canvas.Canvas, int], None]
+
+
+def render_copies(
+    draw: Draw,
+    deltas: Sequence[Optional[Draw]] = (None,),
+    offsets: Sequence[float] = (0,),
+) -> List[PageObject]:
+    """
+    Draws the part of a document every copy shares once, as a form XObject,
+    and returns one overlay page per delta: the form, placed at each of the
+    vertical offsets (copies printed on the same sheet), with the delta
+    drawn on top.
+
+    A delta is what differs between copies (the customer and ASC columns of
+    a CNF challan, a copy label), drawn on the page itself. None adds
+    nothing. The form is written to the PDF once, however many times it is
+    placed, and merging a page that only places it is cheap.
+    """
+    return render_pages(
+        lambda can, page: draw(can),
+        1,
+        [delta and (lambda can, page, delta=delta: delta(can)) for delta in deltas],
+        offsets,
+    )
+
+
+def render_pages(
+    draw: DrawPage,
+    page_count: int,
+    deltas: Sequence[Optional[DrawPage]] = (None,),
+    offsets: Sequence[float] = (0,),
+) -> List[PageObject]:
+    """
+    render_copies for a document of page_count pages: draw and the deltas
+    are given the page number. Each page is its own form. The overlay
+    pages come copy by copy, all the pages of the first copy first.
+    """
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=A4)
+    for page in range(page_count):
+        can.beginForm(f"{SHARED_FORM}{page}")
+        draw(can, page)
+        can.endForm()
+    for delta in deltas:
+        for page in range(page_count):
+            for offset in offsets:
+                can.saveState()
+                can.translate(0, offset)
+                can.doForm(f"{SHARED_FORM}{page}")
+                can.restoreState()
+            if delta is not None:
+                delta(can, page)
+            can.showPage()
+    can.save()
+    packet.seek(0)
+    return list(PdfReader(packet).pages)
+
+
+def stamp_copies(
+    template_name: str, overlay_pages: Sequence[PageObject], page_count: int = 1
+) -> bytes:
+    """
+    Merges the overlay pages of each copy onto a template page, one sheet
+    per page of the document, and returns the PDF. Template page i is copy
+    i, and a copy without overlay pages of its own gets the last copy's.
+    """
+    copies = len(overlay_pages) // page_count
+    # A fresh set of template pages for every page of the document
+    sheets = [template_registry.pages(template_name) for _ in range(page_count)]
+    writer = PdfWriter()
+    for copy in range(len(sheets[0])):
+        first = min(copy, copies - 1) * page_count
+        for page in range(page_count):
+            sheet = sheets[page][copy]
+            sheet.merge_page(overlay_pages[first + page])
+            writer.add_page(sheet)
+
+    output_stream = io.BytesIO()
+    writer.write(output_stream)
+    return output_stream.getvalue()
@@ -0,0 +1,78 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Wrapped cells kept by wrap_text. Divisions, models and remarks recur from
+# row to row and from print to print.
+WRAP_CACHE_SIZE = 4096
+
+
+class GlyphWidths:
+    """
+    Advance widths of the characters of one font, in thousandths of the font
+    size, each measured once with reportlab and then looked up. The table
+    serves every size of the font. The width at a size is the sum times
+    0.001 times the size, multiplied in stringWidth's order so both agree.
+    """
+
+    def __init__(self, font: str):
+        self.font = font
+        self._widths: Dict[str, float] = {}
+
+    def units(self, text: str) -> float:
+        widths = self._widths
+        total = 0.0
+        for char in text:
+            width = widths.get(char)
+            if width is None:
+                width = widths[char] = stringWidth(char, self.font, 1000)
+            total += width
+        return total
+
+
+_glyph_widths: Dict[str, GlyphWidths] = {}
+
+
+def glyph_widths(font: str) -> GlyphWidths:
+    table = _glyph_widths.get(font)
+    if table is None:
+        table = _glyph_widths.setdefault(font, GlyphWidths(font))
+    return table
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """Same value as reportlab's stringWidth, from the glyph width table."""
+    return glyph_widths(font).units(text) * 0.001 * size
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def wrap_text(text: str, font: str, size: float, width: float) -> Tuple[str, ...]:
+    """
+    Greedy word wrap of text into lines no wider than width.
+
+    Every word is measured once and the width of the line is kept as a
+    running sum, so a cell costs one pass over its characters instead of a
+    measurement of the whole line for each word added to it. A word wider
+    than the column gets a line of its own.
+    """
+    widths = glyph_widths(font)
+    space = widths.units(" ")
+    lines = []
+    line_words = []
+    line_units = 0.0
+    for word in text.split():
+        word_units = widths.units(word)
+        if not line_words:
+            line_words.append(word)
+            line_units = word_units
+        elif (line_units + space + word_units) * 0.001 * size <= width:
+            line_words.append(word)
+            line_units += space + word_units
+        else:
+            lines.append(" ".join(line_words))
+            line_words = [word]
+            line_units = word_units
+    if line_words:
+        lines.append(" ".join(line_words))
+    return tuple(lines)
@@ -0,0 +1,194 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from config import Config
+from exceptions import PrintQueueFull
+from metrics.collectors import pdf_render_duration_seconds
+from pdf.cache import document_key, pdf_cache
+
+POOL_TYPES = ("thread", "process")
+
+
+def _run_timed(func: Callable[..., bytes], *args: Any) -> Tuple[bytes, float]:
+    """Runs a render function in the worker and returns its output with the time taken."""
+    start = time.perf_counter()
+    pdf_bytes = func(*args)
+    return pdf_bytes, time.perf_counter() - start
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class RenderedPdf(NamedTuple):
+    # None when the client already holds the document
+    content: Optional[bytes]
+    # Content address of the document, None for kinds that are not cached
+    key: Optional[str]
+    not_modified: bool = False
+
+
+class RenderStats:
+    """Render counters for a single kind of document."""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.render_seconds = 0.0
+        self.max_render_seconds = 0.0
+        self.queue_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "avg_render_ms": (
+                round(self.render_seconds / self.count * 1000, 2) if self.count else 0
+            ),
+            "max_render_ms": round(self.max_render_seconds * 1000, 2),
+            "avg_queue_ms": (
+                round(self.queue_seconds / self.count * 1000, 2) if self.count else 0
+            ),
+        }
+
+
+class PdfRenderer:
+    """
+    Runs the CPU bound part of the print endpoints (overlay drawing, template
+    merging and writing the PDF) in a thread or process pool, so a render never
+    stalls the event loop.
+
+    At most workers + queue_size renders are admitted at a time. Any further
+    request waits up to queue_timeout seconds for a slot and is then rejected
+    with PrintQueueFull. Counters are only touched from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        pool: str = "thread",
+        workers: int = 2,
+        queue_size: int = 8,
+        queue_timeout: float = 10.0,
+    ):
+        if pool not in POOL_TYPES:
+            raise ValueError(f"PDF render pool must be one of {POOL_TYPES}")
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        self._stats: Dict[str, RenderStats] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="pdf-render"
+                )
+        return self._executor
+
+    async def _acquire_slot(self) -> None:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PrintQueueFull()
+        finally:
+            self.waiting -= 1
+
+    async def render(self, kind: str, func: Callable[..., bytes], *args: Any) -> bytes:
+        """
+        Runs func(*args) in the pool and returns the PDF bytes it produced.
+        With a process pool, func must be a module level function and args
+        must be picklable.
+        """
+        await self._acquire_slot()
+        stats = self._stats.setdefault(kind, RenderStats())
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            pdf_bytes, render_seconds = await loop.run_in_executor(
+                self.executor, _run_timed, func, *args
+            )
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        stats.count += 1
+        stats.render_seconds += render_seconds
+        stats.max_render_seconds = max(stats.max_render_seconds, render_seconds)
+        stats.queue_seconds += max(0.0, time.perf_counter() - start - render_seconds)
+        pdf_render_duration_seconds.observe(render_seconds, kind)
+        return pdf_bytes
+
+    async def render_document(
+        self,
+        kind: str,
+        func: Callable[..., bytes],
+        *args: Any,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
+        """
+        Like render, but a document rendered before from the same values is
+        read back from the PDF cache instead. When if_none_match already names
+        the document's key, nothing is read or rendered and the result is
+        marked not_modified.
+        """
+        key = document_key(kind, args)
+        if key is not None and if_none_match:
+            if _etag_matches(if_none_match, f'"{key}"'):
+                return RenderedPdf(None, key, not_modified=True)
+        if key is None or not pdf_cache.enabled:
+            return RenderedPdf(await self.render(kind, func, *args), key)
+        pdf_bytes = await asyncio.to_thread(pdf_cache.get, key)
+        if pdf_bytes is None:
+            pdf_bytes = await self.render(kind, func, *args)
+            await asyncio.to_thread(pdf_cache.put, key, pdf_bytes)
+        return RenderedPdf(pdf_bytes, key)
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers) + self.waiting,
+            "waiting_for_slot": self.waiting,
+            "rejected": self.rejected,
+            "renders": {kind: stats.as_dict() for kind, stats in self._stats.items()},
+            "cache": pdf_cache.stats(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+pdf_renderer = PdfRenderer(
+    pool=Config.PDF_RENDER_POOL,
+    workers=Config.PDF_RENDER_WORKERS,
+    queue_size=Config.PDF_RENDER_QUEUE_SIZE,
+    queue_timeout=Config.PDF_RENDER_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,28 @@
+import io
+
+from fastapi import Response, status
+from fastapi.responses import StreamingResponse
+
+from pdf.renderer import RenderedPdf
+
+# The print endpoints are POSTs, which browsers never revalidate by
+# themselves: the frontend keeps the ETag and sends it back in If-None-Match.
+CACHE_CONTROL = "private, no-cache"
+
+
+def pdf_response(document: RenderedPdf, filename: str) -> Response:
+    """
+    Sends a printed document as an attachment, with its content address as
+    the ETag. A document the client already holds, as matched against
+    If-None-Match by PdfRenderer.render_document, gets an empty 304 instead.
+    """
+    if document.key is None:
+        headers = {}
+    else:
+        headers = {"ETag": f'"{document.key}"', "Cache-Control": CACHE_CONTROL}
+        if document.not_modified:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        io.BytesIO(document.content), media_type="application/pdf", headers=headers
+    )
@@ -0,0 +1,84 @@
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from reportlab.pdfgen import canvas
+
+from pdf.layout import text_width, wrap_text
+
+
+class TableStyle(NamedTuple):
+    line_spacing: float
+    min_row_height: float
+    row_padding: float
+    font: str = "Helvetica"
+    # Size the cells are wrapped and centred at
+    size: float = 9
+    # Size the text is drawn at, when it differs from size
+    draw_size: Optional[float] = None
+
+
+class PlacedRow(NamedTuple):
+    y: float
+    height: float
+    # Wrapped lines of each cell
+    cells: List[Tuple[str, ...]]
+
+
+def layout_table(
+    rows: Iterable[Sequence[str]],
+    widths: Sequence[float],
+    style: TableStyle,
+    top: float,
+    bottom: float,
+) -> List[List[PlacedRow]]:
+    """
+    Wraps the cells of every row and places the rows from top down, starting
+    a new page whenever the next row would end below bottom. Returns the
+    placed rows of each page, at least one (empty) page.
+
+    A single pass: each cell is wrapped once (wrap_text caches repeated
+    values), the height of a row is known as soon as its cells are wrapped,
+    and a row is never moved once placed. A row taller than a whole page
+    still gets a page of its own.
+    """
+    pages: List[List[PlacedRow]] = [[]]
+    y = top
+    for row in rows:
+        cells = [
+            wrap_text(str(text), style.font, style.size, width)
+            for text, width in zip(row, widths)
+        ]
+        max_lines = max(len(lines) for lines in cells)
+        height = max(max_lines * style.line_spacing, style.min_row_height)
+        if y - height < bottom and pages[-1]:
+            pages.append([])
+            y = top
+        pages[-1].append(PlacedRow(y, height, cells))
+        y -= height + style.row_padding
+    return pages
+
+
+def draw_table(
+    can: canvas.Canvas,
+    columns: Sequence[dict],
+    placed: Sequence[PlacedRow],
+    style: TableStyle,
+    first_cell: int = 0,
+) -> None:
+    """
+    Draws the lines of each cell centred in its column, cells first_cell
+    onwards going into columns in order. Every line goes into one text
+    object, written to the page as a single block.
+    """
+    text = can.beginText()
+    text.setFont(style.font, style.draw_size or style.size)
+    for y, height, cells in placed:
+        for col, lines in zip(columns, cells[first_cell:]):
+            vertical_offset = (height - len(lines) * style.line_spacing) / 2
+            for i, ln in enumerate(lines):
+                line_width = text_width(ln, style.font, style.size)
+                text.setTextOrigin(
+                    col["x"] + col["width"] / 2 - line_width / 2,
+                    y - vertical_offset - (i * style.line_spacing),
+                )
+                text.textOut(ln)
+    can.drawText(text)
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2._page import PageObject
+
+from utils.file_utils import safe_join
+
+STATIC_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static")
+)
+
+# Templates used by the print endpoints
+SRF_TEMPLATE = "out_of_warranty_receipt.pdf"
+ESTIMATE_TEMPLATE = "estimate.pdf"
+VENDOR_CHALLAN_TEMPLATE = "vendor_challan.pdf"
+ROAD_CHALLAN_TEMPLATE = "road_challan.pdf"
+RETAIL_TEMPLATE = "retail.pdf"
+WARRANTY_SRF_TEMPLATE = "warranty_receipt.pdf"
+CNF_CHALLAN_TEMPLATE = "cnf_challan.pdf"
+
+ALL_TEMPLATES = (
+    SRF_TEMPLATE,
+    ESTIMATE_TEMPLATE,
+    VENDOR_CHALLAN_TEMPLATE,
+    ROAD_CHALLAN_TEMPLATE,
+    RETAIL_TEMPLATE,
+    WARRANTY_SRF_TEMPLATE,
+    CNF_CHALLAN_TEMPLATE,
+)
+
+# Template of each kind of print document, by the kind the renderer is given
+DOCUMENT_TEMPLATES = {
+    "srf": SRF_TEMPLATE,
+    "estimate": ESTIMATE_TEMPLATE,
+    "vendor_challan": VENDOR_CHALLAN_TEMPLATE,
+    "road_challan": ROAD_CHALLAN_TEMPLATE,
+    "retail": RETAIL_TEMPLATE,
+    "warranty_srf": WARRANTY_SRF_TEMPLATE,
+    "cnf_challan": CNF_CHALLAN_TEMPLATE,
+}
+
+
+def copy_page(page: PageObject) -> PageObject:
+    """
+    Returns a shallow copy of a template page. merge_page only replaces the
+    /Contents, /Resources and /Annots entries of the page it is called on, so
+    the copy can be merged without touching the cached template.
+    """
+    page_copy = PageObject(page.pdf, page.indirect_reference)
+    page_copy.update(page)
+    return page_copy
+
+
+class TemplateRegistry:
+    """
+    Process wide cache of the parsed PDF templates in static/.
+
+    Each template is read and parsed once, and parsed again only when the
+    file's mtime changes. pages() hands out per-request copies of the pages
+    that can be merged with an overlay, and version() a digest of the file.
+    """
+
+    def __init__(self, static_dir: str = STATIC_DIR):
+        self.static_dir = static_dir
+        self._templates: Dict[str, Tuple[int, List[PageObject], str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, template_path: str) -> Tuple[List[PageObject], str]:
+        try:
+            with open(template_path, "rb") as f:
+                template_bytes = f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template PDF not found at {template_path}")
+        template_pdf = PdfReader(io.BytesIO(template_bytes))
+        # Resolve every object the pages reference now, so later (possibly
+        # concurrent) renders only read from the reader's object cache.
+        warm_up = PdfWriter()
+        for page in template_pdf.pages:
+            warm_up.add_page(page)
+        warm_up.write(io.BytesIO())
+        return list(template_pdf.pages), hashlib.sha256(template_bytes).hexdigest()
+
+    def _get(self, name: str) -> Tuple[List[PageObject], str]:
+        template_path = safe_join(self.static_dir, name)
+        try:
+            mtime = os.stat(template_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template PDF not found at {template_path}")
+        cached = self._templates.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1:]
+        with self._lock:
+            cached = self._templates.get(name)
+            if not cached or cached[0] != mtime:
+                cached = (mtime, *self._load(template_path))
+                self._templates[name] = cached
+        return cached[1:]
+
+    def pages(self, name: str) -> List[PageObject]:
+        """Returns fresh copies of all pages of the template."""
+        return [copy_page(page) for page in self._get(name)[0]]
+
+    def version(self, name: str) -> str:
+        """SHA-256 of the template file, changes whenever the file does."""
+        return self._get(name)[1]
+
+    def preload(self) -> None:
+        for name in ALL_TEMPLATES:
+            self._get(name)
+
+
+template_registry = TemplateRegistry()
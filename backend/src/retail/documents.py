@@ -0,0 +1,62 @@
+from pdf.compose import render_copies, stamp_copies
+from pdf.layout import text_width, wrap_text
+from pdf.templates import RETAIL_TEMPLATE
+
+
+def draw_retail_overlay(can, rows, name, address, contact, code, grand_total):
+    # Header
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(262, 675, name)
+    can.drawString(262, 640, address)
+    can.drawString(405, 608, contact)
+    can.drawString(190, 608, code)
+
+    text = str(grand_total)
+    column_width = 55
+    x_start = 500
+    line_width = text_width(text, "Helvetica-Bold", 10)
+    x_position = x_start + (column_width - line_width) / 2
+    can.drawString(x_position, 397, text)
+
+    # Table
+    y = 562
+    line_spacing = 8
+    min_row_height = 20
+    row_padding = 0.2
+    columns = [
+        {"x": 50, "width": 60},  # Retail Code
+        {"x": 120, "width": 55},  # Retail Date
+        {"x": 180, "width": 70},  # Division
+        {"x": 260, "width": 235},  # Details
+        {"x": 500, "width": 55},  # Total Amount
+    ]
+    can.setFont("Helvetica", 9)
+    for idx, row in enumerate(rows, 1):
+        row_data = row
+        row_lines = [
+            wrap_text(str(text), "Helvetica", 9, col["width"])
+            for col, text in zip(columns, row_data)
+        ]
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max(max_lines * line_spacing, min_row_height)
+        for col, lines in zip(columns, row_lines):
+            total_text_height = len(lines) * line_spacing
+            vertical_offset = (row_height - total_text_height) / 2
+            for i, ln in enumerate(lines):
+                line_width = text_width(ln, "Helvetica", 9)
+                center_x = col["x"] + col["width"] / 2 - line_width / 2
+                y_position = y - vertical_offset - (i * line_spacing)
+                can.drawString(center_x, y_position, ln)
+        y -= row_height + row_padding
+
+
+def render_retail(rows, name, address, contact, code, grand_total) -> bytes:
+    """
+    Renders a retail bill and returns the PDF.
+    """
+    overlay_pages = render_copies(
+        lambda can: draw_retail_overlay(
+            can, rows, name, address, contact, code, grand_total
+        )
+    )
+    return stamp_copies(RETAIL_TEMPLATE, overlay_pages)
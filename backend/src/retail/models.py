@@ -1,12 +1,30 @@
 from datetime import date
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlmodel import Column, Field, SQLModel
 
 
 class Retail(SQLModel, table=True):
     __tablename__ = "retail"
+    __table_args__ = (
+        # Partial indexes behind the settlement lists
+        Index(
+            "ix_retail_not_received",
+            "rcode",
+            postgresql_where=text("received = 'N'"),
+        ),
+        Index(
+            "ix_retail_unsettled",
+            "rcode",
+            postgresql_where=text("settlement_date IS NULL"),
+        ),
+        Index(
+            "ix_retail_final_settlement",
+            "rcode",
+            postgresql_where=text("settlement_date IS NOT NULL AND final_status = 'N'"),
+        ),
+    )
     rcode: str = Field(primary_key=True, index=True)
     retail_date: date = Field(sa_column=Column(pg.DATE, nullable=False))
     division: str = Field(sa_column=Column(pg.VARCHAR(20), nullable=False))
@@ -1,12 +1,13 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from auth.dependencies import AccessTokenBearer, RoleChecker
 from db.db import get_session
+from pdf.response import pdf_response
 from retail.schemas import (
     RetailCreate,
     RetailEnquiry,
@@ -20,6 +21,7 @@ from retail.schemas import (
     UpdateRetailUnsettled,
 )
 from retail.service import RetailService
+from utils.pagination import MAX_ENQUIRY_PAGE_SIZE, NEXT_CURSOR_HEADER
 
 retail_router = APIRouter()
 retail_service = RetailService()
@@ -83,8 +85,10 @@ async def update_received(
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
-    await retail_service.update_received(list_retail, session, token)
-    return JSONResponse(content={"message": f"Retail Records Updated"})
+    not_found = await retail_service.update_received(list_retail, session, token)
+    return JSONResponse(
+        content={"message": f"Retail Records Updated", "not_found": not_found}
+    )
 
 
 """
@@ -115,8 +119,13 @@ async def update_unsettled(
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
-    await retail_service.update_unsettled(list_retail, session, token)
-    return JSONResponse(content={"message": f"Retail Records Proposed for Settlement"})
+    not_found = await retail_service.update_unsettled(list_retail, session, token)
+    return JSONResponse(
+        content={
+            "message": f"Retail Records Proposed for Settlement",
+            "not_found": not_found,
+        }
+    )
 
 
 """
@@ -152,8 +161,10 @@ async def update_final_settlement(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await retail_service.update_final_settlement(list_retail, session)
-    return JSONResponse(content={"message": f"Retail Records Settled"})
+    not_found = await retail_service.update_final_settlement(list_retail, session)
+    return JSONResponse(
+        content={"message": f"Retail Records Settled", "not_found": not_found}
+    )
 
 
 """
@@ -163,17 +174,34 @@ Filter retail enquiry records
 
 @retail_router.get("/enquiry", response_model=List[RetailEnquiry])
 async def retail_enquiry(
+    response: Response,
     name: Optional[str] = None,
     division: Optional[str] = None,
     from_retail_date: Optional[date] = None,
     to_retail_date: Optional[date] = None,
     received: Optional[str] = None,
     final_status: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ENQUIRY_PAGE_SIZE),
+    stream: bool = False,
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
+    if stream:
+        # NDJSON, read through a server side cursor
+        return StreamingResponse(
+            retail_service.stream_retail_enquiry(
+                name,
+                division,
+                from_retail_date,
+                to_retail_date,
+                received,
+                final_status,
+            ),
+            media_type="application/x-ndjson",
+        )
     try:
-        enquiry_list = await retail_service.get_retail_enquiry(
+        enquiry_list, next_cursor = await retail_service.get_retail_enquiry(
             session,
             name,
             division,
@@ -181,7 +209,11 @@ async def retail_enquiry(
             to_retail_date,
             received,
             final_status,
+            after=after,
+            limit=limit,
         )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return enquiry_list
     except:
         return []
@@ -211,12 +243,9 @@ Print retail receipt by rcode.
 @retail_router.post("/print", status_code=status.HTTP_200_OK)
 async def print_retail(
     data: RetailRcode,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    retail_pdf = await retail_service.print_retail(data, session)
-    return StreamingResponse(
-        retail_pdf,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="retail.pdf"'},
-    )
+    retail_pdf = await retail_service.print_retail(data, session, if_none_match)
+    return pdf_response(retail_pdf, "retail.pdf")
@@ -1,19 +1,16 @@
-import io
-import os
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from reportlab.pdfgen import canvas
-from sqlalchemy import case, func, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Select, case, func, select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from counter.service import RETAIL_RCODE, CounterService
 from exceptions import MasterNotFound
 from master.models import Master
 from master.service import MasterService
+from menu.cache import RETAIL_GROUP, dashboard_cache
+from pdf.renderer import RenderedPdf, pdf_renderer
+from retail.documents import render_retail
 from retail.models import Retail
 from retail.schemas import (
     RetailCreate,
@@ -27,44 +24,53 @@ from retail.schemas import (
     UpdateRetailReceived,
     UpdateRetailUnsettled,
 )
+from utils.bulk import bulk_update
 from utils.date_utils import format_date_ddmmyyyy, parse_date
-from utils.file_utils import safe_join, split_text_to_lines
+from utils.pagination import keyset_page, stream_ndjson
+from utils.projection import Projection
+from utils.search import same_text
 
+counter_service = CounterService()
 master_service = MasterService()
 
+# Columns behind each enquiry row
+RETAIL_ENQUIRY = Projection(
+    RetailEnquiry,
+    rcode=Retail.rcode,
+    name=Master.name,
+    retail_date=(Retail.retail_date, format_date_ddmmyyyy),
+    division=Retail.division,
+    details=Retail.details,
+    amount=Retail.amount,
+    received=Retail.received,
+    final_status=Retail.final_status,
+)
+
 
 class RetailService:
 
     async def create_retail(
         self, session: AsyncSession, retail: RetailCreate, token: dict
     ):
-        for _ in range(3):  # Retry up to 3 times in case of IntegrityError
-            master = await master_service.get_master_by_name(retail.name, session)
-            retail_data_dict = retail.model_dump()
-            retail_data_dict["rcode"] = await self.retail_next_code(session)
-            retail_data_dict["created_by"] = token["user"]["username"]
-            retail_data_dict["code"] = master.code
-            # Convert date fields to date objects
-            for date_field in ["retail_date"]:
-                if date_field in retail_data_dict:
-                    retail_data_dict[date_field] = parse_date(
-                        retail_data_dict[date_field]
-                    )
-            retail_data_dict.pop("name", None)
-            new_retail = Retail(**retail_data_dict)
-            session.add(new_retail)
-            try:
-                await session.commit()
-                return new_retail
-            except IntegrityError as e:
-                await session.rollback()
+        master = await master_service.get_master_by_name(retail.name, session)
+        retail_data_dict = retail.model_dump()
+        next_rcode = await counter_service.allocate(RETAIL_RCODE, session)
+        retail_data_dict["rcode"] = "X" + str(next_rcode).zfill(5)
+        retail_data_dict["created_by"] = token["user"]["username"]
+        retail_data_dict["code"] = master.code
+        # Convert date fields to date objects
+        for date_field in ["retail_date"]:
+            if date_field in retail_data_dict:
+                retail_data_dict[date_field] = parse_date(retail_data_dict[date_field])
+        retail_data_dict.pop("name", None)
+        new_retail = Retail(**retail_data_dict)
+        session.add(new_retail)
+        await session.commit()
+        dashboard_cache.invalidate(RETAIL_GROUP)
+        return new_retail
 
     async def retail_next_code(self, session: AsyncSession):
-        statement = select(Retail.rcode).order_by(Retail.rcode.desc()).limit(1)
-        result = await session.execute(statement)
-        last_rcode = result.scalar()
-        last_number = last_rcode[1:] if last_rcode else "0"
-        next_rcode = int(last_number) + 1
+        next_rcode = await counter_service.peek(RETAIL_RCODE, session)
         next_rcode = "X" + str(next_rcode).zfill(5)
         return next_rcode
 
@@ -96,14 +102,23 @@ class RetailService:
         session: AsyncSession,
         token: dict,
     ):
-        for retail in list_retail:
-            statement = select(Retail).where(Retail.rcode == retail.rcode)
-            result = await session.execute(statement)
-            existing_retail = result.scalar_one_or_none()
-            if existing_retail:
-                existing_retail.received = retail.received
-                existing_retail.updated_by = token["user"]["username"]
+        updated_by = token["user"]["username"]
+        not_found = await bulk_update(
+            session,
+            Retail,
+            "rcode",
+            [
+                {
+                    "rcode": retail.rcode,
+                    "received": retail.received,
+                    "updated_by": updated_by,
+                }
+                for retail in list_retail
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(RETAIL_GROUP)
+        return not_found
 
     async def list_retail_unsettled(self, session: AsyncSession, token: dict):
         received_by = token["user"]["username"]
@@ -129,15 +144,24 @@ class RetailService:
     async def update_unsettled(
         self, list_retail: List[UpdateRetailUnsettled], session: AsyncSession, token: dict
     ):
-        for retail in list_retail:
-            statement = select(Retail).where(Retail.rcode == retail.rcode)
-            result = await session.execute(statement)
-            existing_retail = result.scalar_one_or_none()
-            if existing_retail:
-                existing_retail.received = retail.received
-                existing_retail.settlement_date = retail.settlement_date
-                existing_retail.updated_by = token["user"]["username"]
+        updated_by = token["user"]["username"]
+        not_found = await bulk_update(
+            session,
+            Retail,
+            "rcode",
+            [
+                {
+                    "rcode": retail.rcode,
+                    "received": retail.received,
+                    "settlement_date": retail.settlement_date,
+                    "updated_by": updated_by,
+                }
+                for retail in list_retail
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(RETAIL_GROUP)
+        return not_found
 
     async def list_retail_final_settlement(self, session: AsyncSession):
         statement = (
@@ -163,34 +187,45 @@ class RetailService:
     async def update_final_settlement(
         self, list_retail: List[UpdateRetailFinalSettlement], session: AsyncSession
     ):
-        for retail in list_retail:
-            statement = select(Retail).where(Retail.rcode == retail.rcode)
-            result = await session.execute(statement)
-            existing_retail = result.scalar_one_or_none()
-            if existing_retail:
-                existing_retail.amount = retail.amount
-                existing_retail.final_status = retail.final_status
+        not_found = await bulk_update(
+            session,
+            Retail,
+            "rcode",
+            [
+                {
+                    "rcode": retail.rcode,
+                    "amount": retail.amount,
+                    "final_status": retail.final_status,
+                }
+                for retail in list_retail
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(RETAIL_GROUP)
+        return not_found
 
-    async def get_retail_enquiry(
+    def _enquiry_statement(
         self,
-        session: AsyncSession,
         name: Optional[str] = None,
         division: Optional[str] = None,
         from_retail_date: Optional[date] = None,
         to_retail_date: Optional[date] = None,
         received: Optional[str] = None,
         final_status: Optional[str] = None,
-    ) -> List[RetailEnquiry]:
+    ) -> Select:
         # Check if master name exists
-        statement = select(Retail, Master.name).join(Master, Master.code == Retail.code)
+        statement = (
+            RETAIL_ENQUIRY.select()
+            .select_from(Retail)
+            .join(Master, Master.code == Retail.code)
+        )
 
         # Apply filters dynamically
         if final_status:
             statement = statement.where(Retail.final_status == final_status)
 
         if name:
-            statement = statement.where(Master.name.ilike(f"{name}"))
+            statement = statement.where(same_text(Master.name, name))
 
         if division:
             statement = statement.where(Retail.division == division)
@@ -202,24 +237,50 @@ class RetailService:
 
         if received:
             statement = statement.where(Retail.received == received)
+        return statement
 
-        statement = statement.order_by(Retail.rcode)
+    async def get_retail_enquiry(
+        self,
+        session: AsyncSession,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_retail_date: Optional[date] = None,
+        to_retail_date: Optional[date] = None,
+        received: Optional[str] = None,
+        final_status: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[RetailEnquiry], Optional[str]]:
+        statement = self._enquiry_statement(
+            name,
+            division,
+            from_retail_date,
+            to_retail_date,
+            received,
+            final_status,
+        )
+        return await keyset_page(
+            session, statement, Retail.rcode, RETAIL_ENQUIRY.build, after, limit
+        )
 
-        result = await session.execute(statement)
-        rows = result.all()
-        return [
-            RetailEnquiry(
-                rcode=row.Retail.rcode,
-                name=row.name,
-                retail_date=format_date_ddmmyyyy(row.Retail.retail_date),
-                division=row.Retail.division,
-                details=row.Retail.details,
-                amount=row.Retail.amount,
-                received=row.Retail.received,
-                final_status=row.Retail.final_status,
-            )
-            for row in rows
-        ]
+    def stream_retail_enquiry(
+        self,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_retail_date: Optional[date] = None,
+        to_retail_date: Optional[date] = None,
+        received: Optional[str] = None,
+        final_status: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        statement = self._enquiry_statement(
+            name,
+            division,
+            from_retail_date,
+            to_retail_date,
+            received,
+            final_status,
+        )
+        return stream_ndjson(statement, Retail.rcode, RETAIL_ENQUIRY.build)
 
     async def get_retail_print_details(
         self,
@@ -250,8 +311,11 @@ class RetailService:
         ]
 
     async def print_retail(
-        self, codes: RetailRcode, session: AsyncSession
-    ) -> io.BytesIO:
+        self,
+        codes: RetailRcode,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
 
         # Query retail and master info for all codes
         statement = (
@@ -288,92 +352,14 @@ class RetailService:
             grand_total += amount
         grand_total_str = f"{grand_total:.2f}"
 
-        def generate_overlay(rows, name, address, contact, code, grand_total):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-            # Header
-            can.setFont("Helvetica-Bold", 10)
-            can.drawString(262, 675, name)
-            can.drawString(262, 640, address)
-            can.drawString(405, 608, contact)
-            can.drawString(190, 608, code)
-
-            text = str(grand_total)
-            column_width = 55
-            x_start = 500
-            text_width = stringWidth(text, "Helvetica-Bold", 10)
-            x_position = x_start + (column_width - text_width) / 2
-            can.drawString(x_position, 397, text)
-
-            # Table
-            y = 562
-            line_spacing = 8
-            min_row_height = 20
-            row_padding = 0.2
-            columns = [
-                {"x": 50, "width": 60},  # Retail Code
-                {"x": 120, "width": 55},  # Retail Date
-                {"x": 180, "width": 70},  # Division
-                {"x": 260, "width": 235},  # Details
-                {"x": 500, "width": 55},  # Total Amount
-            ]
-            can.setFont("Helvetica", 9)
-            for idx, row in enumerate(rows, 1):
-                row_data = row
-                row_lines = []
-                for col, text in zip(columns, row_data):
-                    words = text.split()
-                    lines = []
-                    line = ""
-                    for word in words:
-                        test_line = line + (" " if line else "") + word
-                        if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                            line = test_line
-                        else:
-                            lines.append(line)
-                            line = word
-                    if line:
-                        lines.append(line)
-                    row_lines.append(lines)
-                max_lines = max(len(lines) for lines in row_lines)
-                row_height = max(max_lines * line_spacing, min_row_height)
-                for col, lines in zip(columns, row_lines):
-                    total_text_height = len(lines) * line_spacing
-                    vertical_offset = (row_height - total_text_height) / 2
-                    for i, ln in enumerate(lines):
-                        text_width = stringWidth(ln, "Helvetica", 9)
-                        center_x = col["x"] + col["width"] / 2 - text_width / 2
-                        y_position = y - vertical_offset - (i * line_spacing)
-                        can.drawString(center_x, y_position, ln)
-                y -= row_height + row_padding
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        # Path to the static PDF template (use absolute path for portability, with path injection protection)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "retail.pdf")
-        try:
-            with open(template_path, "rb") as f:
-                template_bytes = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Template PDF not found at {template_path}")
-        template_buffer = io.BytesIO(template_bytes)
-        base_pdf = PdfReader(template_buffer)
-
-        overlay = generate_overlay(
-            retail_rows, name, address, contact, code, grand_total_str
+        return await pdf_renderer.render_document(
+            "retail",
+            render_retail,
+            retail_rows,
+            name,
+            address,
+            contact,
+            code,
+            grand_total_str,
+            if_none_match=if_none_match,
         )
-        output = PdfWriter()
-        # Apply overlay on each base page
-        for i in range(len(base_pdf.pages)):
-            page = base_pdf.pages[i]
-            overlay_page = overlay.pages[min(i, len(overlay.pages) - 1)]
-            page.merge_page(overlay_page)
-            output.add_page(page)
-        result = io.BytesIO()
-        output.write(result)
-        result.seek(0)
-        return result
@@ -3,6 +3,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from exceptions import ServiceCenterAlreadyExists, ServiceCenterNotFound
+from menu.cache import MASTER_GROUP, dashboard_cache
 
 from .models import ServiceCentre
 
@@ -34,3 +35,5 @@ class ServiceCenterService:
             new_service_center = ServiceCentre(asc_name=name)
             session.add(new_service_center)
             await session.commit()
+            # The ASC count is part of the master group
+            dashboard_cache.invalidate(MASTER_GROUP)
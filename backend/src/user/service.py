@@ -2,8 +2,9 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.future import select
 
+from auth.cache import principal_cache
 from auth.models import User
-from auth.utils import generate_hash_password, verify_password
+from auth.utils import check_password, hash_password
 from exceptions import CannotDeleteCurrentUser, InvalidCredentials, UserNotFound
 from user.schema import UserChangePassword, UserCreate
 
@@ -25,13 +26,14 @@ class UserService:
         user.username = " ".join(user.username.split())
         user_data_dict = user.model_dump()
         new_user = User(**user_data_dict)
-        new_user.password = generate_hash_password(user_data_dict["password"])
+        new_user.password = await hash_password(user_data_dict["password"])
         session.add(new_user)
         try:
             await session.commit()
         except:
             await session.rollback()
             raise IntegrityError()
+        principal_cache.invalidate(new_user.username)
         return new_user
 
     async def user_exists(self, username: str, session: AsyncSession) -> bool:
@@ -56,16 +58,20 @@ class UserService:
         user_to_delete.is_active = "N"
         session.add(user_to_delete)
         await session.commit()
+        principal_cache.invalidate(user_to_delete.username)
 
     async def reset_password(
         self, user_data: UserChangePassword, session: AsyncSession
     ):
         existing_user = await self.get_user_by_username(user_data.username, session)
-        if existing_user and verify_password(
-            user_data.old_password, existing_user.password
-        ):
-            existing_user.password = generate_hash_password(user_data.new_password)
-            session.add(existing_user)
-            await session.commit()
-            return existing_user
+        if existing_user:
+            valid, _ = await check_password(
+                user_data.old_password, existing_user.password
+            )
+            if valid:
+                existing_user.password = await hash_password(user_data.new_password)
+                session.add(existing_user)
+                await session.commit()
+                principal_cache.invalidate(existing_user.username)
+                return existing_user
         raise InvalidCredentials()
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import cast, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows per UPDATE statement, keeps the bind parameters of one statement well
+# under the 32767 allowed by PostgreSQL
+BULK_BATCH_SIZE = 1000
+
+
+async def bulk_update(
+    session: AsyncSession,
+    model: Any,
+    key: str,
+    rows: Sequence[Dict[str, Any]],
+) -> List[str]:
+    """
+    Updates many rows of model with one UPDATE ... FROM (VALUES ...) per
+    batch instead of a SELECT and an UPDATE per row.
+
+    Every row is a dict of the key column and the columns to set, with the
+    same columns in all rows. If a key is repeated the last row wins, as it
+    did when the rows were applied one by one. Returns the keys that matched
+    no row. The caller commits.
+    """
+    rows = list({row[key]: row for row in rows}.values())
+    if not rows:
+        return []
+    table = model.__table__
+    names = list(rows[0])
+    not_found = []
+    for start in range(0, len(rows), BULK_BATCH_SIZE):
+        batch = rows[start : start + BULK_BATCH_SIZE]
+        data = values(
+            *(column(name, table.c[name].type) for name in names), name="data"
+        ).data([tuple(row[name] for name in names) for row in batch])
+        statement = (
+            update(table)
+            .where(table.c[key] == data.c[key])
+            # A column that is NULL in every row of the batch is untyped in
+            # VALUES, the cast gives it the column type back
+            .values(
+                {
+                    name: cast(data.c[name], table.c[name].type)
+                    for name in names
+                    if name != key
+                }
+            )
+            .returning(table.c[key])
+        )
+        updated = set((await session.execute(statement)).scalars())
+        not_found.extend(row[key] for row in batch if row[key] not in updated)
+    return not_found
@@ -44,3 +44,10 @@ def format_date_ddmmyyyy(
             f"Unsupported type for format_date_ddmmyyyy: {type(date_input)}"
         )
     return d.strftime("%d-%m-%Y")
+
+
+def format_date_or_blank(date_input: Optional[Union[str, datetime, date]]) -> str:
+    """
+    Same as format_date_ddmmyyyy, but returns an empty string when there is no date.
+    """
+    return format_date_ddmmyyyy(date_input) or ""
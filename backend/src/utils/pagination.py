@@ -0,0 +1,67 @@
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from db.db import async_session_maker
+
+# Page size of the enquiry endpoints when a client pages with after alone, and
+# the largest page a client may ask for
+ENQUIRY_PAGE_SIZE = 500
+MAX_ENQUIRY_PAGE_SIZE = 1000
+# Rows fetched per round-trip when streaming through a server side cursor
+STREAM_BATCH_SIZE = 500
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+async def keyset_page(
+    session: AsyncSession,
+    statement: Select,
+    key_column: InstrumentedAttribute,
+    to_item: Callable[..., BaseModel],
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[BaseModel], Optional[str]]:
+    """
+    Returns the first `limit` rows of statement whose key_column is greater
+    than `after`, and the cursor of the next page (None on the last page).
+    key_column must be unique, so that no row is skipped or repeated.
+
+    Paging is opt-in: with neither after nor limit every row is returned,
+    and after alone pages by ENQUIRY_PAGE_SIZE.
+    """
+    if limit is None and not after:
+        statement = statement.order_by(key_column)
+        rows = (await session.execute(statement)).all()
+        return [to_item(row) for row in rows], None
+    if limit is None:
+        limit = ENQUIRY_PAGE_SIZE
+    if after:
+        statement = statement.where(key_column > after)
+    statement = statement.order_by(key_column).limit(limit + 1)
+    rows = (await session.execute(statement)).all()
+    items = [to_item(row) for row in rows[:limit]]
+    next_cursor = getattr(items[-1], key_column.key) if len(rows) > limit else None
+    return items, next_cursor
+
+
+async def stream_ndjson(
+    statement: Select,
+    key_column: InstrumentedAttribute,
+    to_item: Callable[..., BaseModel],
+) -> AsyncIterator[bytes]:
+    """
+    Yields every row of statement as one JSON line, reading them through a
+    server side cursor in batches of STREAM_BATCH_SIZE. It uses a session of
+    its own, since the response body is sent after the route has returned.
+    """
+    statement = statement.order_by(key_column).execution_options(
+        yield_per=STREAM_BATCH_SIZE
+    )
+    async with async_session_maker() as session:
+        result = await session.stream(statement)
+        async for row in result:
+            yield to_item(row).model_dump_json().encode("utf-8") + b"\n"
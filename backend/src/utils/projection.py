@@ -0,0 +1,43 @@
+from typing import Any, Callable, Dict, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+
+class Projection:
+    """
+    The columns a response schema is built from.
+
+    Every field of the schema is given as the column (or SQL expression) it is
+    read from, optionally as a (column, converter) pair when the value needs
+    formatting. select() reads only those columns, and build() creates the
+    schema straight from a result row, without loading any ORM entity.
+    """
+
+    def __init__(self, schema: Type[BaseModel], **fields: Any):
+        unknown = set(fields) - set(schema.model_fields)
+        if unknown:
+            raise ValueError(f"{schema.__name__} has no fields {sorted(unknown)}")
+        missing = {
+            name
+            for name, field in schema.model_fields.items()
+            if field.is_required() and name not in fields
+        }
+        if missing:
+            raise ValueError(f"{schema.__name__} needs columns for {sorted(missing)}")
+        self.schema = schema
+        self.columns: Dict[str, Any] = {}
+        self.converters: Dict[str, Callable[[Any], Any]] = {}
+        for name, field in fields.items():
+            if isinstance(field, tuple):
+                field, self.converters[name] = field
+            self.columns[name] = field
+
+    def select(self) -> Select:
+        return select(*(column.label(name) for name, column in self.columns.items()))
+
+    def build(self, row) -> BaseModel:
+        values = dict(row._mapping)
+        for name, converter in self.converters.items():
+            values[name] = converter(values[name])
+        return self.schema(**values)
@@ -0,0 +1,35 @@
+from sqlalchemy import ColumnElement
+
+# Results of the typeahead search, and the most a client may ask for
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 25
+
+
+def escape_like(text: str) -> str:
+    """
+    Escapes the LIKE wildcards in text, so that a user typing % or _ searches
+    for that character. Backslash is the default LIKE escape of PostgreSQL.
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains(column, text: str) -> ColumnElement[bool]:
+    """
+    Case insensitive substring match on column. The pattern has no ESCAPE
+    clause, so PostgreSQL can answer it from a pg_trgm GIN index on column.
+    """
+    return column.ilike(f"%{escape_like(text)}%")
+
+
+def starts_with(column, text: str) -> ColumnElement[bool]:
+    """
+    Case insensitive prefix match on column.
+    """
+    return column.ilike(f"{escape_like(text)}%")
+
+
+def same_text(column, text: str) -> ColumnElement[bool]:
+    """
+    Case insensitive equality on column, without wildcards.
+    """
+    return column.ilike(escape_like(text))
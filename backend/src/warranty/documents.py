@@ -0,0 +1,169 @@
+from pdf.compose import render_copies, render_pages, stamp_copies
+from pdf.layout import text_width, wrap_text
+from pdf.table import TableStyle, draw_table, layout_table
+from pdf.templates import CNF_CHALLAN_TEMPLATE, WARRANTY_SRF_TEMPLATE
+
+
+def draw_srf_overlay(
+    can, rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+):
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(140, 690, srf_no)
+    can.drawString(485, 690, srf_date)
+    can.drawString(375, 690, code)
+    can.drawString(220, 651, name)
+    can.drawString(220, 626, address)
+    can.drawString(220, 601, contact1)
+    can.drawString(475, 601, gst)
+    can.drawString(375, 187, received_by)
+
+    start_y = 541
+    y = start_y
+    line_spacing = 10
+    min_row_height = 20
+    row_padding = 6
+    columns = [
+        {"x": 40, "width": 20},
+        {"x": 70, "width": 50},
+        {"x": 135, "width": 124},
+        {"x": 263, "width": 97},
+        {"x": 365, "width": 105},
+        {"x": 472, "width": 98},
+    ]
+
+    can.setFont("Helvetica", 9)
+
+    for idx, row in enumerate(rows, 1):
+        row_data = [str(idx)] + row
+        row_lines = [
+            wrap_text(str(text), "Helvetica", 9, col["width"])
+            for col, text in zip(columns, row_data)
+        ]
+
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max(max_lines * line_spacing, min_row_height)
+
+        # Only the first page of the overlay is printed
+        if y - row_height < 100:
+            break
+
+        for col, lines in zip(columns, row_lines):
+            total_text_height = len(lines) * line_spacing
+            vertical_offset = (row_height - total_text_height) / 2
+
+            for i, ln in enumerate(lines):
+                line_width = text_width(ln, "Helvetica", 9)
+                center_x = col["x"] + col["width"] / 2 - line_width / 2
+                y_position = y - vertical_offset - (i * line_spacing)
+                can.drawString(center_x, y_position, ln)
+
+        y -= row_height + row_padding
+
+
+def render_srf(
+    rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+) -> bytes:
+    """
+    Renders the customer and ASC copies of a warranty SRF and returns the PDF.
+    """
+    # Both copies carry the same details, the overlay is drawn once
+    overlay_pages = render_copies(
+        lambda can: draw_srf_overlay(
+            can, rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
+        )
+    )
+    return stamp_copies(WARRANTY_SRF_TEMPLATE, overlay_pages)
+
+
+# Columns of a CNF challan row
+CNF_CHALLAN_COLUMNS = [
+    {"x": 30, "width": 20},  # Sl No
+    {"x": 55, "width": 100},  # Model
+    {"x": 165, "width": 85},  # Serial No
+    {"x": 260, "width": 80},  # Complaint No
+    {"x": 357, "width": 63},  # Sticker No or SRF No
+    {"x": 430, "width": 130},  # Name or ASC
+]
+# The first columns are the same on both copies, the rest differ per copy
+CNF_CHALLAN_SHARED_COLUMNS = 4
+# (number field, name field) of the customer copy and of the ASC copy
+CNF_CHALLAN_COPIES = [("srf_number", "name"), ("sticker_number", "asc_name")]
+CNF_CHALLAN_STYLE = TableStyle(line_spacing=10, min_row_height=30, row_padding=1)
+# Where the first row is placed, and the lowest a row may reach: the foot of
+# the ruled table
+CNF_CHALLAN_TABLE_TOP = 560
+CNF_CHALLAN_TABLE_BOTTOM = 312
+
+
+def cnf_challan_cells(rows):
+    """
+    The shared cells of each row followed by the number and name cells of
+    every copy, so that a row is as tall as its tallest cell on any copy.
+    """
+    for idx, row in enumerate(rows, 1):
+        model = row["model"] or ""
+        slno = str(row["serial_number"] or "")
+        complaint_no = row["complaint_number"] or ""
+        cells = [str(idx), model, slno, complaint_no]
+        for number_field, name_field in CNF_CHALLAN_COPIES:
+            cells += [str(row[number_field] or ""), str(row[name_field] or "")]
+        yield cells
+
+
+def layout_cnf_challan(rows):
+    """
+    Wraps the cells of every row for both copies and places the rows, which
+    sit at the same height on both copies. Returns the placed rows of each
+    page.
+    """
+    shared_columns = CNF_CHALLAN_COLUMNS[:CNF_CHALLAN_SHARED_COLUMNS]
+    copy_columns = CNF_CHALLAN_COLUMNS[CNF_CHALLAN_SHARED_COLUMNS:]
+    widths = [col["width"] for col in shared_columns] + [
+        col["width"] for _ in CNF_CHALLAN_COPIES for col in copy_columns
+    ]
+    return layout_table(
+        cnf_challan_cells(rows),
+        widths,
+        CNF_CHALLAN_STYLE,
+        CNF_CHALLAN_TABLE_TOP,
+        CNF_CHALLAN_TABLE_BOTTOM,
+    )
+
+
+def draw_cnf_challan_overlay(can, placed, division, challan_no, challan_date):
+    """The part both copies share: header and the shared columns."""
+    can.setFont("Helvetica-Bold", 10)
+    can.drawString(180, 725, challan_no)
+    can.drawString(440, 725, challan_date)
+    can.drawString(100, 635, division)
+
+    shared_columns = CNF_CHALLAN_COLUMNS[:CNF_CHALLAN_SHARED_COLUMNS]
+    draw_table(can, shared_columns, placed, CNF_CHALLAN_STYLE)
+
+
+def draw_cnf_challan_copy(can, placed, copy):
+    """The delta of one copy: its number and name columns."""
+    copy_columns = CNF_CHALLAN_COLUMNS[CNF_CHALLAN_SHARED_COLUMNS:]
+    first_cell = CNF_CHALLAN_SHARED_COLUMNS + copy * len(copy_columns)
+    draw_table(can, copy_columns, placed, CNF_CHALLAN_STYLE, first_cell)
+
+
+def render_cnf_challan(rows, division, challan_no, challan_date) -> bytes:
+    """
+    Renders the customer and ASC copies of a CNF challan and returns the PDF.
+    The rows are laid out and drawn once, only the columns that differ are
+    drawn per copy. Rows that do not fit in the table go on further pages of
+    each copy, each with the header printed again.
+    """
+    pages = layout_cnf_challan(rows)
+    overlay_pages = render_pages(
+        lambda can, page: draw_cnf_challan_overlay(
+            can, pages[page], division, challan_no, challan_date
+        ),
+        len(pages),
+        deltas=[
+            lambda can, page, copy=copy: draw_cnf_challan_copy(can, pages[page], copy)
+            for copy in range(len(CNF_CHALLAN_COPIES))
+        ],
+    )
+    return stamp_copies(CNF_CHALLAN_TEMPLATE, overlay_pages, len(pages))
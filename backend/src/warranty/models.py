@@ -1,12 +1,37 @@
 from datetime import date
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlmodel import Column, Field, SQLModel
 
 
 class Warranty(SQLModel, table=True):
     __tablename__ = "warranty"
+    __table_args__ = (
+        Index(
+            "ix_warranty_delivered_by_trgm",
+            "delivered_by",
+            postgresql_using="gin",
+            postgresql_ops={"delivered_by": "gin_trgm_ops"},
+        ),
+        # Partial indexes behind the pending lists
+        Index(
+            "ix_warranty_pending",
+            "srf_number",
+            postgresql_where=text("final_status = 'N'"),
+        ),
+        Index(
+            "ix_warranty_cnf_challan_pending",
+            "division",
+            "srf_number",
+            postgresql_where=text("head = 'REPLACE' AND challan = 'N'"),
+        ),
+        Index(
+            "ix_warranty_challan_number",
+            "challan_number",
+            postgresql_where=text("challan_number IS NOT NULL"),
+        ),
+    )
     srf_number: str = Field(primary_key=True, index=True)
     code: str = Field(
         sa_column=Column(
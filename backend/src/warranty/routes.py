@@ -1,13 +1,15 @@
 from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from auth.dependencies import AccessTokenBearer
 from db.db import get_session
 from exceptions import WarrantyNotFound
+from pdf.response import pdf_response
+from utils.pagination import MAX_ENQUIRY_PAGE_SIZE, NEXT_CURSOR_HEADER
 from warranty.schemas import (
     WarrantyCNFChallanCode,
     WarrantyCNFChallanDetails,
@@ -160,17 +162,14 @@ Print srf by srf number.
 @warranty_router.post("/srf_print", status_code=status.HTTP_200_OK)
 async def print_srf(
     data: WarrantySrfNumber,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
-    srf_pdf = await warranty_service.print_srf(data.srf_number, token, session)
-    return StreamingResponse(
-        srf_pdf,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{data.srf_number}.pdf"'
-        },
+    srf_pdf = await warranty_service.print_srf(
+        data.srf_number, token, session, if_none_match
     )
+    return pdf_response(srf_pdf, f"{data.srf_number}.pdf")
 
 
 """
@@ -229,8 +228,10 @@ async def create_cnf_challan(
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
-    await warranty_service.create_cnf_challan(list_retail, session)
-    return JSONResponse(content={"message": f"CNF Challan Records Updated"})
+    not_found = await warranty_service.create_cnf_challan(list_retail, session)
+    return JSONResponse(
+        content={"message": f"CNF Challan Records Updated", "not_found": not_found}
+    )
 
 
 """
@@ -241,19 +242,14 @@ Print cnf challan by cnf number.
 @warranty_router.post("/cnf_challan_print", status_code=status.HTTP_200_OK)
 async def print_cnf_challan(
     data: WarrantyCNFChallanCode,
+    if_none_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     token=Depends(access_token_bearer),
 ):
     cnf_pdf = await warranty_service.print_cnf_challan(
-        data.challan_number, token, session
-    )
-    return StreamingResponse(
-        cnf_pdf,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{data.challan_number}.pdf"'
-        },
+        data.challan_number, token, session, if_none_match
     )
+    return pdf_response(cnf_pdf, f"{data.challan_number}.pdf")
 
 
 """
@@ -266,6 +262,7 @@ Warranty enquiry using query parameters.
     "/enquiry", response_model=List[WarrantyEnquiry], status_code=status.HTTP_200_OK
 )
 async def enquiry_warranty(
+    response: Response,
     final_status: Optional[str] = None,
     name: Optional[str] = None,
     division: Optional[str] = None,
@@ -276,11 +273,31 @@ async def enquiry_warranty(
     received: Optional[str] = None,
     repaired: Optional[str] = None,
     head: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ENQUIRY_PAGE_SIZE),
+    stream: bool = False,
     session: AsyncSession = Depends(get_session),
     _=Depends(access_token_bearer),
 ):
+    if stream:
+        # NDJSON, read through a server side cursor
+        return StreamingResponse(
+            warranty_service.stream_enquiry_warranty(
+                final_status,
+                name,
+                division,
+                from_srf_date,
+                to_srf_date,
+                delivered_by,
+                delivered,
+                received,
+                repaired,
+                head,
+            ),
+            media_type="application/x-ndjson",
+        )
     try:
-        result = await warranty_service.enquiry_warranty(
+        result, next_cursor = await warranty_service.enquiry_warranty(
             session,
             final_status,
             name,
@@ -292,7 +309,11 @@ async def enquiry_warranty(
             received,
             repaired,
             head,
+            after=after,
+            limit=limit,
         )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return result
     except:
         return []
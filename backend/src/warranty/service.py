@@ -1,22 +1,22 @@
-import io
-import os
 from datetime import date, timedelta
-from typing import List, Optional
-
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from reportlab.pdfgen import canvas
-from sqlalchemy import case, func, select
-from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, case, func, or_, select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from counter.service import CNF_CHALLAN, WARRANTY_SRF, CounterService
 from exceptions import IncorrectCodeFormat, WarrantyNotFound
 from master.models import Master
-from master.service import MasterService
+from master.service import MasterService, full_address
+from menu.cache import WARRANTY_GROUP, dashboard_cache
+from pdf.renderer import RenderedPdf, pdf_renderer
 from service_center.service import ServiceCenterService
-from utils.date_utils import format_date_ddmmyyyy, parse_date
-from utils.file_utils import safe_join, split_text_to_lines
+from utils.bulk import bulk_update
+from utils.date_utils import format_date_ddmmyyyy, format_date_or_blank, parse_date
+from utils.pagination import keyset_page, stream_ndjson
+from utils.projection import Projection
+from utils.search import contains
+from warranty.documents import render_cnf_challan, render_srf
 from warranty.models import Warranty
 from warranty.schemas import (
     WarrantyCNFChallanDetails,
@@ -29,32 +29,30 @@ from warranty.schemas import (
     WarrantyUpdateResponse,
 )
 
+counter_service = CounterService()
 master_service = MasterService()
 service_center_service = ServiceCenterService()
 
+# Columns behind each enquiry row
+WARRANTY_ENQUIRY = Projection(
+    WarrantyEnquiry,
+    srf_number=Warranty.srf_number,
+    srf_date=(Warranty.srf_date, format_date_ddmmyyyy),
+    name=Master.name,
+    model=Warranty.model,
+    head=Warranty.head,
+    receive_date=(Warranty.receive_date, format_date_or_blank),
+    repair_date=(Warranty.repair_date, format_date_or_blank),
+    delivery_date=(Warranty.delivery_date, format_date_or_blank),
+    contact1=Master.contact1,
+    contact2=Master.contact2,
+)
+
 
 class WarrantyService:
 
     async def get_next_base_number(self, session: AsyncSession) -> int:
-        statement = select(Warranty.srf_number)
-        result = await session.execute(statement)
-        srf_numbers = [
-            row[0]
-            for row in result.fetchall()
-            if row[0] and row[0].startswith("R") and "/" in row[0]
-        ]
-        base_numbers = []
-        for srf in srf_numbers:
-            base, _ = srf.split("/")
-            try:
-                base_num = int(base[1:])
-                base_numbers.append(base_num)
-            except ValueError:
-                continue
-        if base_numbers:
-            return max(base_numbers) + 1
-        else:
-            return 1
+        return await counter_service.peek(WARRANTY_SRF, session)
 
     async def create_warranty(
         self, session: AsyncSession, warranty: WarrantyCreate, token: dict
@@ -66,54 +64,34 @@ class WarrantyService:
         if sub_number < 1 or sub_number > 8:
             raise IncorrectCodeFormat()
 
-        # If frontend requests a new base, generate next base number
+        warranty_data_dict = warranty.model_dump()
+        master = await master_service.get_master_by_name(warranty.name, session)
+        if warranty.head == "REPLACE":
+            await service_center_service.check_service_center_name_available(
+                warranty.asc_name, session
+            )
+        warranty_data_dict["created_by"] = token["user"]["username"]
+        warranty_data_dict["code"] = master.code
+        for date_field in ["srf_date"]:
+            if date_field in warranty_data_dict:
+                warranty_data_dict[date_field] = parse_date(
+                    warranty_data_dict[date_field]
+                )
+        warranty_data_dict.pop("name", None)
+
         base_part = parts[0]
         if base_part == "NEW":
-            for _ in range(3):  # Retry up to 3 times
-                next_base = await self.get_next_base_number(session)
-                srf_number = f"R{str(next_base).zfill(5)}/1"
-                warranty_data_dict = warranty.model_dump()
-                warranty_data_dict["srf_number"] = srf_number
-                master = await master_service.get_master_by_name(warranty.name, session)
-                if warranty.head == "REPLACE":
-                    await service_center_service.check_service_center_name_available(
-                        warranty.asc_name, session
-                    )
-                warranty_data_dict["created_by"] = token["user"]["username"]
-                warranty_data_dict["code"] = master.code
-                for date_field in ["srf_date"]:
-                    if date_field in warranty_data_dict:
-                        warranty_data_dict[date_field] = parse_date(
-                            warranty_data_dict[date_field]
-                        )
-                warranty_data_dict.pop("name", None)
-                new_warranty = Warranty(**warranty_data_dict)
-                session.add(new_warranty)
-                try:
-                    await session.commit()
-                    return new_warranty
-                except IntegrityError:
-                    await session.rollback()
-        else:
-            # Use the base provided by frontend, just validate sub-number
-            warranty_data_dict = warranty.model_dump()
-            master = await master_service.get_master_by_name(warranty.name, session)
-            if warranty.head == "REPLACE":
-                await service_center_service.check_service_center_name_available(
-                    warranty.asc_name, session
-                )
-            warranty_data_dict["created_by"] = token["user"]["username"]
-            warranty_data_dict["code"] = master.code
-            for date_field in ["srf_date"]:
-                if date_field in warranty_data_dict:
-                    warranty_data_dict[date_field] = parse_date(
-                        warranty_data_dict[date_field]
-                    )
-            warranty_data_dict.pop("name", None)
-            new_warranty = Warranty(**warranty_data_dict)
-            session.add(new_warranty)
-            await session.commit()
-            return new_warranty
+            # If frontend requests a new base, allocate the next base number
+            next_base = await counter_service.allocate(WARRANTY_SRF, session)
+            warranty_data_dict["srf_number"] = f"R{str(next_base).zfill(5)}/1"
+        elif base_part[1:].isdigit():
+            # Use the base provided by frontend, keep the counter ahead of it
+            await counter_service.bump(WARRANTY_SRF, int(base_part[1:]), session)
+        new_warranty = Warranty(**warranty_data_dict)
+        session.add(new_warranty)
+        await session.commit()
+        dashboard_cache.invalidate(WARRANTY_GROUP)
+        return new_warranty
 
     async def warranty_next_code(self, session: AsyncSession):
         next_base_number = await self.get_next_base_number(session)
@@ -198,6 +176,7 @@ class WarrantyService:
         existing_warranty.updated_by = token["user"]["username"]
         session.add(existing_warranty)
         await session.commit()
+        dashboard_cache.invalidate(WARRANTY_GROUP)
         await session.refresh(existing_warranty)
         return existing_warranty
 
@@ -221,208 +200,97 @@ class WarrantyService:
         return last_srf_number
 
     async def print_srf(
-        self, srf_number: WarrantySrfNumber, token: dict, session: AsyncSession
-    ) -> io.BytesIO:
+        self,
+        srf_number: WarrantySrfNumber,
+        token: dict,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
         """
         Generates a PDF for the given SRF number.
         """
-        # Query warranty and master data
         if len(srf_number) != 6:
             srf_number = "R" + srf_number.zfill(5)
+        jobs = await self.srf_print_jobs(
+            [srf_number], token["user"]["username"], session
+        )
+        if srf_number not in jobs:
+            raise WarrantyNotFound()
+
+        return await pdf_renderer.render_document(
+            "warranty_srf", render_srf, *jobs[srf_number], if_none_match=if_none_match
+        )
+
+    async def srf_print_jobs(
+        self, srf_numbers: List[str], received_by: str, session: AsyncSession
+    ) -> Dict[str, tuple]:
+        """
+        Reads the rows of all the given SRFs with one query and returns the
+        arguments of render_srf for each SRF found, by SRF number.
+        """
+        srf_numbers = [
+            number if len(number) == 6 else "R" + number.zfill(5)
+            for number in srf_numbers
+        ]
+        # Query warranty and master data
         statement = (
             select(Warranty, Master)
             .join(Master, Warranty.code == Master.code)
-            .where(Warranty.srf_number.like(f"{srf_number}/%"))
+            .where(
+                or_(
+                    *[Warranty.srf_number.like(f"{number}/%") for number in srf_numbers]
+                )
+            )
         )
         result = await session.execute(statement)
-        rows = result.fetchall()
-
-        if not rows:
-            raise WarrantyNotFound()
-
-        # Extract fields for overlay
-        srf_row = rows[0]
-        warranty = srf_row.Warranty
-        master = srf_row.Master
-
-        srf_no = warranty.srf_number[:6]
-        srf_date = warranty.srf_date.strftime("%d-%m-%Y") if warranty.srf_date else ""
-        code = warranty.code
-        master_code = master.code
-        master_details = await master_service.get_master_details(master_code, session)
-        name = master_details["name"]
-        address = master_details["full_address"]
-        contact1 = master_details["contact1"]
-        gst = master_details["gst"] or ""
-        received_by = token["user"]["username"]
-
-        # Prepare table rows for overlay
-        table_rows = []
-        for row in rows:
-            w = row.Warranty
-            table_rows.append(
-                [
-                    w.division or "",
-                    w.model or "",
-                    str(w.serial_number or ""),
-                    w.complaint_number or "",
-                    w.sticker_number or "",
-                ]
+        documents: Dict[str, list] = {}
+        for row in result.fetchall():
+            documents.setdefault(row.Warranty.srf_number[:6], []).append(row)
+
+        jobs = {}
+        for srf_no, rows in documents.items():
+            # Extract fields for overlay
+            warranty = rows[0].Warranty
+            master = rows[0].Master
+            srf_date = (
+                warranty.srf_date.strftime("%d-%m-%Y") if warranty.srf_date else ""
             )
 
-        def generate_overlay(
-            rows, srf_no, srf_date, code, name, address, contact1, gst, received_by
-        ):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-
-            can.setFont("Helvetica-Bold", 10)
-            can.drawString(140, 690, srf_no)
-            can.drawString(485, 690, srf_date)
-            can.drawString(375, 690, code)
-            can.drawString(220, 651, name)
-            can.drawString(220, 626, address)
-            can.drawString(220, 601, contact1)
-            can.drawString(475, 601, gst)
-            can.drawString(375, 187, received_by)
-
-            start_y = 541
-            y = start_y
-            line_spacing = 10
-            min_row_height = 20
-            row_padding = 6
-            columns = [
-                {"x": 40, "width": 20},
-                {"x": 70, "width": 50},
-                {"x": 135, "width": 124},
-                {"x": 263, "width": 97},
-                {"x": 365, "width": 105},
-                {"x": 472, "width": 98},
-            ]
-
-            can.setFont("Helvetica", 9)
-
-            for idx, row in enumerate(rows, 1):
-                row_data = [str(idx)] + row
-                row_lines = []
-                for col, text in zip(columns, row_data):
-                    words = text.split()
-                    lines = []
-                    line = ""
-                    for word in words:
-                        test_line = line + (" " if line else "") + word
-                        if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                            line = test_line
-                        else:
-                            lines.append(line)
-                            line = word
-                    if line:
-                        lines.append(line)
-                    row_lines.append(lines)
-
-                max_lines = max(len(lines) for lines in row_lines)
-                row_height = max(max_lines * line_spacing, min_row_height)
-
-                if y - row_height < 100:
-                    can.showPage()
-                    can.setFont("Helvetica", 9)
-                    y = height - 50
-
-                for col, lines in zip(columns, row_lines):
-                    total_text_height = len(lines) * line_spacing
-                    vertical_offset = (row_height - total_text_height) / 2
-
-                    for i, ln in enumerate(lines):
-                        text_width = stringWidth(ln, "Helvetica", 9)
-                        center_x = col["x"] + col["width"] / 2 - text_width / 2
-                        y_position = y - vertical_offset - (i * line_spacing)
-                        can.drawString(center_x, y_position, ln)
-
-                y -= row_height + row_padding
-
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        # Create overlays
-        overlay_customer = generate_overlay(
-            table_rows,
-            srf_no,
-            srf_date,
-            code,
-            name,
-            address,
-            contact1,
-            gst,
-            received_by,
-        )
-        overlay_asc = generate_overlay(
-            table_rows,
-            srf_no,
-            srf_date,
-            code,
-            name,
-            address,
-            contact1,
-            gst,
-            received_by,
-        )
+            # Prepare table rows for overlay
+            table_rows = []
+            for row in rows:
+                w = row.Warranty
+                table_rows.append(
+                    [
+                        w.division or "",
+                        w.model or "",
+                        str(w.serial_number or ""),
+                        w.complaint_number or "",
+                        w.sticker_number or "",
+                    ]
+                )
 
-        # Path to the static PDF template (use absolute path for portability, with path injection protection)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "warranty_receipt.pdf")
-
-        # Read the template PDF
-        try:
-            with open(template_path, "rb") as f:
-                template_bytes = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Template PDF not found at {template_path}")
-        template_buffer = io.BytesIO(template_bytes)
-        template_pdf = PdfReader(template_buffer)
-
-        # Merge overlays
-        writer = PdfWriter()
-        page1 = template_pdf.pages[0]
-        page1.merge_page(overlay_customer.pages[0])
-        writer.add_page(page1)
-
-        if len(template_pdf.pages) > 1:
-            page2 = template_pdf.pages[1]
-            page2.merge_page(overlay_asc.pages[0])
-            writer.add_page(page2)
-
-        output_stream = io.BytesIO()
-        writer.write(output_stream)
-        output_stream.seek(0)
-        return output_stream
+            jobs[srf_no] = (
+                table_rows,
+                srf_no,
+                srf_date,
+                warranty.code,
+                master.name,
+                full_address(master),
+                master.contact1,
+                master.gst or "",
+                received_by,
+            )
+        return jobs
 
     async def next_cnf_challan_code(self, session: AsyncSession):
-        statement = (
-            select(Warranty.challan_number)
-            .where(Warranty.challan_number.isnot(None))
-            .order_by(Warranty.challan_number.desc())
-            .limit(1)
-        )
-        result = await session.execute(statement)
-        last_challan_number = result.scalar()
-        last_number = last_challan_number[1:] if last_challan_number else "0"
-        next_challan_number = int(last_number) + 1
+        next_challan_number = await counter_service.peek(CNF_CHALLAN, session)
         next_challan_number = "U" + str(next_challan_number).zfill(5)
         return next_challan_number
 
     async def last_cnf_challan_code(self, session: AsyncSession):
-        statement = (
-            select(Warranty.challan_number)
-            .where(Warranty.challan_number.isnot(None))
-            .order_by(Warranty.challan_number.desc())
-            .limit(1)
-        )
-        result = await session.execute(statement)
-        last_challan_number = result.scalar()
-        return last_challan_number or None
+        last_number = await counter_service.last(CNF_CHALLAN, session)
+        return "U" + str(last_number).zfill(5) if last_number else None
 
     async def list_cnf_challan_details(self, session: AsyncSession, division: str):
         statement = (
@@ -453,171 +321,99 @@ class WarrantyService:
         list_cnf_challan: List[WarrantyCNFCreate],
         session: AsyncSession,
     ):
-        for record in list_cnf_challan:
-            statement = select(Warranty).where(Warranty.srf_number == record.srf_number)
-            result = await session.execute(statement)
-            existing_warranty = result.scalar_one_or_none()
-            if existing_warranty:
-                existing_warranty.challan = record.challan
-                existing_warranty.challan_number = record.challan_number
-                existing_warranty.challan_date = record.challan_date
-                session.add(existing_warranty)
+        for challan_number in {record.challan_number for record in list_cnf_challan}:
+            if challan_number[1:].isdigit():
+                await counter_service.bump(
+                    CNF_CHALLAN, int(challan_number[1:]), session
+                )
+        not_found = await bulk_update(
+            session,
+            Warranty,
+            "srf_number",
+            [
+                {
+                    "srf_number": record.srf_number,
+                    "challan": record.challan,
+                    "challan_number": record.challan_number,
+                    "challan_date": record.challan_date,
+                }
+                for record in list_cnf_challan
+            ],
+        )
         await session.commit()
+        dashboard_cache.invalidate(WARRANTY_GROUP)
+        return not_found
 
     async def print_cnf_challan(
-        self, challan_number: str, token: dict, session: AsyncSession
-    ) -> io.BytesIO:
+        self,
+        challan_number: str,
+        token: dict,
+        session: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> RenderedPdf:
         if len(challan_number) != 6:
             challan_number = "U" + challan_number.zfill(5)
+        jobs = await self.cnf_challan_print_jobs([challan_number], session)
+        if not jobs:
+            raise WarrantyNotFound()
+
+        return await pdf_renderer.render_document(
+            "cnf_challan",
+            render_cnf_challan,
+            *jobs[challan_number],
+            if_none_match=if_none_match,
+        )
+
+    async def cnf_challan_print_jobs(
+        self, challan_numbers: List[str], session: AsyncSession
+    ) -> Dict[str, tuple]:
+        """
+        Reads the rows of all the given CNF challans with one query and returns
+        the arguments of render_cnf_challan for each challan found, by challan
+        number.
+        """
+        challan_numbers = [
+            number if len(number) == 6 else "U" + number.zfill(5)
+            for number in challan_numbers
+        ]
         # Query warranty and master data
         statement = (
             select(Warranty, Master)
             .join(Master, Warranty.code == Master.code)
-            .where(Warranty.challan_number == challan_number)
+            .where(Warranty.challan_number.in_(challan_numbers))
         )
         result = await session.execute(statement)
-        rows = result.fetchall()
-
-        if not rows:
-            raise WarrantyNotFound()
-
-        # Common values
-        challan_date = (
-            rows[0].Warranty.challan_date.strftime("%d-%m-%Y")
-            if rows[0].Warranty.challan_date
-            else ""
-        )
-        division = rows[0].Warranty.division
-
-        def generate_overlay(
-            rows,
-            division,
-            challan_no,
-            challan_date,
-            name_field,
-            number_field,
-        ):
-            packet = io.BytesIO()
-            can = canvas.Canvas(packet, pagesize=A4)
-            width, height = A4
-
-            can.setFont("Helvetica-Bold", 10)
-            can.drawString(180, 725, challan_no)
-            can.drawString(440, 725, challan_date)
-            can.drawString(100, 635, division)
-
-            start_y = 560
-            y = start_y
-            line_spacing = 10
-            min_row_height = 30
-            row_padding = 1
-            columns = [
-                {"x": 30, "width": 20},  # Sl No
-                {"x": 55, "width": 100},  # Model
-                {"x": 165, "width": 85},  # Serial No
-                {"x": 260, "width": 80},  # Complaint No
-                {"x": 357, "width": 63},  # Sticker No or SRF No
-                {"x": 430, "width": 130},  # Name or ASC
+        documents: Dict[str, list] = {}
+        for row in result.fetchall():
+            documents.setdefault(row.Warranty.challan_number, []).append(row)
+
+        jobs = {}
+        for challan_number, rows in documents.items():
+            # Common values
+            challan_date = (
+                rows[0].Warranty.challan_date.strftime("%d-%m-%Y")
+                if rows[0].Warranty.challan_date
+                else ""
+            )
+            division = rows[0].Warranty.division
+
+            cnf_rows = [
+                {
+                    "model": row.Warranty.model,
+                    "serial_number": row.Warranty.serial_number,
+                    "complaint_number": row.Warranty.complaint_number,
+                    "srf_number": row.Warranty.srf_number,
+                    "sticker_number": row.Warranty.sticker_number,
+                    "name": row.Master.name,
+                    "asc_name": row.Warranty.asc_name,
+                }
+                for row in rows
             ]
+            jobs[challan_number] = (cnf_rows, division, challan_number, challan_date)
+        return jobs
 
-            can.setFont("Helvetica", 9)
-
-            for idx, row in enumerate(rows, 1):
-                w = row.Warranty
-                m = row.Master
-                model = w.model or ""
-                slno = str(w.serial_number or "")
-                complaint_no = w.complaint_number or ""
-                number = getattr(w, number_field, "") or ""
-                name = (
-                    getattr(m, name_field, None)
-                    or getattr(w, name_field, "")
-                    or ""
-                )
-
-                row_data = [str(idx), model, slno, complaint_no, number, name]
-
-                row_lines = []
-                for col, text in zip(columns, row_data):
-                    words = str(text).split()
-                    lines = []
-                    line = ""
-                    for word in words:
-                        test_line = line + (" " if line else "") + word
-                        if stringWidth(test_line, "Helvetica", 9) <= col["width"]:
-                            line = test_line
-                        else:
-                            lines.append(line)
-                            line = word
-                    if line:
-                        lines.append(line)
-                    row_lines.append(lines)
-
-                max_lines = max(len(lines) for lines in row_lines)
-                row_height = max(max_lines * line_spacing, min_row_height)
-
-                if y - row_height < 100:
-                    can.showPage()
-                    can.setFont("Helvetica", 9)
-                    y = height - 50
-
-                for col, lines in zip(columns, row_lines):
-                    total_text_height = len(lines) * line_spacing
-                    vertical_offset = (row_height - total_text_height) / 2
-
-                    for i, ln in enumerate(lines):
-                        text_width = stringWidth(ln, "Helvetica", 9)
-                        center_x = col["x"] + col["width"] / 2 - text_width / 2
-                        y_position = y - vertical_offset - (i * line_spacing)
-                        can.drawString(center_x, y_position, ln)
-
-                y -= row_height + row_padding
-
-            can.save()
-            packet.seek(0)
-            return PdfReader(packet)
-
-        # Create overlays
-        overlay_customer = generate_overlay(
-            rows, division, challan_number, challan_date, "name", "srf_number"
-        )
-        overlay_asc = generate_overlay(
-            rows, division, challan_number, challan_date, "asc_name", "sticker_number"
-        )
-
-        # Path to the static PDF template (use absolute path for portability, with path injection protection)
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        static_dir = os.path.normpath(os.path.join(base_dir, "..", "static"))
-        template_path = safe_join(static_dir, "cnf_challan.pdf")
-
-        # Read the template PDF
-        try:
-            with open(template_path, "rb") as f:
-                template_bytes = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Template PDF not found at {template_path}")
-        template_buffer = io.BytesIO(template_bytes)
-        template_pdf = PdfReader(template_buffer)
-
-        # Merge overlays
-        writer = PdfWriter()
-        page1 = template_pdf.pages[0]
-        page1.merge_page(overlay_customer.pages[0])
-        writer.add_page(page1)
-
-        if len(template_pdf.pages) > 1:
-            page2 = template_pdf.pages[1]
-            page2.merge_page(overlay_asc.pages[0])
-            writer.add_page(page2)
-
-        output_stream = io.BytesIO()
-        writer.write(output_stream)
-        output_stream.seek(0)
-        return output_stream
-
-    async def enquiry_warranty(
+    def _enquiry_statement(
         self,
-        session: AsyncSession,
         final_status: Optional[str] = None,
         name: Optional[str] = None,
         division: Optional[str] = None,
@@ -628,15 +424,18 @@ class WarrantyService:
         received: Optional[str] = None,
         repaired: Optional[str] = None,
         head: Optional[str] = None,
-    ):
-
-        statement = select(Warranty, Master).join(Master, Warranty.code == Master.code)
+    ) -> Select:
+        statement = (
+            WARRANTY_ENQUIRY.select()
+            .select_from(Warranty)
+            .join(Master, Warranty.code == Master.code)
+        )
 
         if final_status:
             statement = statement.where(Warranty.final_status == final_status)
 
         if name:
-            statement = statement.where(Master.name.ilike(f"%{name}%"))
+            statement = statement.where(contains(Master.name, name))
 
         if division:
             statement = statement.where(Warranty.division == division)
@@ -647,9 +446,7 @@ class WarrantyService:
         if to_srf_date:
             statement = statement.where(Warranty.srf_date <= to_srf_date)
         if delivered_by:
-            statement = statement.where(
-                Warranty.delivered_by.ilike(f"%{delivered_by}%")
-            )
+            statement = statement.where(contains(Warranty.delivered_by, delivered_by))
         if delivered:
             if delivered == "Y":
                 statement = statement.where(Warranty.delivery_date.isnot(None))
@@ -676,36 +473,68 @@ class WarrantyService:
                 )
         if head:
             statement = statement.where(Warranty.head == head)
-        statement = statement.order_by(Warranty.srf_number)
+        return statement
 
-        result = await session.execute(statement)
-        rows = result.all()
+    async def enquiry_warranty(
+        self,
+        session: AsyncSession,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_srf_date: Optional[date] = None,
+        to_srf_date: Optional[date] = None,
+        delivered_by: Optional[str] = None,
+        delivered: Optional[str] = None,
+        received: Optional[str] = None,
+        repaired: Optional[str] = None,
+        head: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[WarrantyEnquiry], Optional[str]]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_srf_date,
+            to_srf_date,
+            delivered_by,
+            delivered,
+            received,
+            repaired,
+            head,
+        )
+        return await keyset_page(
+            session,
+            statement,
+            Warranty.srf_number,
+            WARRANTY_ENQUIRY.build,
+            after,
+            limit,
+        )
 
-        return [
-            WarrantyEnquiry(
-                srf_number=row.Warranty.srf_number,
-                srf_date=format_date_ddmmyyyy(row.Warranty.srf_date),
-                name=row.Master.name,
-                model=row.Warranty.model,
-                receive_date=(
-                    format_date_ddmmyyyy(row.Warranty.receive_date)
-                    if row.Warranty.receive_date
-                    else ""
-                ),
-                repair_date=(
-                    format_date_ddmmyyyy(row.Warranty.repair_date)
-                    if row.Warranty.repair_date
-                    else ""
-                ),
-                delivery_date=(
-                    format_date_ddmmyyyy(row.Warranty.delivery_date)
-                    if row.Warranty.delivery_date
-                    else ""
-                ),
-                final_status=row.Warranty.final_status,
-                head=row.Warranty.head,
-                contact1=row.Master.contact1,
-                contact2=row.Master.contact2,
-            )
-            for row in rows
-        ]
+    def stream_enquiry_warranty(
+        self,
+        final_status: Optional[str] = None,
+        name: Optional[str] = None,
+        division: Optional[str] = None,
+        from_srf_date: Optional[date] = None,
+        to_srf_date: Optional[date] = None,
+        delivered_by: Optional[str] = None,
+        delivered: Optional[str] = None,
+        received: Optional[str] = None,
+        repaired: Optional[str] = None,
+        head: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        statement = self._enquiry_statement(
+            final_status,
+            name,
+            division,
+            from_srf_date,
+            to_srf_date,
+            delivered_by,
+            delivered,
+            received,
+            repaired,
+            head,
+        )
+        return stream_ndjson(statement, Warranty.srf_number, WARRANTY_ENQUIRY.build)